@@ -13,25 +13,102 @@ The server never stores any user pomodoro data.
 Credit: kirkjerk (localStorage approach idea, extended to IndexedDB)
 """
 
+import base64
+import csv
+import functools
+import hashlib
+import io
+import itertools
 import json
 import os
+import queue
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
 from http import HTTPStatus
 from pathlib import Path
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 # Allow OAuth scope changes (users may have previously granted different scopes)
 os.environ["OAUTHLIB_RELAX_TOKEN_SCOPE"] = "1"
 
-from flask import Flask, Response, jsonify, redirect, render_template, request, session
+import google_auth_httplib2
+from flask import Flask, Response, g, jsonify, redirect, render_template, request, session
+from flask.json.provider import DefaultJSONProvider
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build, build_from_document
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
 from werkzeug.middleware.proxy_fix import ProxyFix
 
+import sheets_quota
 import sheets_storage
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - Parquet/Arrow export is optional
+    pa = None
+    pq = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to Flask's stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - responses fall back to gzip
+    brotli = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson.
+
+    Output matches DefaultJSONProvider (sorted keys, Flask's handling of dates, decimals and
+    dataclasses via its default hook) except that non-ASCII text is written as UTF-8 rather than
+    escaped. Anything orjson rejects, such as integers wider than 64 bits, goes through the stdlib.
+    """
+
+    def _orjson_dumps(self, obj, indent=False):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._orjson_dumps(obj).decode()
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        try:
+            # orjson returns bytes, which go straight into the response body without a str round trip
+            body = self._orjson_dumps(obj, indent=indent) + b"\n"
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
 app = Flask(__name__)
 app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_port=1)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 # Session configuration — uses Flask's built-in signed-cookie sessions (no filesystem required)
 secret_key = os.environ.get("FLASK_SECRET_KEY")
@@ -134,6 +211,91 @@ DEFAULT_SETTINGS = {
     "daily_minutes_goal": DEFAULT_DAILY_GOAL,
 }
 
+# Maximum queued operations accepted by /api/sheets/sync in one request
+MAX_SYNC_OPERATIONS = 500
+
+# Largest ?limit= accepted for a page of GET /api/sheets/pomodoros
+MAX_PAGE_LIMIT = 1000
+
+# Longest range GET /api/sheets/report will bucket by day (ten years)
+MAX_REPORT_DAYS = 3660
+
+# Keep-alive transports to Google APIs kept per worker, and how long one may sit unused before
+# its connections are dropped (Google's front ends close idle connections after a few minutes)
+GOOGLE_HTTP_POOL_SIZE = int(os.environ.get("GOOGLE_HTTP_POOL_SIZE", "8"))
+GOOGLE_HTTP_IDLE_TIMEOUT_SECONDS = float(os.environ.get("GOOGLE_HTTP_IDLE_TIMEOUT_SECONDS", "60"))
+
+# How gunicorn runs requests in each worker (set by static/entrypoint.sh): a fixed pool of
+# GUNICORN_THREADS threads, or up to GUNICORN_WORKER_CONNECTIONS greenlets under gevent
+GUNICORN_WORKER_CLASS = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+GUNICORN_THREADS = int(os.environ.get("GUNICORN_THREADS", "4"))
+GUNICORN_WORKER_CONNECTIONS = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "500"))
+
+# Admission control for /api/sheets/*: concurrent requests one spreadsheet may have in flight per
+# worker, and in-flight requests the worker accepts in total. Requests over either limit get a
+# fast 429 instead of tying up a worker thread behind Google calls. The total defaults to one
+# less than the thread count, so a thread is always left for pages and auth, or to 64 Sheets
+# requests (at most the connection limit) under gevent.
+ADMISSION_PATH_PREFIX = "/api/sheets/"
+ADMISSION_MAX_PER_USER = int(os.environ.get("ADMISSION_MAX_PER_USER", "2"))
+ADMISSION_MAX_IN_FLIGHT = int(
+    os.environ.get(
+        "ADMISSION_MAX_IN_FLIGHT",
+        min(64, GUNICORN_WORKER_CONNECTIONS) if GUNICORN_WORKER_CLASS == "gevent" else max(1, GUNICORN_THREADS - 1),
+    )
+)
+ADMISSION_RETRY_AFTER_SECONDS = 1
+
+# Conditional GETs of sheet data: browsers revalidate every time (If-None-Match) and only private
+# caches may store responses, since they're specific to the caller's spreadsheet
+SHEET_DATA_CACHE_CONTROL = "private, no-cache"
+
+# Change feed (GET /api/sheets/events): whether it is served at all, streams open per worker, how
+# often an idle stream checks the Drive version for edits made outside this server, how often it
+# sends a keep-alive comment, and how long a stream lasts before the client is told to reconnect.
+# An open stream holds a whole thread under gthread workers, so the feed is only on by default
+# with gevent workers, where it costs a greenlet.
+CHANGE_FEED_ENABLED = os.environ.get(
+    "CHANGE_FEED_ENABLED", "1" if GUNICORN_WORKER_CLASS == "gevent" else "0"
+).lower() in ("1", "true", "yes")
+CHANGE_FEED_MAX_STREAMS = int(os.environ.get("CHANGE_FEED_MAX_STREAMS", "100"))
+CHANGE_FEED_VERSION_CHECK_SECONDS = float(os.environ.get("CHANGE_FEED_VERSION_CHECK_SECONDS", "60"))
+CHANGE_FEED_KEEPALIVE_SECONDS = 15.0
+CHANGE_FEED_STREAM_SECONDS = 300.0
+CHANGE_FEED_RETRY_MS = 5000
+# Pending notifications per stream; they only mean "something changed", so extras are dropped
+CHANGE_FEED_QUEUE_SIZE = 16
+
+# Response header carrying {"token", "expiry"} (base64 JSON, like X-Credentials) after the server
+# refreshed the caller's access token, so the client can store it instead of refreshing again
+REFRESHED_CREDENTIALS_HEADER = "X-Refreshed-Credentials"
+
+# Cached refreshed tokens are only handed out while they have at least this long left
+TOKEN_EXPIRY_MARGIN = timedelta(minutes=5)
+
+# Header row of CSV exports
+CSV_EXPORT_HEADER = "id,name,type,start_time,end_time,duration_minutes,notes"
+
+# Export formats accepted by /api/sheets/export (?format= or Accept), CSV first as the default
+EXPORT_MIMETYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Formats that need pyarrow installed
+COLUMNAR_EXPORT_FORMATS = ("parquet", "arrow")
+
+# Response compression: text bodies smaller than this aren't worth compressing. Levels favour
+# speed, since most bodies are compressed once per request rather than cached.
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSIBLE_MIMETYPES = frozenset(
+    {"application/json", "application/x-ndjson", "text/csv", "text/html", "text/javascript", "text/css"}
+)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
 # Flask default port
 DEFAULT_PORT = 5000
 
@@ -194,40 +356,249 @@ def get_google_flow():
     )
 
 
-def get_credentials_from_request():
-    """Extract credentials from request header or body (stateless approach)."""
-    import base64
+class RequestAuth:
+    """Credentials and payload of one request, parsed once from X-Credentials or the JSON body.
+
+    credentials_data is the raw credentials dict (None if absent or malformed), payload is the
+    JSON body with _credentials stripped, and credentials is the google-auth Credentials object,
+    built on first use by get_credentials().
+    """
+
+    __slots__ = ("credentials", "credentials_data", "payload")
+
+    def __init__(self, credentials_data=None, payload=None):
+        self.credentials_data = credentials_data
+        self.payload = payload
+        self.credentials = None
 
-    # Try X-Credentials header (for GET/DELETE)
+    @property
+    def spreadsheet_id(self):
+        return self.credentials_data.get("spreadsheet_id") if self.credentials_data else None
+
+    @property
+    def is_logged_in(self):
+        return bool(self.credentials_data and self.credentials_data.get("token") and self.spreadsheet_id)
+
+
+def parse_request_auth():
+    """Parse the current request's credentials and payload (stateless approach).
+
+    Credentials come from the X-Credentials header (GET/DELETE) or _credentials in the JSON body
+    (POST/PUT); anything that doesn't decode to a JSON object counts as no credentials.
+    """
+    body = request.get_json(silent=True) if request.is_json else None
+    payload = body
+    creds_data = None
+    if isinstance(body, dict) and "_credentials" in body:
+        creds_data = body["_credentials"]
+        payload = {k: v for k, v in body.items() if k != "_credentials"}
+
+    # The header takes precedence over the body
     creds_header = request.headers.get("X-Credentials")
     if creds_header:
         try:
             creds_data = json.loads(base64.b64decode(creds_header))
-            return creds_data
         except Exception as e:
             app.logger.error(f"Failed to decode X-Credentials header: {e}")
-            return None
+            creds_data = None
+
+    if not isinstance(creds_data, dict):
+        creds_data = None
+    return RequestAuth(creds_data, payload)
+
+
+@app.before_request
+def load_request_auth():
+    """Parse credentials once per request; helpers and endpoints read them from flask.g."""
+    g.auth = parse_request_auth()
+
+
+_admission = {"total": 0, "users": {}, "rejected": 0}
+_admission_lock = threading.Lock()
+
 
-    # Try _credentials in request body (for POST/PUT)
-    if request.is_json:
-        body = request.get_json(silent=True)
-        if body and "_credentials" in body:
-            return body["_credentials"]
+def try_admit(user_key):
+    """Reserve an in-flight slot for user_key.
 
+    Returns:
+        True if admitted, False if the user or the worker already has its limit in flight.
+    """
+    with _admission_lock:
+        in_flight = _admission["users"].get(user_key, 0)
+        if in_flight >= ADMISSION_MAX_PER_USER or _admission["total"] >= ADMISSION_MAX_IN_FLIGHT:
+            _admission["rejected"] += 1
+            return False
+        _admission["users"][user_key] = in_flight + 1
+        _admission["total"] += 1
+        return True
+
+
+def release_admission(user_key):
+    """Give back a slot reserved by try_admit()."""
+    with _admission_lock:
+        remaining = _admission["users"].get(user_key, 0) - 1
+        if remaining > 0:
+            _admission["users"][user_key] = remaining
+        else:
+            _admission["users"].pop(user_key, None)
+        _admission["total"] -= 1
+
+
+def get_admission_stats():
+    """Return this worker's in-flight and rejected request counts."""
+    with _admission_lock:
+        return {
+            "in_flight": _admission["total"],
+            "users_in_flight": len(_admission["users"]),
+            "rejected": _admission["rejected"],
+        }
+
+
+@app.before_request
+def admit_request():
+    """Turn away Sheets requests over the per-user or per-worker in-flight limit with a 429.
+
+    Requests are keyed by spreadsheet, which identifies the user in the stateless API; requests
+    without one are left to the endpoint's own 401.
+    """
+    if not request.path.startswith(ADMISSION_PATH_PREFIX):
+        return None
+    user_key = get_request_auth().spreadsheet_id
+    if not user_key:
+        return None
+    if not try_admit(user_key):
+        response = jsonify({"error": "Too many requests in progress, retry shortly"})
+        response.status_code = HTTPStatus.TOO_MANY_REQUESTS
+        response.headers["Retry-After"] = str(ADMISSION_RETRY_AFTER_SECONDS)
+        return response
+    g.admission_key = user_key
     return None
 
 
+@app.teardown_request
+def release_request_admission(_error):
+    """Free the request's in-flight slot, unless a streamed response still holds it."""
+    user_key = g.pop("admission_key", None)
+    if user_key is not None:
+        release_admission(user_key)
+
+
+def get_request_auth():
+    """Get the current request's RequestAuth, parsing it if the before_request hook hasn't."""
+    if "auth" not in g:
+        g.auth = parse_request_auth()
+    return g.auth
+
+
+def get_credentials_from_request():
+    """Get the credentials dict sent with the request, or None."""
+    return get_request_auth().credentials_data
+
+
 def get_spreadsheet_id_from_request():
     """Extract spreadsheet_id from request credentials."""
-    creds = get_credentials_from_request()
-    if creds:
-        return creds.get("spreadsheet_id")
+    return get_request_auth().spreadsheet_id
+
+
+# Access tokens this worker refreshed, keyed by a hash of the refresh token: {key: (token, expiry)}
+_refreshed_tokens = {}
+_refreshed_tokens_lock = threading.Lock()
+# One lock per refresh token so concurrent requests with the same expired token refresh it once
+_token_refresh_locks = {}
+
+
+def format_token_expiry(expiry):
+    """Format a google-auth expiry (naive UTC datetime) as ISO 8601 for the client."""
+    return expiry.isoformat() + "Z" if expiry else None
+
+
+def parse_token_expiry(value):
+    """Parse an ISO 8601 token expiry from the client into the naive UTC datetime google-auth uses."""
+    if not value:
+        return None
+    try:
+        expiry = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    if expiry.tzinfo:
+        expiry = expiry.astimezone(timezone.utc).replace(tzinfo=None)
+    return expiry
+
+
+def get_cached_access_token(refresh_key):
+    """Return a cached (token, expiry) for a refresh token hash if it is still comfortably valid."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with _refreshed_tokens_lock:
+        entry = _refreshed_tokens.get(refresh_key)
+        if entry and entry[1] - TOKEN_EXPIRY_MARGIN > now:
+            return entry
+        _refreshed_tokens.pop(refresh_key, None)
+        return None
+
+
+def cache_access_token(refresh_key, token, expiry):
+    """Remember a refreshed access token until it expires, dropping entries that already have."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with _refreshed_tokens_lock:
+        for key in [key for key, (_, cached_expiry) in _refreshed_tokens.items() if cached_expiry <= now]:
+            del _refreshed_tokens[key]
+            _token_refresh_locks.pop(key, None)
+        if expiry:
+            _refreshed_tokens[refresh_key] = (token, expiry)
+
+
+def get_newer_access_token(refresh_key, credentials):
+    """Return a cached (token, expiry) that is newer than the one the client sent, if any."""
+    cached = get_cached_access_token(refresh_key)
+    if cached and cached[0] != credentials.token and (credentials.expiry is None or cached[1] > credentials.expiry):
+        return cached
     return None
 
 
+def use_fresh_access_token(credentials):
+    """Make sure credentials carry a valid access token, refreshing at most once per worker.
+
+    A token another request already refreshed is reused from the cache; otherwise an expired token
+    is refreshed and cached. Either way the new token is handed back to the client through
+    REFRESHED_CREDENTIALS_HEADER.
+    """
+    refresh_key = hashlib.sha256(credentials.refresh_token.encode()).hexdigest()
+    cached = get_newer_access_token(refresh_key, credentials)
+    if cached is None:
+        if not credentials.expired:
+            return
+        with _refreshed_tokens_lock:
+            refresh_lock = _token_refresh_locks.setdefault(refresh_key, threading.Lock())
+        with refresh_lock:
+            # Another request may have refreshed this token while we waited
+            cached = get_newer_access_token(refresh_key, credentials)
+            if cached is None:
+                from google.auth.transport.requests import Request
+
+                credentials.refresh(Request())
+                cache_access_token(refresh_key, credentials.token, credentials.expiry)
+    if cached:
+        credentials.token, credentials.expiry = cached
+
+    g.refreshed_credentials = {"token": credentials.token, "expiry": format_token_expiry(credentials.expiry)}
+
+
+@app.after_request
+def add_refreshed_credentials_header(response):
+    """Hand a token refreshed during this request back to the client."""
+    refreshed = g.pop("refreshed_credentials", None)
+    if refreshed:
+        response.headers[REFRESHED_CREDENTIALS_HEADER] = base64.b64encode(json.dumps(refreshed).encode()).decode()
+        response.headers["Cache-Control"] = "no-store"
+    return response
+
+
 def get_credentials():
-    """Get Google credentials from request (stateless)."""
-    creds_data = get_credentials_from_request()
+    """Get Google credentials from request (stateless), built once per request."""
+    auth = get_request_auth()
+    if auth.credentials is not None:
+        return auth.credentials
+    creds_data = auth.credentials_data
     if not creds_data:
         return None
 
@@ -239,26 +610,97 @@ def get_credentials():
             client_id=creds_data.get("client_id"),
             client_secret=creds_data.get("client_secret"),
             scopes=creds_data.get("scopes", []),
+            expiry=parse_token_expiry(creds_data.get("expiry")),
         )
 
-        # Refresh token if expired
-        if credentials.expired and credentials.refresh_token:
-            from google.auth.transport.requests import Request
-
-            credentials.refresh(Request())
+        if credentials.refresh_token:
+            use_fresh_access_token(credentials)
 
+        auth.credentials = credentials
         return credentials
     except Exception as e:
         app.logger.error(f"Error creating credentials: {e}")
         return None
 
 
+@functools.cache
+def get_discovery_document(service_name, version):
+    """Return the parsed discovery document shipped with googleapiclient, loaded once per worker.
+
+    Returns:
+        The discovery document as a dict, or None if the library doesn't ship one for this API.
+    """
+    document = discovery_cache.get_static_doc(service_name, version)
+    return json.loads(document) if document else None
+
+
+# LIFO so the most recently used (warmest) transport is handed out first
+_http_pool = queue.LifoQueue(maxsize=GOOGLE_HTTP_POOL_SIZE)
+
+
+def acquire_http():
+    """Check a keep-alive httplib2 transport out of the worker pool, or create one if it's empty.
+
+    httplib2.Http isn't thread-safe, so a transport is only ever used by one request at a time.
+    It holds open connections but no credentials; those are attached per request by AuthorizedHttp.
+    """
+    try:
+        http, last_used = _http_pool.get_nowait()
+    except queue.Empty:
+        return build_http()
+    if time.monotonic() - last_used > GOOGLE_HTTP_IDLE_TIMEOUT_SECONDS:
+        # The server has probably closed these connections already; reconnect cleanly
+        http.close()
+    return http
+
+
+def release_http(http):
+    """Return a transport to the worker pool, closing it if the pool is already full."""
+    try:
+        _http_pool.put_nowait((http, time.monotonic()))
+    except queue.Full:
+        http.close()
+
+
+def get_request_http():
+    """Get the pooled transport for the current request, checking one out on first use."""
+    if "google_http" not in g:
+        g.google_http = acquire_http()
+    return g.google_http
+
+
+@app.teardown_request
+def release_request_http(_error):
+    """Return the request's pooled transport, unless a streamed response still holds it."""
+    http = g.pop("google_http", None)
+    if http is not None:
+        release_http(http)
+
+
+def build_service(service_name, version, credentials):
+    """Build a Google API client for these credentials from the cached discovery document.
+
+    build() re-reads and re-parses the (hundreds of KB) discovery document on every call, so only
+    the per-request client is built here. Its requests go over the request's pooled transport,
+    rate-limited and retried per user and spreadsheet by sheets_quota.
+    """
+    user_secret = credentials.refresh_token or credentials.token or ""
+    http = sheets_quota.QuotaAwareHttp(
+        google_auth_httplib2.AuthorizedHttp(credentials, http=get_request_http()),
+        user_key=hashlib.sha256(user_secret.encode()).hexdigest(),
+    )
+    document = get_discovery_document(service_name, version)
+    if document is None:
+        return build(service_name, version, http=http)
+    return build_from_document(document, http=http)
+
+
 def get_sheets_service():
     """Get Google Sheets API service."""
     credentials = get_credentials()
     if not credentials:
         return None
-    return build("sheets", "v4", credentials=credentials)
+    return build_service("sheets", "v4", credentials)
 
 
 def get_drive_service():
@@ -266,13 +708,81 @@ def get_drive_service():
     credentials = get_credentials()
     if not credentials:
         return None
-    return build("drive", "v3", credentials=credentials)
+    return build_service("drive", "v3", credentials)
 
 
 def is_logged_in():
     """Check if request has valid credentials (stateless)."""
-    creds = get_credentials_from_request()
-    return creds is not None and creds.get("token") and creds.get("spreadsheet_id")
+    return get_request_auth().is_logged_in
+
+
+def get_response_encoding():
+    """Pick the content coding for this response from Accept-Encoding (brotli if available, else gzip)."""
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered)
+
+
+def new_compressor(encoding):
+    """Return a (compress, flush, finish) triple of callables for a streaming compressor."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    return compressor.compress, functools.partial(compressor.flush, zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def iter_compressed(body, encoding):
+    """Compress a streamed body chunk by chunk, flushing after each so the client isn't kept waiting."""
+    compress, flush, finish = new_compressor(encoding)
+    try:
+        for chunk in body:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = compress(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        close = getattr(body, "close", None)
+        if close is not None:
+            close()
+
+
+@app.after_request
+def compress_response(response):
+    """gzip or brotli encode text responses the client accepts, including streamed ones.
+
+    Buffered bodies under COMPRESSION_MIN_BYTES are left alone. A strong ETag becomes weak, since
+    the encoded bytes differ from the identity representation it was computed for.
+    """
+    if (
+        response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.status_code < HTTPStatus.OK
+        or response.status_code in (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED)
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+
+    encoding = get_response_encoding()
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        response.response = iter_compressed(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_BYTES:
+            return response
+        compress, _flush, finish = new_compressor(encoding)
+        response.set_data(compress(data) + finish())
+
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
 
 
 # =============================================================================
@@ -388,7 +898,7 @@ def auth_callback():
             return redirect(authorization_url)
 
         # Get user info
-        oauth2_service = build("oauth2", "v2", credentials=credentials)
+        oauth2_service = build_service("oauth2", "v2", credentials)
         user_info = oauth2_service.userinfo().get().execute()
         user_email = user_info.get("email")
         session["user_email"] = user_email
@@ -405,8 +915,8 @@ def auth_callback():
             # Verify we can access this spreadsheet
             # Note: Use credentials directly here since we're in OAuth callback, not using request-based auth
             try:
-                sheets_service = build("sheets", "v4", credentials=credentials)
-                sheets_service.spreadsheets().get(spreadsheetId=spreadsheet_id_to_use).execute()
+                sheets_service = build_service("sheets", "v4", credentials)
+                sheets_service.spreadsheets().get(spreadsheetId=spreadsheet_id_to_use, fields="spreadsheetId").execute()
                 session["spreadsheet_id"] = spreadsheet_id_to_use
                 session["spreadsheet_existed"] = True
                 # Save/update the mapping for future logins
@@ -418,7 +928,7 @@ def auth_callback():
         if not spreadsheet_id_to_use:
             # Create new spreadsheet using Drive API (required for drive.file scope)
             # Note: Use credentials directly here since we're in OAuth callback, not using request-based auth
-            drive_service = build("drive", "v3", credentials=credentials)
+            drive_service = build_service("drive", "v3", credentials)
             file_metadata = {
                 "name": "Acquacotta - Pomodoro Tracker",
                 "mimeType": "application/vnd.google-apps.spreadsheet",
@@ -438,7 +948,7 @@ def auth_callback():
             save_spreadsheet_id(user_email, new_spreadsheet_id)
 
             # Now use Sheets API to set up the sheets (we have access since we created the file)
-            sheets_service = build("sheets", "v4", credentials=credentials)
+            sheets_service = build_service("sheets", "v4", credentials)
 
             # Rename default Sheet1 to Pomodoros and add Settings sheet
             sheets_service.spreadsheets().batchUpdate(
@@ -483,6 +993,7 @@ def auth_callback():
             "client_id": credentials.client_id,
             "client_secret": credentials.client_secret,
             "scopes": list(credentials.scopes),
+            "expiry": format_token_expiry(credentials.expiry),
             "user_email": user_email,
             "user_name": user_info.get("name"),
             "user_picture": user_info.get("picture"),
@@ -578,6 +1089,12 @@ def auth_logout():
     return redirect("/")
 
 
+@app.route("/api/stats")
+def api_stats():
+    """This worker's Google API call counters and admission control state."""
+    return jsonify({"google_api": sheets_quota.get_stats(), "admission": get_admission_stats()})
+
+
 @app.route("/api/auth/status")
 def auth_status():
     """Get current authentication status."""
@@ -590,12 +1107,14 @@ def auth_status():
                 "picture": session.get("user_picture"),
                 "spreadsheet_id": session.get("spreadsheet_id"),
                 "needs_initial_sync": session.get("needs_initial_sync", False),
+                "change_feed": CHANGE_FEED_ENABLED,
             }
         )
     return jsonify(
         {
             "logged_in": False,
             "google_configured": bool(GOOGLE_CLIENT_ID and GOOGLE_CLIENT_SECRET),
+            "change_feed": CHANGE_FEED_ENABLED,
         }
     )
 
@@ -613,7 +1132,7 @@ def update_spreadsheet():
     if not is_logged_in():
         return jsonify({"error": "Not logged in"}), HTTPStatus.UNAUTHORIZED
 
-    request_body = request.json
+    request_body = get_request_data() or {}
     new_id = request_body.get("spreadsheet_id", "").strip()
     if not new_id:
         return jsonify({"error": "Spreadsheet ID is required"}), HTTPStatus.BAD_REQUEST
@@ -621,7 +1140,7 @@ def update_spreadsheet():
     # Verify we can access this spreadsheet
     try:
         sheets_service = get_sheets_service()
-        sheets_service.spreadsheets().get(spreadsheetId=new_id).execute()
+        sheets_service.spreadsheets().get(spreadsheetId=new_id, fields="spreadsheetId").execute()
     except HttpError:
         return jsonify({"error": "Cannot access spreadsheet. Make sure you have edit access."}), HTTPStatus.BAD_REQUEST
 
@@ -640,19 +1159,261 @@ def update_spreadsheet():
 # =============================================================================
 
 
+def get_spreadsheet_version(drive_service, spreadsheet_id):
+    """Read the spreadsheet's Drive version, which Drive bumps on every edit, or None on error."""
+    try:
+        return drive_service.files().get(fileId=spreadsheet_id, fields="version").execute()["version"]
+    except HttpError as e:
+        app.logger.warning(f"Could not read spreadsheet version: {e}")
+        return None
+
+
+def get_sheet_etag(spreadsheet_id):
+    """ETag for the current GET of sheet data, from the spreadsheet's Drive version.
+
+    The version plus the request path and query identify the response body. It's read before
+    the sheet data, so an edit landing in between only makes the next request miss. Returns
+    None if the version can't be read.
+    """
+    version = get_spreadsheet_version(get_drive_service(), spreadsheet_id)
+    if version is None:
+        return None
+    key = f"{spreadsheet_id}\0{version}\0{request.full_path}"
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def is_not_modified(etag):
+    """Whether the client's If-None-Match already matches etag."""
+    return etag is not None and request.if_none_match.contains_weak(etag)
+
+
+def tag_sheet_data(response, etag):
+    """Mark a sheet data response (or 304) with its ETag so the client revalidates it next time."""
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = SHEET_DATA_CACHE_CONTROL
+        response.vary.add("X-Credentials")
+    return response
+
+
+def not_modified(etag):
+    """Empty 304 response for a client whose copy is still current."""
+    return tag_sheet_data(Response(status=HTTPStatus.NOT_MODIFIED), etag)
+
+
+# Change feed subscribers in this worker: spreadsheet ID -> set of queues, one per open stream
+_change_feeds = {}
+_change_feeds_lock = threading.Lock()
+
+
+def subscribe_changes(spreadsheet_id):
+    """Open a change notification queue for a spreadsheet.
+
+    Returns:
+        The queue, or None if this worker already has CHANGE_FEED_MAX_STREAMS open.
+    """
+    with _change_feeds_lock:
+        if sum(len(feeds) for feeds in _change_feeds.values()) >= CHANGE_FEED_MAX_STREAMS:
+            return None
+        subscriber = queue.Queue(maxsize=CHANGE_FEED_QUEUE_SIZE)
+        _change_feeds.setdefault(spreadsheet_id, set()).add(subscriber)
+        return subscriber
+
+
+def unsubscribe_changes(spreadsheet_id, subscriber):
+    """Close a queue opened by subscribe_changes()."""
+    with _change_feeds_lock:
+        feeds = _change_feeds.get(spreadsheet_id)
+        if feeds is not None:
+            feeds.discard(subscriber)
+            if not feeds:
+                del _change_feeds[spreadsheet_id]
+
+
+def publish_change(spreadsheet_id, kind):
+    """Notify this worker's open streams for a spreadsheet that its pomodoros or settings changed."""
+    with _change_feeds_lock:
+        subscribers = list(_change_feeds.get(spreadsheet_id, ()))
+    for subscriber in subscribers:
+        try:
+            subscriber.put_nowait({"kind": kind, "source": "write"})
+        except queue.Full:
+            # The stream already has notifications pending; the client will pull either way
+            pass
+
+
+@app.after_request
+def publish_sheet_writes(response):
+    """Announce successful writes proxied to a spreadsheet on its change feed."""
+    if (
+        request.method in ("POST", "PUT", "DELETE")
+        and request.path.startswith(ADMISSION_PATH_PREFIX)
+        and response.status_code < HTTPStatus.BAD_REQUEST
+    ):
+        spreadsheet_id = get_request_auth().spreadsheet_id
+        if spreadsheet_id:
+            kind = "settings" if request.path == "/api/sheets/settings" else "pomodoros"
+            publish_change(spreadsheet_id, kind)
+    return response
+
+
+def parse_page_cursor(value):
+    """Split a 'row:id' page cursor into (row, id); (None, None) if absent, None if malformed."""
+    if value is None:
+        return None, None
+    row, separator, pomodoro_id = value.partition(":")
+    if not (separator and row.isdigit()):
+        return None
+    return int(row), pomodoro_id
+
+
+def get_pomodoro_page_response():
+    """Serve one ?limit=&cursor= page of GET /api/sheets/pomodoros."""
+    limit = request.args.get("limit", "")
+    if not (limit.isdigit() and 1 <= int(limit) <= MAX_PAGE_LIMIT):
+        return jsonify({"error": f"limit must be between 1 and {MAX_PAGE_LIMIT}"}), HTTPStatus.BAD_REQUEST
+    page_cursor = parse_page_cursor(request.args.get("cursor"))
+    if page_cursor is None:
+        return jsonify({"error": "cursor must be a next_cursor from an earlier page"}), HTTPStatus.BAD_REQUEST
+
+    try:
+        spreadsheet_id = get_spreadsheet_id_from_request()
+        etag = get_sheet_etag(spreadsheet_id)
+        if is_not_modified(etag):
+            return not_modified(etag)
+        page = sheets_storage.get_pomodoro_page(get_sheets_service(), spreadsheet_id, int(limit), *page_cursor)
+    except HttpError as e:
+        return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+    if page is None:
+        return jsonify({"error": "cursor is no longer valid, start again from the first page"}), HTTPStatus.GONE
+    next_cursor = page["next"]
+    payload = {
+        "pomodoros": page["pomodoros"],
+        "next_cursor": f"{next_cursor['row']}:{next_cursor['id']}" if next_cursor else None,
+    }
+    return tag_sheet_data(jsonify(payload), etag)
+
+
 @app.route("/api/sheets/pomodoros", methods=["GET"])
 def proxy_get_pomodoros():
-    """Proxy read from Google Sheets - stateless, credentials from request."""
+    """Proxy read from Google Sheets - stateless, credentials from request.
+
+    With ?since_row=N&since_id=ID only rows appended after that cursor are returned, as
+    {'pomodoros': [...], 'cursor': {...}, 'full': bool}. With ?limit=N one page is returned,
+    starting from the newest rows at the tail of the sheet, as {'pomodoros': [...],
+    'next_cursor': str or None}; pass next_cursor as ?cursor= for the next page. Responses carry
+    an ETag from the spreadsheet's Drive version; a matching If-None-Match gets a 304 without
+    reading the sheet.
+    """
     if not is_logged_in():
         return jsonify({"error": "Not logged in"}), HTTPStatus.UNAUTHORIZED
+    if "limit" in request.args:
+        return get_pomodoro_page_response()
+
+    since_row = request.args.get("since_row")
+    if since_row is not None and not since_row.isdigit():
+        return jsonify({"error": "since_row must be a row number"}), HTTPStatus.BAD_REQUEST
 
     try:
+        spreadsheet_id = get_spreadsheet_id_from_request()
+        etag = get_sheet_etag(spreadsheet_id)
+        if is_not_modified(etag):
+            return not_modified(etag)
         service = get_sheets_service()
+        if since_row is not None:
+            # Delta pull: only rows appended after the client's cursor
+            payload = sheets_storage.get_pomodoros_since(
+                service, spreadsheet_id, int(since_row), request.args.get("since_id")
+            )
+        else:
+            start_date = request.args.get("start_date")
+            end_date = request.args.get("end_date")
+            payload = sheets_storage.get_pomodoros(service, spreadsheet_id, start_date, end_date)
+        return tag_sheet_data(jsonify(payload), etag)
+    except HttpError as e:
+        return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+@app.route("/api/sheets/snapshot")
+def proxy_get_snapshot():
+    """Read pomodoros and settings from Google Sheets in one call - stateless.
+
+    Takes the same optional ?since_row=N&since_id=ID cursor as GET /api/sheets/pomodoros and
+    returns that delta plus 'settings'. Conditional like GET /api/sheets/pomodoros.
+    """
+    if not is_logged_in():
+        return jsonify({"error": "Not logged in"}), HTTPStatus.UNAUTHORIZED
+
+    since_row = request.args.get("since_row", "0")
+    if not since_row.isdigit():
+        return jsonify({"error": "since_row must be a row number"}), HTTPStatus.BAD_REQUEST
+
+    try:
         spreadsheet_id = get_spreadsheet_id_from_request()
-        start_date = request.args.get("start_date")
-        end_date = request.args.get("end_date")
-        pomodoros = sheets_storage.get_pomodoros(service, spreadsheet_id, start_date, end_date)
-        return jsonify(pomodoros)
+        etag = get_sheet_etag(spreadsheet_id)
+        if is_not_modified(etag):
+            return not_modified(etag)
+        service = get_sheets_service()
+        snapshot = sheets_storage.get_snapshot(
+            service, spreadsheet_id, DEFAULT_SETTINGS, int(since_row), request.args.get("since_id")
+        )
+        return tag_sheet_data(jsonify(snapshot), etag)
+    except HttpError as e:
+        return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+def parse_report_args():
+    """Validate the query of GET /api/sheets/report.
+
+    Returns:
+        (args, None) with start/end dates, tz (ZoneInfo) and week_start, or (None, error message).
+    """
+    start_date = request.args.get("start_date", "")
+    end_date = request.args.get("end_date", "")
+    start_ms = sheets_storage.parse_timestamp_ms(start_date)
+    end_ms = sheets_storage.parse_timestamp_ms(end_date)
+    if sheets_storage.MISSING_TIMESTAMP in (start_ms, end_ms) or end_ms < start_ms:
+        return None, "start_date and end_date must be ISO 8601 timestamps, start first"
+    if (end_ms - start_ms) // 86_400_000 > MAX_REPORT_DAYS:
+        return None, f"reports can cover at most {MAX_REPORT_DAYS} days"
+    try:
+        tz = ZoneInfo(request.args.get("tz", "UTC"))
+    except (ZoneInfoNotFoundError, ValueError):
+        return None, "tz must be an IANA time zone name"
+    week_start = request.args.get("week_start", "0")
+    if week_start not in tuple("0123456"):
+        return None, "week_start must be 0 (Sunday) to 6 (Saturday)"
+    args = {"start_date": start_date, "end_date": end_date, "tz": tz, "week_start": int(week_start)}
+    args["days"] = sheets_storage.local_days(start_ms, end_ms, tz)
+    return args, None
+
+
+@app.route("/api/sheets/report")
+def proxy_get_report():
+    """Report totals for a date range, aggregated server-side - stateless.
+
+    Takes ?start_date=&end_date= (ISO 8601), ?tz= (IANA zone the days are counted in, default
+    UTC) and ?week_start= (0 = Sunday). Returns total_minutes, total_pomodoros, by_type, and
+    daily_totals, daily_by_type and weekly_totals series; conditional like the other reads.
+    """
+    if not is_logged_in():
+        return jsonify({"error": "Not logged in"}), HTTPStatus.UNAUTHORIZED
+
+    args, error = parse_report_args()
+    if error:
+        return jsonify({"error": error}), HTTPStatus.BAD_REQUEST
+
+    try:
+        spreadsheet_id = get_spreadsheet_id_from_request()
+        etag = get_sheet_etag(spreadsheet_id)
+        if is_not_modified(etag):
+            return not_modified(etag)
+        table, positions = sheets_storage.get_pomodoro_table(
+            get_sheets_service(), spreadsheet_id, args["start_date"], args["end_date"]
+        )
+        report = sheets_storage.summarize_pomodoros(table, positions, args["days"], args["tz"], args["week_start"])
+        return tag_sheet_data(jsonify(report), etag)
     except HttpError as e:
         return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
@@ -685,11 +1446,8 @@ def proxy_get_pomodoro_count():
 
 
 def get_request_data():
-    """Get request JSON data, stripping _credentials if present."""
-    request_body = request.json
-    if request_body and "_credentials" in request_body:
-        request_body = {k: v for k, v in request_body.items() if k != "_credentials"}
-    return request_body
+    """Get request JSON data, with _credentials stripped."""
+    return get_request_auth().payload
 
 
 @app.route("/api/sheets/pomodoros", methods=["POST"])
@@ -743,6 +1501,31 @@ def proxy_create_pomodoros_batch():
         return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 
+@app.route("/api/sheets/sync", methods=["POST"])
+def proxy_sync_pomodoros():
+    """Apply a batch of queued pomodoro operations to Google Sheets - stateless."""
+    if not is_logged_in():
+        return jsonify({"error": "Not logged in"}), HTTPStatus.UNAUTHORIZED
+
+    try:
+        service = get_sheets_service()
+        if not service:
+            return jsonify({"error": "Failed to create Sheets service"}), HTTPStatus.UNAUTHORIZED
+        spreadsheet_id = get_spreadsheet_id_from_request()
+        if not spreadsheet_id:
+            return jsonify({"error": "No spreadsheet ID provided"}), HTTPStatus.BAD_REQUEST
+        sync_request = get_request_data() or {}
+        operations = sync_request.get("operations", [])
+        if not isinstance(operations, list) or len(operations) > MAX_SYNC_OPERATIONS:
+            return jsonify(
+                {"error": f"operations must be a list of at most {MAX_SYNC_OPERATIONS} items"}
+            ), HTTPStatus.BAD_REQUEST
+        results = sheets_storage.apply_sync_operations(service, spreadsheet_id, operations)
+        return jsonify({"status": "ok", "results": results})
+    except HttpError as e:
+        return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+
 @app.route("/api/sheets/pomodoros/<pomodoro_id>", methods=["PUT"])
 def proxy_update_pomodoro(pomodoro_id):
     """Proxy update to Google Sheets - stateless, credentials from request."""
@@ -780,15 +1563,18 @@ def proxy_delete_pomodoro(pomodoro_id):
 
 @app.route("/api/sheets/settings", methods=["GET"])
 def proxy_get_settings():
-    """Proxy settings read from Google Sheets - stateless."""
+    """Proxy settings read from Google Sheets - stateless, conditional on If-None-Match."""
     if not is_logged_in():
         return jsonify({"error": "Not logged in"}), HTTPStatus.UNAUTHORIZED
 
     try:
-        service = get_sheets_service()
         spreadsheet_id = get_spreadsheet_id_from_request()
+        etag = get_sheet_etag(spreadsheet_id)
+        if is_not_modified(etag):
+            return not_modified(etag)
+        service = get_sheets_service()
         settings = sheets_storage.get_settings(service, spreadsheet_id, DEFAULT_SETTINGS)
-        return jsonify(settings)
+        return tag_sheet_data(jsonify(settings), etag)
     except HttpError as e:
         return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
@@ -813,47 +1599,278 @@ def proxy_save_settings():
 
 @app.route("/api/sheets/deduplicate", methods=["POST"])
 def proxy_deduplicate_pomodoros():
-    """Remove duplicate pomodoros from Google Sheets - stateless."""
+    """Remove duplicate pomodoros from Google Sheets - stateless.
+
+    An optional "mode" in the body ("auto", "ranges" or "compact") picks how duplicates are removed.
+    """
     if not is_logged_in():
         return jsonify({"error": "Not logged in"}), HTTPStatus.UNAUTHORIZED
 
+    body = get_request_data()
+    mode = body.get("mode", "auto") if isinstance(body, dict) else "auto"
+    if mode not in sheets_storage.DEDUPE_MODES:
+        modes = ", ".join(sheets_storage.DEDUPE_MODES)
+        return jsonify({"error": f"mode must be one of: {modes}"}), HTTPStatus.BAD_REQUEST
+
     try:
         service = get_sheets_service()
         spreadsheet_id = get_spreadsheet_id_from_request()
-        dedup_result = sheets_storage.deduplicate_pomodoros(service, spreadsheet_id)
+        dedup_result = sheets_storage.deduplicate_pomodoros(service, spreadsheet_id, mode=mode)
         return jsonify(dedup_result)
     except HttpError as e:
         return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
 
+def export_notes(table):
+    """Return a table's notes column with missing notes as empty strings, as exports expect."""
+    return [notes if notes is not None else "" for notes in table.notes]
+
+
+def iter_export_csv(first_chunk, remaining_chunks):
+    """Yield CSV text for chunks of raw Pomodoros rows, one chunk at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC, lineterminator="\n")
+    buffer.write(CSV_EXPORT_HEADER + "\n")
+
+    for chunk in itertools.chain([first_chunk], remaining_chunks):
+        table = sheets_storage.PomodoroTable.from_rows(chunk)
+        writer.writerows(
+            zip(
+                table.ids,
+                table.names,
+                table.types,
+                table.start_times,
+                table.end_times,
+                table.durations,
+                export_notes(table),
+                strict=True,
+            )
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def iter_export_ndjson(first_chunk, remaining_chunks):
+    """Yield newline-delimited JSON for chunks of raw Pomodoros rows, one object per pomodoro.
+
+    Timestamps are passed through as stored; duration_minutes is emitted as a number.
+    """
+    for chunk in itertools.chain([first_chunk], remaining_chunks):
+        table = sheets_storage.PomodoroTable.from_rows(chunk)
+        lines = []
+        for position, notes in enumerate(export_notes(table)):
+            record = {**table.record(position), "notes": notes}
+            lines.append(json.dumps(record) + "\n")
+        yield "".join(lines)
+
+
+def get_arrow_export_schema():
+    """Return the Arrow schema for columnar exports (requires pyarrow)."""
+    timestamp = pa.timestamp("ms", tz="UTC")
+    return pa.schema(
+        [
+            ("id", pa.string()),
+            ("name", pa.string()),
+            ("type", pa.dictionary(pa.int32(), pa.string())),
+            ("start_time", timestamp),
+            ("end_time", timestamp),
+            ("duration_minutes", pa.int32()),
+            ("notes", pa.string()),
+        ]
+    )
+
+
+def arrow_timestamps(epoch_ms, arrow_type):
+    """Convert a PomodoroTable epoch-milliseconds column to an Arrow timestamp array."""
+    missing = pa.array([value == sheets_storage.MISSING_TIMESTAMP for value in epoch_ms], pa.bool_())
+    return pa.array(epoch_ms, pa.int64(), mask=missing).cast(arrow_type)
+
+
+def pomodoro_record_batch(rows, schema):
+    """Build an Arrow record batch from raw Pomodoros rows, one typed column at a time."""
+    table = sheets_storage.PomodoroTable.from_rows(rows)
+    arrays = [
+        pa.array(table.ids, pa.string()),
+        pa.array(table.names, pa.string()),
+        pa.array(table.types, pa.string()).dictionary_encode(),
+        arrow_timestamps(table.start_ms, schema.field("start_time").type),
+        arrow_timestamps(table.end_ms, schema.field("end_time").type),
+        pa.array(table.durations, pa.int32()),
+        pa.array(export_notes(table), pa.string()),
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def iter_export_columnar(first_chunk, remaining_chunks, export_format):
+    """Yield a Parquet file or Arrow IPC stream for chunks of raw Pomodoros rows.
+
+    Each sheet chunk becomes one Parquet row group or Arrow record batch, and the bytes written
+    for it are yielded before the next chunk is read.
+    """
+    schema = get_arrow_export_schema()
+    sink = io.BytesIO()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    def drain():
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    for chunk in itertools.chain([first_chunk], remaining_chunks):
+        writer.write_batch(pomodoro_record_batch(chunk, schema))
+        yield drain()
+    writer.close()
+    yield drain()
+
+
+def get_export_format():
+    """Pick the export format from ?format=, falling back to the Accept header (CSV by default).
+
+    Returns:
+        A key of EXPORT_MIMETYPES, or None if ?format= names an unknown format.
+    """
+    requested = request.args.get("format")
+    if requested:
+        return requested.lower() if requested.lower() in EXPORT_MIMETYPES else None
+    mimetype = request.accept_mimetypes.best_match(EXPORT_MIMETYPES.values(), default="text/csv")
+    return next(name for name, value in EXPORT_MIMETYPES.items() if value == mimetype)
+
+
 @app.route("/api/sheets/export")
-def proxy_export_csv():
-    """Export pomodoros as CSV from Google Sheets - stateless."""
+def proxy_export():
+    """Export pomodoros from Google Sheets as CSV, NDJSON, Parquet or Arrow - stateless.
+
+    The sheet is read and written out in chunks, in sheet order, so memory use stays bounded
+    however large the history is. Parquet and Arrow exports carry typed columns (UTC timestamps,
+    integer duration, dictionary-encoded type) and need pyarrow installed on the server.
+    """
     if not is_logged_in():
         return jsonify({"error": "Not logged in"}), HTTPStatus.UNAUTHORIZED
 
+    export_format = get_export_format()
+    if export_format is None:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_MIMETYPES)}"}), HTTPStatus.BAD_REQUEST
+    if export_format in COLUMNAR_EXPORT_FORMATS and pa is None:
+        return jsonify({"error": f"{export_format} export requires pyarrow"}), HTTPStatus.NOT_IMPLEMENTED
+
     try:
         service = get_sheets_service()
         spreadsheet_id = get_spreadsheet_id_from_request()
-        pomodoros = sheets_storage.get_pomodoros(service, spreadsheet_id)
-
-        lines = ["id,name,type,start_time,end_time,duration_minutes,notes"]
-        for p in pomodoros:
-            name = (p["name"] or "").replace('"', '""')
-            notes = (p.get("notes") or "").replace('"', '""')
-            lines.append(
-                f'"{p["id"]}","{name}","{p["type"]}","{p["start_time"]}",'
-                f'"{p["end_time"]}",{p["duration_minutes"]},"{notes}"'
-            )
-
-        return Response(
-            "\n".join(lines),
-            mimetype="text/csv",
-            headers={"Content-Disposition": "attachment;filename=pomodoros.csv"},
-        )
+        chunks = sheets_storage.iter_pomodoro_row_chunks(service, spreadsheet_id)
+        # Read the first chunk before streaming so Sheets errors still get a JSON error response
+        first_chunk = next(chunks, [])
     except HttpError as e:
         return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
+    if export_format in COLUMNAR_EXPORT_FORMATS:
+        body = iter_export_columnar(first_chunk, chunks, export_format)
+    elif export_format == "ndjson":
+        body = iter_export_ndjson(first_chunk, chunks)
+    else:
+        body = iter_export_csv(first_chunk, chunks)
+
+    response = Response(
+        body,
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers={"Content-Disposition": f"attachment;filename=pomodoros.{export_format}"},
+    )
+    # The body keeps reading from Sheets after the request context is torn down, so the pooled
+    # transport and the admission slot are only returned once the stream is closed
+    http = g.pop("google_http", None)
+    if http is not None:
+        response.call_on_close(functools.partial(release_http, http))
+    admission_key = g.pop("admission_key", None)
+    if admission_key is not None:
+        response.call_on_close(functools.partial(release_admission, admission_key))
+    return response
+
+
+def format_change_event(change):
+    """Serialize a change notification as a server-sent event."""
+    return f"event: change\ndata: {json.dumps(change)}\n\n"
+
+
+def iter_change_events(subscriber, drive_service, spreadsheet_id, version):
+    """Stream change notifications for a spreadsheet until CHANGE_FEED_STREAM_SECONDS pass.
+
+    Writes through this worker arrive on the subscriber queue. Every
+    CHANGE_FEED_VERSION_CHECK_SECONDS the Drive version is compared with the last one seen, which
+    catches edits in the Sheets UI or through other workers; a version bump right after a write
+    this stream already announced isn't announced again.
+    """
+    yield f"retry: {CHANGE_FEED_RETRY_MS}\n\n"
+    now = time.monotonic()
+    deadline = now + CHANGE_FEED_STREAM_SECONDS
+    next_version_check = now + CHANGE_FEED_VERSION_CHECK_SECONDS
+    announced_write = False
+    while time.monotonic() < deadline:
+        try:
+            change = subscriber.get(timeout=CHANGE_FEED_KEEPALIVE_SECONDS)
+        except queue.Empty:
+            change = None
+        if change is not None:
+            announced_write = True
+            yield format_change_event(change)
+
+        if time.monotonic() >= next_version_check:
+            next_version_check = time.monotonic() + CHANGE_FEED_VERSION_CHECK_SECONDS
+            latest = get_spreadsheet_version(drive_service, spreadsheet_id)
+            if latest is not None and latest != version:
+                if not announced_write:
+                    yield format_change_event({"kind": "all", "source": "version"})
+                version = latest
+            announced_write = False
+
+        if change is None:
+            yield ": keepalive\n\n"
+
+
+@app.route("/api/sheets/events")
+def proxy_change_events():
+    """Server-sent change notifications for the caller's spreadsheet - stateless.
+
+    Emits a 'change' event ({"kind": "pomodoros" | "settings" | "all", "source": "write" |
+    "version"}) whenever a write goes through this worker or the Drive version moves, so clients
+    can pull a delta only when something changed. Streams end after CHANGE_FEED_STREAM_SECONDS
+    and the client reconnects. Answers 404 unless CHANGE_FEED_ENABLED (reported by
+    /api/auth/status as "change_feed").
+    """
+    if not CHANGE_FEED_ENABLED:
+        return jsonify({"error": "Change feed is not enabled on this server"}), HTTPStatus.NOT_FOUND
+    if not is_logged_in():
+        return jsonify({"error": "Not logged in"}), HTTPStatus.UNAUTHORIZED
+
+    spreadsheet_id = get_spreadsheet_id_from_request()
+    subscriber = subscribe_changes(spreadsheet_id)
+    if subscriber is None:
+        response = jsonify({"error": "Too many change feeds open, retry shortly"})
+        response.status_code = HTTPStatus.TOO_MANY_REQUESTS
+        response.headers["Retry-After"] = str(CHANGE_FEED_RETRY_MS // 1000)
+        return response
+
+    drive_service = get_drive_service()
+    version = get_spreadsheet_version(drive_service, spreadsheet_id)
+    response = Response(
+        iter_change_events(subscriber, drive_service, spreadsheet_id, version),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+    response.call_on_close(functools.partial(unsubscribe_changes, spreadsheet_id, subscriber))
+    # The stream is idle nearly all the time, so it doesn't count against admission control;
+    # its pooled transport stays checked out for version checks until the stream is closed
+    admission_key = g.pop("admission_key", None)
+    if admission_key is not None:
+        release_admission(admission_key)
+    http = g.pop("google_http", None)
+    if http is not None:
+        response.call_on_close(functools.partial(release_http, http))
+    return response
+
 
 @app.route("/api/sheets/clear", methods=["POST"])
 def proxy_clear_sheets():
@@ -866,44 +1883,39 @@ def proxy_clear_sheets():
         spreadsheet_id = get_spreadsheet_id_from_request()
 
         # Get the sheet ID for Pomodoros sheet
-        spreadsheet = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-        pomodoros_sheet_id = None
-        for sheet in spreadsheet["sheets"]:
-            if sheet["properties"]["title"] == "Pomodoros":
-                pomodoros_sheet_id = sheet["properties"]["sheetId"]
-                break
-
+        pomodoros_sheet_id = sheets_storage.get_sheet_id(service, spreadsheet_id)
         if pomodoros_sheet_id is None:
             return jsonify({"error": "Pomodoros sheet not found"}), HTTPStatus.NOT_FOUND
 
-        # Get current row count
+        # Size the delete from the data rows: deleting every grid row below a frozen header fails
         values = service.spreadsheets().values().get(spreadsheetId=spreadsheet_id, range="Pomodoros!A:A").execute()
-        row_count = len(values.get("values", []))
+        id_rows = values.get("values", [])
+        row_count = len(id_rows)
 
         if row_count <= 1:
             # Only header or empty, nothing to clear
             return jsonify({"status": "ok", "cleared": 0})
 
         # Delete all data rows (keep header at row 1)
-        service.spreadsheets().batchUpdate(
-            spreadsheetId=spreadsheet_id,
-            body={
-                "requests": [
-                    {
-                        "deleteDimension": {
-                            "range": {
-                                "sheetId": pomodoros_sheet_id,
-                                "dimension": "ROWS",
-                                "startIndex": 1,  # After header
-                                "endIndex": row_count,
-                            }
+        sheets_storage.run_structural_update(
+            service,
+            spreadsheet_id,
+            [
+                {
+                    "deleteDimension": {
+                        "range": {
+                            "sheetId": pomodoros_sheet_id,
+                            "dimension": "ROWS",
+                            "startIndex": 1,  # After header
+                            "endIndex": row_count,
                         }
                     }
-                ]
-            },
-        ).execute()
+                }
+            ],
+        )
+        sheets_storage.invalidate_row_index(spreadsheet_id)
 
-        return jsonify({"status": "ok", "cleared": row_count - 1})
+        return jsonify({"status": "ok", "cleared": sum(1 for row in id_rows[1:] if row and row[0])})
     except HttpError as e:
         return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
 
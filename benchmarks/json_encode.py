@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Benchmark JSON encoding of pomodoro lists with the orjson and stdlib Flask providers.
+
+Run from the repository root:
+
+    python benchmarks/json_encode.py [--pomodoros 10000] [--repeat 20]
+
+Prints the best time to build a jsonify() response for the list that
+sheets_storage.get_pomodoros returns, per provider.
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("FLASK_SECRET_KEY", "benchmark-secret-key")
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+import sheets_storage  # noqa: E402
+from app import OrjsonProvider, app, orjson  # noqa: E402
+
+
+def make_pomodoros(count):
+    """Build the list get_pomodoros would return for a sheet of count rows."""
+    rows = [
+        [
+            f"00000000-0000-4000-8000-{i:012d}",
+            f"Task {i % 50}",
+            ("Content", "Product", "Team")[i % 3],
+            f"2024-01-{1 + i % 28:02d}T{i % 24:02d}:00:00.000Z",
+            f"2024-01-{1 + i % 28:02d}T{i % 24:02d}:25:00.000Z",
+            "25",
+            "notes" if i % 4 == 0 else "",
+        ]
+        for i in range(count)
+    ]
+    table = sheets_storage.PomodoroTable.from_rows(rows)
+    return table.records(table.select())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pomodoros", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pomodoros = make_pomodoros(args.pomodoros)
+    providers = {"stdlib": DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers["orjson"] = OrjsonProvider(app)
+
+    with app.app_context():
+        for name, provider in providers.items():
+            best = min(timeit.repeat(lambda p=provider: p.response(pomodoros), number=1, repeat=args.repeat))
+            print(f"{name:>6}: {best * 1000:8.2f} ms per {args.pomodoros} pomodoros")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Quota-aware transport for Google API calls.
+
+Wraps the per-request authorized httplib2 transport so every Sheets (and Drive) call is
+rate-limited by a token bucket per spreadsheet and per user, and retried with exponential,
+jittered backoff on 429 and 5xx responses, honouring Retry-After.
+"""
+
+import email.utils
+import logging
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Sustained request rates per worker. Google's default Sheets quota is 60 requests per minute
+# per user per project; bursts up to the burst size go through without waiting.
+USER_REQUESTS_PER_MINUTE = float(os.environ.get("SHEETS_USER_REQUESTS_PER_MINUTE", "60"))
+SPREADSHEET_REQUESTS_PER_MINUTE = float(os.environ.get("SHEETS_SPREADSHEET_REQUESTS_PER_MINUTE", "60"))
+BURST_REQUESTS = int(os.environ.get("SHEETS_BURST_REQUESTS", "20"))
+
+# Longest a call waits for a token before going ahead anyway (Google's 429 then takes over)
+MAX_THROTTLE_WAIT_SECONDS = 10.0
+
+# Retry policy: attempt n (0-based) sleeps a random time up to BACKOFF_BASE * 2**n, capped
+MAX_RETRIES = int(os.environ.get("SHEETS_MAX_RETRIES", "4"))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 16.0
+# A Retry-After longer than this is not worth holding the request for; the error is returned
+MAX_RETRY_AFTER_SECONDS = 30.0
+
+_RATE_LIMITED_STATUS = 429
+_RETRYABLE_SERVER_STATUSES = frozenset({500, 502, 503, 504})
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+# POST endpoints that are safe to repeat (reads, overwrites and clears, but not appends)
+_IDEMPOTENT_POST_PATHS = re.compile(r"/values(?::batchGet|:batchUpdate|:batchClear|/[^/?]+:clear)(?:\?|$)")
+_SPREADSHEET_ID = re.compile(r"/spreadsheets/([^/:?]+)")
+
+# Buckets idle long enough to be full again are dropped once there are this many
+_MAX_BUCKETS = 1000
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+_stats = {
+    "calls": 0,
+    "throttled": 0,
+    "throttle_wait_seconds": 0.0,
+    "rate_limited": 0,
+    "server_errors": 0,
+    "retried": 0,
+    "gave_up": 0,
+}
+_stats_lock = threading.Lock()
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def get_stats():
+    """Return this worker's call counters (a copy)."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset():
+    """Drop all token buckets and zero the counters."""
+    with _buckets_lock:
+        _buckets.clear()
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def _refilled_tokens(bucket, now):
+    """Tokens a bucket holds at time now, after refilling since it was last touched."""
+    return min(float(BURST_REQUESTS), bucket["tokens"] + (now - bucket["at"]) * bucket["rate"])
+
+
+def _reserve(key, per_minute):
+    """Take a token from the bucket for key, returning how long the caller must wait for it.
+
+    Tokens are reserved even when the bucket is empty (it goes negative), so concurrent callers
+    queue up behind each other instead of all waking at once. A wait longer than
+    MAX_THROTTLE_WAIT_SECONDS isn't reserved and returns 0.
+    """
+    now = time.monotonic()
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            if len(_buckets) >= _MAX_BUCKETS:
+                for idle in [k for k, b in _buckets.items() if _refilled_tokens(b, now) >= BURST_REQUESTS]:
+                    del _buckets[idle]
+            bucket = _buckets[key] = {"tokens": float(BURST_REQUESTS), "at": now, "rate": per_minute / 60}
+        bucket["tokens"] = _refilled_tokens(bucket, now)
+        bucket["at"] = now
+        wait = max(0.0, (1 - bucket["tokens"]) / bucket["rate"])
+        if wait > MAX_THROTTLE_WAIT_SECONDS:
+            return 0.0
+        bucket["tokens"] -= 1
+        return wait
+
+
+def throttle(user_key, spreadsheet_id):
+    """Wait until both the user's and the spreadsheet's bucket allow another call."""
+    wait = _reserve(("user", user_key), USER_REQUESTS_PER_MINUTE)
+    if spreadsheet_id:
+        wait = max(wait, _reserve(("spreadsheet", spreadsheet_id), SPREADSHEET_REQUESTS_PER_MINUTE))
+    if wait > 0:
+        _count("throttled")
+        _count("throttle_wait_seconds", wait)
+        time.sleep(wait)
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or an HTTP date) into seconds, or None."""
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value.strip())
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for a 0-based retry attempt."""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt))
+
+
+def is_idempotent(method, uri):
+    """Whether repeating a request after a server error can't apply it twice."""
+    return method.upper() in _IDEMPOTENT_METHODS or bool(_IDEMPOTENT_POST_PATHS.search(uri))
+
+
+class QuotaAwareHttp:
+    """httplib2-compatible wrapper adding rate limiting and retries to an authorized transport.
+
+    429s are always retried since Google rejected the call without applying it. 5xx responses
+    are only retried for idempotent calls, so an append that may have landed is never repeated.
+    """
+
+    def __init__(self, http, user_key):
+        self.http = http
+        self.user_key = user_key
+
+    def __getattr__(self, name):
+        return getattr(self.http, name)
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        spreadsheet_match = _SPREADSHEET_ID.search(uri)
+        spreadsheet_id = spreadsheet_match.group(1) if spreadsheet_match else None
+        attempt = 0
+        while True:
+            throttle(self.user_key, spreadsheet_id)
+            _count("calls")
+            response, content = self.http.request(uri, method, body=body, headers=headers, **kwargs)
+
+            delay = self._retry_delay(response, method, uri, attempt)
+            if delay is None:
+                return response, content
+
+            _count("retried")
+            logger.warning(f"Google API {method} returned {response.status}, retry {attempt + 1} in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    def _retry_delay(self, response, method, uri, attempt):
+        """Return how long to wait before retrying this response, or None to return it as is."""
+        if response.status == _RATE_LIMITED_STATUS:
+            _count("rate_limited")
+        elif response.status in _RETRYABLE_SERVER_STATUSES:
+            _count("server_errors")
+            if not is_idempotent(method, uri):
+                return None
+        else:
+            return None
+
+        retry_after = parse_retry_after(response.get("retry-after"))
+        if attempt >= MAX_RETRIES or (retry_after or 0) > MAX_RETRY_AFTER_SECONDS:
+            _count("gave_up")
+            return None
+        return retry_after if retry_after is not None else backoff_delay(attempt)
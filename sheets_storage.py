@@ -1,259 +1,1292 @@
 """Google Sheets storage backend for Acquacotta."""
 
 import json
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+
+from googleapiclient.errors import HttpError
 
 # Column counts for Sheets data validation
 POMODORO_MIN_COLUMNS = 6  # id, name, type, start_time, end_time, duration_minutes
 POMODORO_TOTAL_COLUMNS = 7  # includes optional notes column
 SETTINGS_MIN_COLUMNS = 2  # key, value
+FIRST_DATA_ROW = 2  # row 1 holds the column headers
 
+# Updatable pomodoro fields, in sheet column order starting at column B (column A is the ID)
+POMODORO_UPDATABLE_FIELDS = ("name", "type", "start_time", "end_time", "duration_minutes", "notes")
+_POMODORO_COLUMN_LETTERS = "ABCDEFG"
+_START_TIME_COLUMN = 3  # column D
 
-def get_pomodoros(sheets_service, spreadsheet_id, start_date=None, end_date=None):
-    """Get pomodoros from Google Sheets."""
-    sheets_response = (
+# Fields a create operation must carry to become a sheet row (notes is optional)
+SYNC_REQUIRED_FIELDS = ("name", "type", "start_time", "end_time", "duration_minutes")
+
+# Process-local ID -> row index cache, one entry per spreadsheet.
+# Entries are rebuilt from a full ID column read after this many seconds so edits
+# made outside this worker (other workers, the Sheets UI) are eventually picked up.
+# The start_time block index below expires on the same schedule.
+ROW_INDEX_CACHE_TTL_SECONDS = 300
+
+# Rows per block in the sparse start_time index used to narrow date-range reads
+START_TIME_BLOCK_ROWS = 256
+
+# Rows fetched per Sheets read when streaming an export
+EXPORT_CHUNK_ROWS = 1000
+
+# Rows per read when the first page has to find the last data row by scanning up from the end
+# of the grid (blank grid rows sit below the data, 1000 rows' worth on a new sheet)
+PAGE_TAIL_SCAN_ROWS = 1000
+
+# deduplicate_pomodoros(mode="auto") rewrites the whole data area once duplicates make up at
+# least this fraction of the rows; below it, deleting merged row ranges is cheaper
+DEDUPE_COMPACT_RATIO = 0.25
+DEDUPE_MODES = ("auto", "ranges", "compact")
+
+# Sheet metadata (sheetId, grid size) only changes when sheets are added or renamed
+SHEET_METADATA_TTL_SECONDS = 3600
+_SHEET_METADATA_FIELDS = "sheets.properties(sheetId,title)"
+
+# Epoch value stored in PomodoroTable for timestamps that don't parse; sorts after every real one
+MISSING_TIMESTAMP = -(2**63)
+
+# Matches the row numbers in an A1 range such as "Pomodoros!A12:G14"
+_UPDATED_RANGE_ROWS = re.compile(r"![A-Z]+(\d+)(?::[A-Z]+(\d+))?$")
+
+_row_index_cache = {}
+_start_time_index_cache = {}
+_sheet_metadata_cache = {}
+_cache_lock = threading.Lock()
+
+
+def clear_caches():
+    """Drop all process-local spreadsheet caches."""
+    with _cache_lock:
+        _row_index_cache.clear()
+        _start_time_index_cache.clear()
+        _sheet_metadata_cache.clear()
+
+
+def invalidate_row_index(spreadsheet_id):
+    """Forget every cached row position (ID index and start_time blocks) for a spreadsheet."""
+    with _cache_lock:
+        _row_index_cache.pop(spreadsheet_id, None)
+        _start_time_index_cache.pop(spreadsheet_id, None)
+
+
+def _store_row_index(spreadsheet_id, id_rows, first_row=1):
+    """Cache the ID -> row mapping from a column read starting at first_row (1-indexed).
+
+    Only the first occurrence of each ID is kept, matching the linear scans it replaces.
+    """
+    rows = {}
+    for offset, row in enumerate(id_rows):
+        if row and row[0] not in rows:
+            rows[row[0]] = first_row + offset
+    entry = {
+        "rows": rows,
+        "row_count": first_row - 1 + len(id_rows),
+        "loaded_at": time.monotonic(),
+    }
+    with _cache_lock:
+        _row_index_cache[spreadsheet_id] = entry
+    return entry
+
+
+def _cached_row_index(spreadsheet_id):
+    """Return the cached row index for a spreadsheet, or None if missing or expired."""
+    with _cache_lock:
+        entry = _row_index_cache.get(spreadsheet_id)
+        if entry and time.monotonic() - entry["loaded_at"] > ROW_INDEX_CACHE_TTL_SECONDS:
+            del _row_index_cache[spreadsheet_id]
+            entry = None
+    return entry
+
+
+def _read_id_column(sheets_service, spreadsheet_id):
+    """Read the full Pomodoros ID column, header included (row 1 is index 0)."""
+    id_lookup = (
         sheets_service.spreadsheets()
         .values()
         .get(
             spreadsheetId=spreadsheet_id,
-            range="Pomodoros!A2:G",
+            range="Pomodoros!A:A",
         )
         .execute()
     )
+    return id_lookup.get("values", [])
 
-    rows = sheets_response.get("values", [])
-    pomodoros = []
 
-    for row in rows:
-        if len(row) < POMODORO_MIN_COLUMNS:
-            continue
-        pomo = {
-            "id": row[0],
-            "name": row[1],
-            "type": row[2],
-            "start_time": row[3],
-            "end_time": row[4],
-            "duration_minutes": int(row[5]),
-            "notes": row[6] if len(row) > POMODORO_MIN_COLUMNS else None,
+def _fetch_row_index(sheets_service, spreadsheet_id):
+    """Read the full ID column and rebuild the cached row index from it."""
+    return _store_row_index(spreadsheet_id, _read_id_column(sheets_service, spreadsheet_id))
+
+
+def _load_row_index(sheets_service, spreadsheet_id):
+    """Return the cached row index, reading the ID column only on a cache miss."""
+    entry = _cached_row_index(spreadsheet_id)
+    if entry is None:
+        entry = _fetch_row_index(sheets_service, spreadsheet_id)
+    return entry
+
+
+def _find_row(sheets_service, spreadsheet_id, pomodoro_id):
+    """Find the 1-indexed row holding pomodoro_id, or None if it doesn't exist.
+
+    A cache hit is confirmed by reading the single ID cell it points at; a mismatch means
+    rows moved underneath us, so the index is dropped and rebuilt from the full column.
+    """
+    entry = _cached_row_index(spreadsheet_id)
+    row_index = entry["rows"].get(pomodoro_id) if entry else None
+
+    if row_index is not None:
+        cell = (
+            sheets_service.spreadsheets()
+            .values()
+            .get(
+                spreadsheetId=spreadsheet_id,
+                range=f"Pomodoros!A{row_index}",
+            )
+            .execute()
+        )
+        cell_values = cell.get("values", [])
+        if cell_values and cell_values[0] and cell_values[0][0] == pomodoro_id:
+            return row_index
+
+    # Cache miss, or the cached row no longer holds this ID
+    entry = _fetch_row_index(sheets_service, spreadsheet_id)
+    return entry["rows"].get(pomodoro_id)
+
+
+def _appended_rows(append_response):
+    """Return the (first, last) 1-indexed rows written by values.append, or None."""
+    if not isinstance(append_response, dict):
+        return None
+    updated_range = append_response.get("updates", {}).get("updatedRange", "")
+    match = _UPDATED_RANGE_ROWS.search(updated_range)
+    if not match:
+        return None
+    first_row = int(match.group(1))
+    last_row = int(match.group(2) or first_row)
+    return first_row, last_row
+
+
+def _record_append(spreadsheet_id, ids, append_response):
+    """Extend the cached index after an append.
+
+    Returns True if the rows landed exactly where the cache expected them. Otherwise the
+    sheet changed outside this worker and the cached index is dropped.
+    """
+    appended = _appended_rows(append_response)
+    with _cache_lock:
+        entry = _row_index_cache.get(spreadsheet_id)
+        if entry is None:
+            return False
+        if appended is None or appended != (entry["row_count"] + 1, entry["row_count"] + len(ids)):
+            del _row_index_cache[spreadsheet_id]
+            return False
+        for offset, pomodoro_id in enumerate(ids):
+            entry["rows"].setdefault(pomodoro_id, appended[0] + offset)
+        entry["row_count"] = appended[1]
+    return True
+
+
+def _record_delete(spreadsheet_id, row_index):
+    """Shift the cached index after deleting a single 1-indexed row."""
+    with _cache_lock:
+        _start_time_index_cache.pop(spreadsheet_id, None)
+        entry = _row_index_cache.get(spreadsheet_id)
+        if entry is None:
+            return
+        entry["rows"] = {
+            pomodoro_id: row - 1 if row > row_index else row
+            for pomodoro_id, row in entry["rows"].items()
+            if row != row_index
         }
+        entry["row_count"] -= 1
+
+
+def _store_start_time_index(spreadsheet_id, start_times, last_id=None):
+    """Cache the min/max start_time of each block of START_TIME_BLOCK_ROWS rows.
 
-        # Filter by date if specified
-        if start_date and pomo["start_time"] < start_date:
+    start_times[i] is the start_time on sheet row FIRST_DATA_ROW + i ("" for incomplete rows).
+    Block spans are kept as epoch milliseconds, so timestamps written with different UTC offsets
+    compare correctly; rows whose start_time doesn't parse never match a date range and are left
+    out. Rows are mostly appended in chronological order, so most blocks cover a narrow time
+    span; out-of-order rows (e.g. manual entries for past days) just widen their block's span.
+    """
+    blocks = []
+    for offset in range(0, len(start_times), START_TIME_BLOCK_ROWS):
+        block_times = [
+            ms
+            for ms in map(parse_timestamp_ms, start_times[offset : offset + START_TIME_BLOCK_ROWS])
+            if ms != MISSING_TIMESTAMP
+        ]
+        if block_times:
+            first_row = FIRST_DATA_ROW + offset
+            last_row = first_row + min(START_TIME_BLOCK_ROWS, len(start_times) - offset) - 1
+            blocks.append([first_row, last_row, min(block_times), max(block_times)])
+    entry = {
+        "blocks": blocks,
+        "row_count": FIRST_DATA_ROW - 1 + len(start_times),
+        "last_id": last_id,
+        "loaded_at": time.monotonic(),
+    }
+    with _cache_lock:
+        _start_time_index_cache[spreadsheet_id] = entry
+    return entry
+
+
+def _cached_start_time_index(spreadsheet_id):
+    """Return the cached start_time index for a spreadsheet, or None if missing or expired."""
+    with _cache_lock:
+        entry = _start_time_index_cache.get(spreadsheet_id)
+        if entry and time.monotonic() - entry["loaded_at"] > ROW_INDEX_CACHE_TTL_SECONDS:
+            del _start_time_index_cache[spreadsheet_id]
+            entry = None
+    return entry
+
+
+def _fetch_start_time_index(sheets_service, spreadsheet_id):
+    """Read only the start_time column and build the block index from it."""
+    sheets_response = (
+        sheets_service.spreadsheets()
+        .values()
+        .get(
+            spreadsheetId=spreadsheet_id,
+            range="Pomodoros!D2:D",
+        )
+        .execute()
+    )
+    start_times = [row[0] if row else "" for row in sheets_response.get("values", [])]
+    return _store_start_time_index(spreadsheet_id, start_times)
+
+
+def _widen_start_time_block(spreadsheet_id, row_index, start_time):
+    """Keep the block index a superset after a row's start_time is rewritten."""
+    start_ms = parse_timestamp_ms(start_time)
+    if start_ms == MISSING_TIMESTAMP:
+        return
+    with _cache_lock:
+        entry = _start_time_index_cache.get(spreadsheet_id)
+        if entry is None:
+            return
+        for block in entry["blocks"]:
+            if block[0] <= row_index <= block[1]:
+                block[2] = min(block[2], start_ms)
+                block[3] = max(block[3], start_ms)
+                return
+        if row_index <= entry["row_count"]:
+            # The row sat in a block with no timestamps yet - start a single-row block for it
+            entry["blocks"].append([row_index, row_index, start_ms, start_ms])
+            entry["blocks"].sort()
+
+
+def _matching_block_ranges(entry, start_date, end_date):
+    """Return A1 ranges covering every indexed block that may hold rows in [start_date, end_date]."""
+    start_ms = parse_timestamp_ms(start_date) if start_date else None
+    end_ms = parse_timestamp_ms(end_date) if end_date else None
+    ranges = []
+    for first_row, last_row, min_start, max_start in entry["blocks"]:
+        if start_ms is not None and max_start < start_ms:
             continue
-        if end_date and pomo["start_time"] > end_date:
+        if end_ms is not None and min_start > end_ms:
             continue
+        if ranges and ranges[-1][1] == first_row - 1:
+            ranges[-1][1] = last_row  # Merge adjacent blocks into one range
+        else:
+            ranges.append([first_row, last_row])
+    return [f"Pomodoros!A{first_row}:G{last_row}" for first_row, last_row in ranges]
 
-        pomodoros.append(pomo)
-
-    # Sort by start_time descending
-    pomodoros.sort(key=lambda p: p["start_time"], reverse=True)
-    return pomodoros
 
+def _read_pomodoro_rows_in_range(sheets_service, spreadsheet_id, start_date, end_date):
+    """Read only the rows that can fall in a date range, using the start_time block index.
 
-def save_pomodoro(sheets_service, spreadsheet_id, pomodoro):
-    """Save a new pomodoro to Google Sheets (with duplicate check)."""
-    # First check if this ID already exists to prevent duplicates
-    id_lookup = (
+    One values.batchGet fetches the matching blocks, every row appended since the index was
+    built, and the ID on the last indexed row. If that ID changed, rows were deleted outside
+    this worker, so the index is dropped and all rows are read instead.
+    """
+    entry = _cached_start_time_index(spreadsheet_id) or _fetch_start_time_index(sheets_service, spreadsheet_id)
+    row_count = entry["row_count"]
+    ranges = [
+        f"Pomodoros!A{row_count}",
+        *_matching_block_ranges(entry, start_date, end_date),
+        f"Pomodoros!A{row_count + 1}:G",
+    ]
+    sheets_response = (
         sheets_service.spreadsheets()
         .values()
+        .batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=ranges,
+        )
+        .execute()
+    )
+    value_ranges = sheets_response.get("valueRanges", [])
+
+    sentinel = value_ranges[0].get("values", []) if value_ranges else []
+    last_id = sentinel[0][0] if sentinel and sentinel[0] else None
+    with _cache_lock:
+        index_moved = entry["last_id"] is not None and entry["last_id"] != last_id
+        if entry["last_id"] is None:
+            entry["last_id"] = last_id
+    if index_moved:
+        invalidate_row_index(spreadsheet_id)
+        return _read_all_pomodoro_rows(sheets_service, spreadsheet_id)
+
+    return [row for value_range in value_ranges[1:] for row in value_range.get("values", [])]
+
+
+def invalidate_sheet_metadata(spreadsheet_id):
+    """Forget the cached sheet properties for a spreadsheet."""
+    with _cache_lock:
+        _sheet_metadata_cache.pop(spreadsheet_id, None)
+
+
+def get_sheet_properties(sheets_service, spreadsheet_id):
+    """Return {title: properties} for each sheet (sheetId and title).
+
+    Only those fields are requested from spreadsheets.get, and the result is cached for
+    SHEET_METADATA_TTL_SECONDS instead of downloading the whole spreadsheet resource each time.
+    """
+    with _cache_lock:
+        entry = _sheet_metadata_cache.get(spreadsheet_id)
+    if entry and time.monotonic() - entry["loaded_at"] <= SHEET_METADATA_TTL_SECONDS:
+        return entry["sheets"]
+
+    spreadsheet = (
+        sheets_service.spreadsheets()
         .get(
             spreadsheetId=spreadsheet_id,
-            range="Pomodoros!A:A",
+            fields=_SHEET_METADATA_FIELDS,
         )
         .execute()
     )
+    sheets = {sheet["properties"]["title"]: sheet["properties"] for sheet in spreadsheet.get("sheets", [])}
+    with _cache_lock:
+        _sheet_metadata_cache[spreadsheet_id] = {"sheets": sheets, "loaded_at": time.monotonic()}
+    return sheets
 
-    existing_ids = id_lookup.get("values", [])
-    pomodoro_id = pomodoro["id"]
 
-    for row in existing_ids:
-        if row and row[0] == pomodoro_id:
-            # ID already exists, skip insert (could also update here)
-            return False
+def get_sheet_id(sheets_service, spreadsheet_id, title="Pomodoros"):
+    """Look up the numeric sheetId of a sheet by title (None if missing)."""
+    properties = get_sheet_properties(sheets_service, spreadsheet_id).get(title)
+    if properties is None:
+        # The sheet may have been added or renamed since the metadata was cached
+        invalidate_sheet_metadata(spreadsheet_id)
+        properties = get_sheet_properties(sheets_service, spreadsheet_id).get(title)
+    return properties["sheetId"] if properties else None
 
-    # ID doesn't exist, append new row
-    sheets_service.spreadsheets().values().append(
-        spreadsheetId=spreadsheet_id,
-        range="Pomodoros!A:G",
-        valueInputOption="RAW",
-        insertDataOption="INSERT_ROWS",
-        body={
-            "values": [
-                [
-                    pomodoro_id,
-                    pomodoro["name"],
-                    pomodoro["type"],
-                    pomodoro["start_time"],
-                    pomodoro["end_time"],
-                    pomodoro["duration_minutes"],
-                    pomodoro.get("notes") or "",
-                ]
-            ]
-        },
-    ).execute()
-    return True
 
+def get_sheet_row_count(sheets_service, spreadsheet_id, title="Pomodoros"):
+    """Return a sheet's grid row count (None if the sheet is missing).
 
-def save_pomodoros_batch(sheets_service, spreadsheet_id, pomodoros):
-    """Save multiple pomodoros to Google Sheets in a single request (with duplicate check)."""
-    if not pomodoros:
-        return 0
+    Appends grow the grid, so unlike the other sheet properties this is read fresh every time;
+    only the titles and row counts are requested.
+    """
+    spreadsheet = (
+        sheets_service.spreadsheets()
+        .get(
+            spreadsheetId=spreadsheet_id,
+            fields="sheets.properties(title,gridProperties.rowCount)",
+        )
+        .execute()
+    )
+    for sheet in spreadsheet.get("sheets", []):
+        properties = sheet["properties"]
+        if properties.get("title") == title:
+            return properties.get("gridProperties", {}).get("rowCount", 0)
+    return None
 
-    # First get all existing IDs
-    id_lookup = (
+
+def run_structural_update(sheets_service, spreadsheet_id, requests):
+    """Run a spreadsheets.batchUpdate that refers to sheets by sheetId.
+
+    A 400 usually means a cached sheetId is stale (sheet deleted or recreated), so the
+    metadata cache is dropped before the error is re-raised.
+    """
+    try:
+        return (
+            sheets_service.spreadsheets()
+            .batchUpdate(
+                spreadsheetId=spreadsheet_id,
+                body={"requests": requests},
+            )
+            .execute()
+        )
+    except HttpError as e:
+        if e.resp.status == HTTPStatus.BAD_REQUEST:
+            invalidate_sheet_metadata(spreadsheet_id)
+        raise
+
+
+def _delete_row(sheets_service, spreadsheet_id, sheet_id, row_index):
+    """Delete a single 1-indexed row from the Pomodoros sheet."""
+    run_structural_update(sheets_service, spreadsheet_id, _delete_rows_requests(sheet_id, [row_index]))
+
+
+def parse_timestamp_ms(value):
+    """Parse an ISO 8601 timestamp to epoch milliseconds, treating naive values as UTC.
+
+    Returns:
+        Milliseconds since the epoch, or MISSING_TIMESTAMP if the value isn't a valid timestamp.
+    """
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return MISSING_TIMESTAMP
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+class PomodoroTable:
+    """Pomodoros sheet rows held column by column.
+
+    String columns are plain lists; timestamps are parsed once into epoch milliseconds and kept,
+    with durations, in typed arrays alongside the original strings. Filtering and sorting work on
+    row positions, so no per-row dict is built until a caller asks for records.
+    """
+
+    __slots__ = ("durations", "end_ms", "end_times", "ids", "names", "notes", "start_ms", "start_times", "types")
+
+    def __init__(self):
+        self.ids = []
+        self.names = []
+        self.types = []
+        self.start_times = []
+        self.end_times = []
+        self.notes = []
+        self.start_ms = array("q")
+        self.end_ms = array("q")
+        self.durations = array("q")
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a table from raw Pomodoros sheet rows, skipping incomplete rows."""
+        table = cls()
+        for row in rows:
+            if len(row) < POMODORO_MIN_COLUMNS:
+                continue
+            table.ids.append(row[0])
+            table.names.append(row[1])
+            table.types.append(row[2])
+            table.start_times.append(row[3])
+            table.end_times.append(row[4])
+            table.durations.append(int(row[5]))
+            table.notes.append(row[6] if len(row) > POMODORO_MIN_COLUMNS else None)
+        table.start_ms = array("q", map(parse_timestamp_ms, table.start_times))
+        table.end_ms = array("q", map(parse_timestamp_ms, table.end_times))
+        return table
+
+    def __len__(self):
+        return len(self.ids)
+
+    def argsort(self):
+        """Return row positions ordered by start_time, newest first (sheet order for equal times)."""
+        return sorted(range(len(self.ids)), key=self.start_ms.__getitem__, reverse=True)
+
+    def _descending_key(self, position):
+        """Bisect key for argsort() order, which is ascending in negated start time."""
+        return -self.start_ms[position]
+
+    def select(self, start_date=None, end_date=None):
+        """Return row positions with start_date <= start_time <= end_date, newest first.
+
+        Bounds are ISO 8601 strings; rows whose start_time doesn't parse only match unbounded
+        selections.
+        """
+        order = self.argsort()
+        low = 0
+        high = len(order)
+        if end_date:
+            low = bisect_left(order, -parse_timestamp_ms(end_date), key=self._descending_key)
+        if start_date:
+            high = bisect_right(order, -parse_timestamp_ms(start_date), key=self._descending_key)
+        elif end_date:
+            high = bisect_left(order, -MISSING_TIMESTAMP, key=self._descending_key)
+        return order[low:high]
+
+    def record(self, position):
+        """Return the pomodoro at a row position as an API dict."""
+        return {
+            "id": self.ids[position],
+            "name": self.names[position],
+            "type": self.types[position],
+            "start_time": self.start_times[position],
+            "end_time": self.end_times[position],
+            "duration_minutes": self.durations[position],
+            "notes": self.notes[position],
+        }
+
+    def records(self, positions=None):
+        """Return API dicts for the given row positions (all rows in sheet order by default)."""
+        if positions is None:
+            positions = range(len(self.ids))
+        return [self.record(position) for position in positions]
+
+
+def local_days(start_ms, end_ms, tz):
+    """Return the local calendar days a [start_ms, end_ms) report range covers in timezone tz.
+
+    Like the browser's report, a range ending partway through a day stops at the day before,
+    and an empty range still covers the day it starts on.
+    """
+    first_day = datetime.fromtimestamp(start_ms / 1000, tz).date()
+    end_day = datetime.fromtimestamp(end_ms / 1000, tz).date()
+    days = [first_day + timedelta(days=offset) for offset in range((end_day - first_day).days)]
+    return days or [first_day]
+
+
+def _day_start_ms(day, tz):
+    """Epoch milliseconds of local midnight starting day (DST-aware through the zone's offsets)."""
+    return int(datetime(day.year, day.month, day.day, tzinfo=tz).timestamp() * 1000)
+
+
+def summarize_pomodoros(table, positions, days, tz, week_start=0):
+    """Roll up the pomodoros at positions into report totals for the given local days.
+
+    Each pomodoro's day is found by bisecting its start time against the local midnights of the
+    days, computed once per report, so no per-row timezone conversion is needed. Weeks begin on
+    week_start (0 = Sunday, as in JavaScript's getDay()).
+
+    Returns:
+        dict: total_minutes and total_pomodoros over all positions, by_type minutes, and per-day
+        (daily_totals, daily_by_type) and per-week (weekly_totals) series over days.
+    """
+    boundaries = [_day_start_ms(day, tz) for day in days]
+    boundaries.append(_day_start_ms(days[-1] + timedelta(days=1), tz))
+    day_minutes = [0] * len(days)
+    day_counts = [0] * len(days)
+    by_type = {}
+    daily_by_type = {}
+
+    for position in positions:
+        minutes = table.durations[position]
+        pomodoro_type = table.types[position]
+        by_type[pomodoro_type] = by_type.get(pomodoro_type, 0) + minutes
+        day = bisect_right(boundaries, table.start_ms[position]) - 1
+        if 0 <= day < len(days):
+            day_minutes[day] += minutes
+            day_counts[day] += 1
+            series = daily_by_type.get(pomodoro_type)
+            if series is None:
+                series = daily_by_type[pomodoro_type] = [0] * len(days)
+            series[day] += minutes
+
+    weekly = {}
+    for day, minutes, count in zip(days, day_minutes, day_counts, strict=True):
+        week = day - timedelta(days=(day.isoweekday() - week_start) % 7)
+        totals = weekly.setdefault(week, [0, 0])
+        totals[0] += minutes
+        totals[1] += count
+
+    return {
+        "total_minutes": sum(map(table.durations.__getitem__, positions)),
+        "total_pomodoros": len(positions),
+        "by_type": by_type,
+        "daily_totals": [
+            {"date": day.isoformat(), "minutes": minutes, "count": count}
+            for day, minutes, count in zip(days, day_minutes, day_counts, strict=True)
+        ],
+        "daily_by_type": daily_by_type,
+        "weekly_totals": [
+            {"week_start": week.isoformat(), "minutes": minutes, "count": count}
+            for week, (minutes, count) in weekly.items()
+        ],
+    }
+
+
+def _parse_pomodoro_rows(rows, start_date=None, end_date=None):
+    """Convert Pomodoros sheet rows into dicts, filtered by date and sorted newest first."""
+    table = PomodoroTable.from_rows(rows)
+    return table.records(table.select(start_date, end_date))
+
+
+def _read_all_pomodoro_rows(sheets_service, spreadsheet_id):
+    """Read every data row of the Pomodoros sheet (refreshing the row index on the way)."""
+    sheets_response = (
         sheets_service.spreadsheets()
         .values()
         .get(
             spreadsheetId=spreadsheet_id,
-            range="Pomodoros!A:A",
+            range="Pomodoros!A2:G",
         )
         .execute()
     )
 
-    existing_ids = set()
-    for row in id_lookup.get("values", []):
-        if row:
-            existing_ids.add(row[0])
+    rows = sheets_response.get("values", [])
+    _store_pomodoro_indexes(spreadsheet_id, rows)
+    return rows
 
-    # Filter out pomodoros that already exist
-    rows = []
-    for p in pomodoros:
-        if p["id"] not in existing_ids:
-            rows.append(
-                [
-                    p["id"],
-                    p["name"],
-                    p["type"],
-                    p["start_time"],
-                    p["end_time"],
-                    p["duration_minutes"],
-                    p.get("notes") or "",
-                ]
+
+def _store_pomodoro_indexes(spreadsheet_id, rows):
+    """Refresh the row and start_time indexes from a full read of the Pomodoros data rows.
+
+    The ID and start_time columns come along for free with any full read, so both indexes are
+    rebuilt while we have them.
+    """
+    _store_row_index(spreadsheet_id, rows, first_row=FIRST_DATA_ROW)
+    _store_start_time_index(
+        spreadsheet_id,
+        [row[_START_TIME_COLUMN] if len(row) > _START_TIME_COLUMN else "" for row in rows],
+        last_id=rows[-1][0] if rows and rows[-1] else None,
+    )
+
+
+def get_pomodoros(sheets_service, spreadsheet_id, start_date=None, end_date=None):
+    """Get pomodoros from Google Sheets.
+
+    Date-range queries only read the row blocks whose start_time span overlaps the range.
+    """
+    if start_date or end_date:
+        rows = _read_pomodoro_rows_in_range(sheets_service, spreadsheet_id, start_date, end_date)
+    else:
+        rows = _read_all_pomodoro_rows(sheets_service, spreadsheet_id)
+    return _parse_pomodoro_rows(rows, start_date, end_date)
+
+
+def get_pomodoro_table(sheets_service, spreadsheet_id, start_date, end_date):
+    """Get the pomodoros starting in [start_date, end_date] as a PomodoroTable.
+
+    Rows are read like a date-range get_pomodoros (only the matching start_time blocks), but
+    kept column-wise for aggregation instead of being turned into dicts.
+
+    Returns:
+        (table, positions): the table and its row positions in range, newest first.
+    """
+    rows = _read_pomodoro_rows_in_range(sheets_service, spreadsheet_id, start_date, end_date)
+    table = PomodoroTable.from_rows(rows)
+    return table, table.select(start_date, end_date)
+
+
+def iter_pomodoro_row_chunks(sheets_service, spreadsheet_id, chunk_rows=None):
+    """Yield the raw Pomodoros data rows in sheet order, chunk_rows rows per Sheets read.
+
+    Only one chunk is held in memory at a time. Reading runs to the sheet's grid row count (read
+    once up front), so a run of blank rows doesn't end the export early; chunks that come back
+    empty are skipped.
+    """
+    chunk_rows = chunk_rows or EXPORT_CHUNK_ROWS
+    last_row = get_sheet_row_count(sheets_service, spreadsheet_id) or 0
+    for first_row in range(FIRST_DATA_ROW, last_row + 1, chunk_rows):
+        sheets_response = (
+            sheets_service.spreadsheets()
+            .values()
+            .get(
+                spreadsheetId=spreadsheet_id,
+                range=f"Pomodoros!A{first_row}:G{min(first_row + chunk_rows - 1, last_row)}",
             )
+            .execute()
+        )
+        rows = sheets_response.get("values", [])
+        if rows:
+            yield rows
 
-    if not rows:
-        return 0
 
-    sheets_service.spreadsheets().values().append(
-        spreadsheetId=spreadsheet_id,
-        range="Pomodoros!A:G",
-        valueInputOption="RAW",
-        insertDataOption="INSERT_ROWS",
-        body={"values": rows},
-    ).execute()
-    return len(rows)
+def _row_cursor(last_row, rows):
+    """Build a delta cursor pointing at the last returned sheet row."""
+    last_id = rows[-1][0] if rows and rows[-1] else None
+    return {"row": last_row, "id": last_id}
 
 
-def update_pomodoro(sheets_service, spreadsheet_id, pomodoro_id, update_fields):
-    """Update a pomodoro in Google Sheets."""
-    # Find the row with this ID
-    id_lookup = (
+def _has_row_cursor(since_row, since_id):
+    """Whether a delta cursor points at a data row and can be checked."""
+    return since_row >= FIRST_DATA_ROW and bool(since_id)
+
+
+def _cursor_delta(rows, since_row, since_id):
+    """Build a delta from rows read starting at the cursor row, or None if the cursor moved."""
+    if not (rows and rows[0] and rows[0][0] == since_id):
+        return None
+    new_rows = rows[1:]
+    return {
+        "pomodoros": _parse_pomodoro_rows(new_rows),
+        "cursor": _row_cursor(since_row + len(new_rows), rows),
+        "full": False,
+    }
+
+
+def _full_delta(rows):
+    """Build a delta that resends every data row."""
+    return {
+        "pomodoros": _parse_pomodoro_rows(rows),
+        "cursor": _row_cursor(len(rows) + 1, rows),
+        "full": True,
+    }
+
+
+def get_pomodoros_since(sheets_service, spreadsheet_id, since_row, since_id):
+    """Get pomodoros appended after a row cursor returned by an earlier call.
+
+    The cursor is the last row number the client has seen plus the ID that was on it. Rows are
+    only ever appended, so if that row still holds the same ID only the rows after it are read.
+    If it doesn't (rows were deleted or the sheet was rewritten), this falls back to a full read.
+
+    Returns:
+        dict: {'pomodoros': [...], 'cursor': {'row': n, 'id': id}, 'full': bool}
+    """
+    if _has_row_cursor(since_row, since_id):
+        sheets_response = (
+            sheets_service.spreadsheets()
+            .values()
+            .get(
+                spreadsheetId=spreadsheet_id,
+                range=f"Pomodoros!A{since_row}:G",
+            )
+            .execute()
+        )
+        delta = _cursor_delta(sheets_response.get("values", []), since_row, since_id)
+        if delta is not None:
+            return delta
+
+    # No usable cursor - rows before it were deleted, so resend everything
+    return _full_delta(_read_all_pomodoro_rows(sheets_service, spreadsheet_id))
+
+
+def get_snapshot(sheets_service, spreadsheet_id, defaults, since_row=0, since_id=None):
+    """Get pomodoros and settings together with one values.batchGet.
+
+    Pomodoros are returned as a delta exactly like get_pomodoros_since: with a valid cursor only
+    the rows after it are read, otherwise every row. Only a stale cursor costs a second read.
+
+    Returns:
+        dict: {'pomodoros': [...], 'cursor': {...}, 'full': bool, 'settings': {...}}
+    """
+    use_cursor = _has_row_cursor(since_row, since_id)
+    first_row = since_row if use_cursor else FIRST_DATA_ROW
+    sheets_response = (
         sheets_service.spreadsheets()
         .values()
-        .get(
+        .batchGet(
             spreadsheetId=spreadsheet_id,
-            range="Pomodoros!A:A",
+            ranges=[f"Pomodoros!A{first_row}:G", "Settings!A2:B"],
         )
         .execute()
     )
+    pomodoro_range, settings_range = sheets_response.get("valueRanges", [{}, {}])
+    rows = pomodoro_range.get("values", [])
 
-    rows = id_lookup.get("values", [])
-    row_index = None
-    for i, row in enumerate(rows):
-        if row and row[0] == pomodoro_id:
-            row_index = i + 1  # 1-indexed
-            break
+    if use_cursor:
+        delta = _cursor_delta(rows, since_row, since_id)
+        if delta is None:
+            delta = _full_delta(_read_all_pomodoro_rows(sheets_service, spreadsheet_id))
+    else:
+        _store_pomodoro_indexes(spreadsheet_id, rows)
+        delta = _full_delta(rows)
+
+    return {**delta, "settings": _parse_settings_rows(settings_range.get("values", []), defaults)}
 
-    if row_index is None:
-        return False
 
-    # Get current row data
-    current_row = (
+def _read_pomodoro_row_range(sheets_service, spreadsheet_id, first_row, last_row=None):
+    """Read Pomodoros rows first_row..last_row (to the end of the sheet if last_row is None)."""
+    sheets_response = (
         sheets_service.spreadsheets()
         .values()
         .get(
             spreadsheetId=spreadsheet_id,
-            range=f"Pomodoros!A{row_index}:G{row_index}",
+            range=f"Pomodoros!A{first_row}:G{last_row or ''}",
         )
         .execute()
     )
+    return sheets_response.get("values", [])
 
-    current_values = current_row.get("values", [[]])[0]
-    while len(current_values) < POMODORO_TOTAL_COLUMNS:
-        current_values.append("")
 
-    # Update fields
-    current_values[1] = update_fields.get("name", current_values[1])
-    current_values[2] = update_fields.get("type", current_values[2])
-    current_values[3] = update_fields.get("start_time", current_values[3])
-    current_values[4] = update_fields.get("end_time", current_values[4])
-    current_values[5] = update_fields.get("duration_minutes", current_values[5])
-    current_values[6] = update_fields.get("notes") or ""
+def _page(rows, first_row):
+    """Build a page from rows read starting at first_row, with a cursor to the rows above it."""
+    next_cursor = None
+    if first_row > FIRST_DATA_ROW:
+        # The cursor is the topmost row that has an ID, so the next read can check it's still there
+        offset = next((i for i, row in enumerate(rows) if row), 0)
+        next_cursor = {"row": first_row + offset, "id": rows[offset][0] if rows and rows[offset] else ""}
+    return {"pomodoros": _parse_pomodoro_rows(rows), "next": next_cursor}
 
-    sheets_service.spreadsheets().values().update(
-        spreadsheetId=spreadsheet_id,
-        range=f"Pomodoros!A{row_index}:G{row_index}",
-        valueInputOption="RAW",
-        body={"values": [current_values]},
-    ).execute()
 
+def _read_tail(sheets_service, spreadsheet_id, row_count, limit):
+    """Read the rows of the last page, returning (rows, first_row)."""
+    first_row = max(FIRST_DATA_ROW, row_count - limit + 1)
+    # Open-ended, so rows appended since row_count was known come along too
+    rows = _read_pomodoro_row_range(sheets_service, spreadsheet_id, first_row)
+    extra = max(0, len(rows) - limit)
+    return rows[extra:], first_row + extra
+
+
+def _read_tail_from_grid(sheets_service, spreadsheet_id, limit):
+    """Read the rows of the last page without the row index, returning (rows, first_row).
+
+    Scans up from the grid's last row in bounded windows until one holds data; reads drop
+    trailing blank rows, so the last data row is the window's first row plus its row count.
+    """
+    last_row = get_sheet_row_count(sheets_service, spreadsheet_id) or 0
+    while last_row >= FIRST_DATA_ROW:
+        first_row = max(FIRST_DATA_ROW, last_row - max(limit, PAGE_TAIL_SCAN_ROWS) + 1)
+        rows = _read_pomodoro_row_range(sheets_service, spreadsheet_id, first_row, last_row)
+        if rows:
+            extra = max(0, len(rows) - limit)
+            if len(rows) < limit and first_row > FIRST_DATA_ROW:
+                # The data ends near the top of this window; the page reaches into the one above
+                return _read_tail(sheets_service, spreadsheet_id, first_row + len(rows) - 1, limit)
+            return rows[extra:], first_row + extra
+        last_row = first_row - 1
+    return [], FIRST_DATA_ROW
+
+
+def _cursor_page(sheets_service, spreadsheet_id, limit, before_row, before_id):
+    """Read the page ending just above before_row, or None if that row no longer holds before_id."""
+    first_row = max(FIRST_DATA_ROW, before_row - limit)
+    rows = _read_pomodoro_row_range(sheets_service, spreadsheet_id, first_row, before_row)
+    if len(rows) != before_row - first_row + 1:
+        return None
+    cursor_row = rows[-1]
+    if (cursor_row[0] if cursor_row else "") != before_id:
+        return None
+    return _page(rows[:-1], first_row)
+
+
+def get_pomodoro_page(sheets_service, spreadsheet_id, limit, before_row=None, before_id=None):
+    """Get one page of pomodoros, walking the sheet from its tail (the newest appends) upwards.
+
+    Only the page's rows are read: the first page ends at the last row (from the cached row
+    index, or found from the grid size with bounded reads when the cache is cold, so the ID
+    column is never downloaded), and later pages end just above the cursor row. The cursor is the topmost row of the
+    previous page plus its ID; if deletes moved that row, the ID's new row is looked up instead.
+    Pomodoros within a page are sorted newest first.
+
+    Returns:
+        dict: {'pomodoros': [...], 'next': {'row': n, 'id': id} or None on the last page}, or
+        None if the cursor's pomodoro no longer exists.
+    """
+    if before_row is None:
+        entry = _cached_row_index(spreadsheet_id)
+        rows = []
+        if entry is not None:
+            rows, first_row = _read_tail(sheets_service, spreadsheet_id, entry["row_count"], limit)
+        if not rows:
+            # Cold cache, or the cached index pointed past the end of the sheet (rows deleted elsewhere)
+            rows, first_row = _read_tail_from_grid(sheets_service, spreadsheet_id, limit)
+        return _page(rows, first_row)
+
+    page = _cursor_page(sheets_service, spreadsheet_id, limit, before_row, before_id)
+    if page is None and before_id:
+        moved_row = _find_row(sheets_service, spreadsheet_id, before_id)
+        if moved_row is not None:
+            page = _cursor_page(sheets_service, spreadsheet_id, limit, moved_row, before_id)
+    return page
+
+
+def _pomodoro_row(pomodoro):
+    """Convert a pomodoro dict into a Pomodoros sheet row."""
+    return [
+        pomodoro["id"],
+        pomodoro["name"],
+        pomodoro["type"],
+        pomodoro["start_time"],
+        pomodoro["end_time"],
+        pomodoro["duration_minutes"],
+        pomodoro.get("notes") or "",
+    ]
+
+
+def _remove_duplicate_append(sheets_service, spreadsheet_id, pomodoro_id, append_response):
+    """Undo an append that raced with a write from outside this worker.
+
+    The row to delete is picked from a fresh read of the ID column and must hold pomodoro_id in
+    that same read: deletes elsewhere may have shifted our row up from where the append landed,
+    so the append response alone can't say which row is ours. The first occurrence is kept.
+
+    Returns True if the appended row duplicated an earlier row and was deleted.
+    """
+    id_rows = _read_id_column(sheets_service, spreadsheet_id)
+    _store_row_index(spreadsheet_id, id_rows)
+    copies = [row for row, values in enumerate(id_rows, start=1) if values and values[0] == pomodoro_id][1:]
+    if not copies:
+        return False
+
+    # Our row can only have moved up since the append; prefer the last copy at or above it
+    appended = _appended_rows(append_response)
+    candidates = [row for row in copies if appended is None or row <= appended[0]]
+    row_index = (candidates or copies)[-1]
+
+    sheet_id = get_sheet_id(sheets_service, spreadsheet_id)
+    if sheet_id is None:
+        return False
+    _delete_row(sheets_service, spreadsheet_id, sheet_id, row_index)
+    _record_delete(spreadsheet_id, row_index)
     return True
 
 
-def delete_pomodoro(sheets_service, spreadsheet_id, pomodoro_id):
-    """Delete a pomodoro from Google Sheets."""
-    # Find the row with this ID
-    id_lookup = (
+def save_pomodoro(sheets_service, spreadsheet_id, pomodoro):
+    """Save a new pomodoro to Google Sheets (with duplicate check).
+
+    The duplicate check uses the cached ID index, so with a warm cache this is a single append.
+
+    Returns:
+        bool: True if the pomodoro was appended, False if its ID already existed.
+    """
+    cached_entry = _cached_row_index(spreadsheet_id)
+    entry = cached_entry or _fetch_row_index(sheets_service, spreadsheet_id)
+    pomodoro_id = pomodoro["id"]
+
+    if pomodoro_id in entry["rows"]:
+        # ID already exists, skip insert (could also update here)
+        return False
+
+    # ID doesn't exist, append new row
+    append_response = (
         sheets_service.spreadsheets()
         .values()
-        .get(
+        .append(
             spreadsheetId=spreadsheet_id,
-            range="Pomodoros!A:A",
+            range="Pomodoros!A:G",
+            valueInputOption="RAW",
+            insertDataOption="INSERT_ROWS",
+            body={"values": [_pomodoro_row(pomodoro)]},
         )
         .execute()
     )
 
-    rows = id_lookup.get("values", [])
-    row_index = None
-    for i, row in enumerate(rows):
-        if row and row[0] == pomodoro_id:
-            row_index = i  # 0-indexed for delete
-            break
+    if not _record_append(spreadsheet_id, [pomodoro_id], append_response) and cached_entry is not None:
+        # The sheet changed since the index was cached - another worker may have saved this ID already
+        return not _remove_duplicate_append(sheets_service, spreadsheet_id, pomodoro_id, append_response)
+    return True
+
+
+def _save_pomodoros_batch_results(sheets_service, spreadsheet_id, pomodoros):
+    """Append every pomodoro whose ID isn't in the sheet (or earlier in the list) yet.
+
+    Returns one bool per input pomodoro: True if it was appended.
+    """
+    # First get all existing IDs - read fresh, since the cached index can miss rows another
+    # worker appended and a batch can't cheaply undo a duplicate append
+    existing_ids = set(_fetch_row_index(sheets_service, spreadsheet_id)["rows"])
+
+    # Filter out pomodoros that already exist (or repeat an earlier one in this batch)
+    rows = []
+    results = []
+    for p in pomodoros:
+        is_new = p["id"] not in existing_ids
+        if is_new:
+            existing_ids.add(p["id"])
+            rows.append(_pomodoro_row(p))
+        results.append(is_new)
+
+    if not rows:
+        return results
+
+    append_response = (
+        sheets_service.spreadsheets()
+        .values()
+        .append(
+            spreadsheetId=spreadsheet_id,
+            range="Pomodoros!A:G",
+            valueInputOption="RAW",
+            insertDataOption="INSERT_ROWS",
+            body={"values": rows},
+        )
+        .execute()
+    )
+    _record_append(spreadsheet_id, [row[0] for row in rows], append_response)
+    return results
+
+
+def save_pomodoros_batch(sheets_service, spreadsheet_id, pomodoros):
+    """Save multiple pomodoros to Google Sheets in a single request (with duplicate check)."""
+    if not pomodoros:
+        return 0
+    return sum(_save_pomodoros_batch_results(sheets_service, spreadsheet_id, pomodoros))
 
+
+def _partial_update_data(row_index, update_fields):
+    """Build values.batchUpdate data covering only the fields present in update_fields.
+
+    Adjacent columns are merged into one range, so a full-record update is still a single range.
+    """
+    runs = []  # (first column index, [values])
+    for column, field in enumerate(POMODORO_UPDATABLE_FIELDS, start=1):
+        if field not in update_fields:
+            continue
+        value = update_fields[field]
+        if field == "notes":
+            value = value or ""
+        if runs and runs[-1][0] + len(runs[-1][1]) == column:
+            runs[-1][1].append(value)
+        else:
+            runs.append((column, [value]))
+
+    data = []
+    for first_column, run_values in runs:
+        first_letter = _POMODORO_COLUMN_LETTERS[first_column]
+        last_letter = _POMODORO_COLUMN_LETTERS[first_column + len(run_values) - 1]
+        data.append(
+            {
+                "range": f"Pomodoros!{first_letter}{row_index}:{last_letter}{row_index}",
+                "values": [run_values],
+            }
+        )
+    return data
+
+
+def update_pomodoro(sheets_service, spreadsheet_id, pomodoro_id, update_fields):
+    """Update a pomodoro in Google Sheets.
+
+    Only the fields present in update_fields are written, in a single values.batchUpdate
+    and without reading the current row first. Missing fields (including notes) are left as-is.
+    """
+    # Find the row with this ID
+    row_index = _find_row(sheets_service, spreadsheet_id, pomodoro_id)
     if row_index is None:
         return False
 
-    # Get sheet ID
-    spreadsheet = sheets_service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
+    data = _partial_update_data(row_index, update_fields)
+    if not data:
+        return True
+    if update_fields.get("start_time"):
+        _widen_start_time_block(spreadsheet_id, row_index, update_fields["start_time"])
 
-    sheet_id = None
-    for sheet in spreadsheet["sheets"]:
-        if sheet["properties"]["title"] == "Pomodoros":
-            sheet_id = sheet["properties"]["sheetId"]
-            break
+    sheets_service.spreadsheets().values().batchUpdate(
+        spreadsheetId=spreadsheet_id,
+        body={
+            "valueInputOption": "RAW",
+            "data": data,
+        },
+    ).execute()
 
+    return True
+
+
+def delete_pomodoro(sheets_service, spreadsheet_id, pomodoro_id):
+    """Delete a pomodoro from Google Sheets."""
+    # Find the row with this ID
+    row_index = _find_row(sheets_service, spreadsheet_id, pomodoro_id)
+    if row_index is None:
+        return False
+
+    # Get sheet ID
+    sheet_id = get_sheet_id(sheets_service, spreadsheet_id)
     if sheet_id is None:
         return False
 
     # Delete the row
-    sheets_service.spreadsheets().batchUpdate(
-        spreadsheetId=spreadsheet_id,
-        body={
-            "requests": [
-                {
-                    "deleteDimension": {
-                        "range": {
-                            "sheetId": sheet_id,
-                            "dimension": "ROWS",
-                            "startIndex": row_index,
-                            "endIndex": row_index + 1,
-                        }
+    _delete_row(sheets_service, spreadsheet_id, sheet_id, row_index)
+    _record_delete(spreadsheet_id, row_index)
+
+    return True
+
+
+def _delete_rows_requests(sheet_id, row_indices):
+    """Build deleteDimension requests for 1-indexed rows, merging contiguous rows into one range.
+
+    Ranges are emitted bottom-up so earlier deletions don't shift the rows of later ones.
+    """
+    requests = []
+    for row_index in sorted(set(row_indices), reverse=True):
+        if requests and requests[-1]["deleteDimension"]["range"]["startIndex"] == row_index:
+            requests[-1]["deleteDimension"]["range"]["startIndex"] = row_index - 1
+            continue
+        requests.append(
+            {
+                "deleteDimension": {
+                    "range": {
+                        "sheetId": sheet_id,
+                        "dimension": "ROWS",
+                        "startIndex": row_index - 1,
+                        "endIndex": row_index,
                     }
                 }
-            ]
-        },
-    ).execute()
+            }
+        )
+    return requests
+
+
+def _plan_create(plan, index, pomodoro_id, data):
+    """Queue a create for the append phase, unless the ID is already live."""
+    if pomodoro_id in plan["creates"] or plan["live_rows"].get(pomodoro_id):
+        return {"record_id": pomodoro_id, "status": "duplicate"}
+    missing = [field for field in SYNC_REQUIRED_FIELDS if field not in data]
+    if missing:
+        return {"record_id": pomodoro_id, "status": "error", "error": f"Missing fields: {', '.join(missing)}"}
+    plan["creates"][pomodoro_id] = {**data, "id": pomodoro_id}
+    plan["create_ops"].setdefault(pomodoro_id, []).append(index)
+    return {"record_id": pomodoro_id, "status": "ok"}
+
+
+def _plan_update(plan, index, pomodoro_id, data):
+    """Merge an update into a pending create, or into the pending writes for its row."""
+    if pomodoro_id in plan["creates"]:
+        plan["creates"][pomodoro_id].update({k: v for k, v in data.items() if k != "id"})
+        plan["create_ops"][pomodoro_id].append(index)
+        return {"record_id": pomodoro_id, "status": "ok"}
+    row_index = plan["live_rows"].get(pomodoro_id)
+    if not row_index:
+        return {"record_id": pomodoro_id, "status": "not_found"}
+    plan["updates"].setdefault(row_index, {}).update(data)
+    plan["update_ops"].append(index)
+    return {"record_id": pomodoro_id, "status": "ok"}
+
+
+def _plan_delete(plan, index, pomodoro_id):
+    """Cancel a pending create, or schedule the ID's row for deletion."""
+    if pomodoro_id in plan["creates"]:
+        del plan["creates"][pomodoro_id]
+        del plan["create_ops"][pomodoro_id]
+        return {"record_id": pomodoro_id, "status": "ok"}
+    row_index = plan["live_rows"].get(pomodoro_id)
+    if not row_index:
+        return {"record_id": pomodoro_id, "status": "not_found"}
+    plan["live_rows"][pomodoro_id] = None
+    plan["updates"].pop(row_index, None)
+    plan["deletes"].append(row_index)
+    plan["delete_ops"].append(index)
+    return {"record_id": pomodoro_id, "status": "ok"}
+
+
+def _sync_operation_error(operation):
+    """Return why a sync operation is malformed, or None if it can be planned."""
+    if not isinstance(operation, dict):
+        return "Operation must be an object"
+    pomodoro_id = operation.get("record_id")
+    if not pomodoro_id:
+        return "Missing record_id"
+    if not isinstance(pomodoro_id, str):
+        return "record_id must be a string"
+    if not isinstance(operation.get("data") or {}, dict):
+        return "data must be an object"
+    return None
+
+
+def _plan_sync_operations(row_index_entry, operations):
+    """Resolve an ordered list of sync operations against the ID -> row index.
+
+    Returns (plan, results). Later operations on the same ID see the effect of earlier ones,
+    so create+update collapses into one appended row and create+delete into nothing.
+    """
+    plan = {
+        "live_rows": dict(row_index_entry["rows"]),
+        "creates": {},
+        "create_ops": {},
+        "updates": {},
+        "update_ops": [],
+        "deletes": [],
+        "delete_ops": [],
+    }
+    results = []
+    for index, operation in enumerate(operations):
+        error = _sync_operation_error(operation)
+        if error:
+            record_id = operation.get("record_id") if isinstance(operation, dict) else None
+            results.append({"record_id": record_id, "status": "error", "error": error})
+            continue
+        op_type = operation.get("operation")
+        pomodoro_id = operation["record_id"]
+        data = operation.get("data") or {}
+        if op_type == "create":
+            results.append(_plan_create(plan, index, pomodoro_id, data))
+        elif op_type == "update":
+            results.append(_plan_update(plan, index, pomodoro_id, data))
+        elif op_type == "delete":
+            results.append(_plan_delete(plan, index, pomodoro_id))
+        else:
+            results.append({"record_id": pomodoro_id, "status": "error", "error": f"Unknown operation: {op_type}"})
+    return plan, results
 
-    return True
+
+def _mark_failed(results, op_indices, error):
+    """Flag the results of operations whose Sheets call failed."""
+    for index in op_indices:
+        results[index] = {"record_id": results[index]["record_id"], "status": "error", "error": str(error)}
+
+
+def _apply_sync_updates(sheets_service, spreadsheet_id, plan, results):
+    """Write every pending row update in one values.batchUpdate."""
+    data = []
+    for row_index, update_fields in plan["updates"].items():
+        data.extend(_partial_update_data(row_index, update_fields))
+        if update_fields.get("start_time"):
+            _widen_start_time_block(spreadsheet_id, row_index, update_fields["start_time"])
+    if not data:
+        return
+    try:
+        sheets_service.spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={
+                "valueInputOption": "RAW",
+                "data": data,
+            },
+        ).execute()
+    except HttpError as e:
+        _mark_failed(results, plan["update_ops"], e)
+
+
+def _apply_sync_deletes(sheets_service, spreadsheet_id, plan, results):
+    """Delete every pending row in one spreadsheets.batchUpdate."""
+    if not plan["deletes"]:
+        return
+    try:
+        sheet_id = get_sheet_id(sheets_service, spreadsheet_id)
+        if sheet_id is None:
+            _mark_failed(results, plan["delete_ops"], "Pomodoros sheet not found")
+            return
+        run_structural_update(sheets_service, spreadsheet_id, _delete_rows_requests(sheet_id, plan["deletes"]))
+    except HttpError as e:
+        _mark_failed(results, plan["delete_ops"], e)
+    finally:
+        # Rows shifted (or may have) - rebuild the index on next use
+        invalidate_row_index(spreadsheet_id)
+
+
+def _apply_sync_creates(sheets_service, spreadsheet_id, plan, results):
+    """Append every pending create in one values.append."""
+    if not plan["creates"]:
+        return
+    rows = [_pomodoro_row(pomodoro) for pomodoro in plan["creates"].values()]
+    try:
+        append_response = (
+            sheets_service.spreadsheets()
+            .values()
+            .append(
+                spreadsheetId=spreadsheet_id,
+                range="Pomodoros!A:G",
+                valueInputOption="RAW",
+                insertDataOption="INSERT_ROWS",
+                body={"values": rows},
+            )
+            .execute()
+        )
+    except HttpError as e:
+        _mark_failed(results, [i for ops in plan["create_ops"].values() for i in ops], e)
+        return
+    _record_append(spreadsheet_id, [row[0] for row in rows], append_response)
+
+
+def apply_sync_operations(sheets_service, spreadsheet_id, operations):
+    """Apply an ordered list of pomodoro create/update/delete operations in O(1) Sheets calls.
+
+    Each operation is a sync queue item: {"operation": "create"|"update"|"delete",
+    "record_id": id, "data": {...}}. All operations are resolved against one ID column read,
+    then applied with at most one values.batchUpdate, one deleteDimension batchUpdate and one
+    values.append.
+
+    Returns:
+        list: one {"record_id", "status"} dict per operation, in order. Status is "ok",
+        "duplicate" (create of an existing ID), "not_found" or "error" (with an "error" message).
+    """
+    if not operations:
+        return []
+
+    # Always a fresh read: updates and deletes target specific rows, and the cached index can
+    # miss creates made by another worker, which would append them a second time
+    row_index_entry = _fetch_row_index(sheets_service, spreadsheet_id)
+
+    plan, results = _plan_sync_operations(row_index_entry, operations)
+
+    # Updates go first while row numbers are still valid, then deletes, then the append
+    _apply_sync_updates(sheets_service, spreadsheet_id, plan, results)
+    _apply_sync_deletes(sheets_service, spreadsheet_id, plan, results)
+    _apply_sync_creates(sheets_service, spreadsheet_id, plan, results)
+    return results
 
 
 def get_settings(sheets_service, spreadsheet_id, defaults):
@@ -268,7 +1301,11 @@ def get_settings(sheets_service, spreadsheet_id, defaults):
         .execute()
     )
 
-    rows = sheets_response.get("values", [])
+    return _parse_settings_rows(sheets_response.get("values", []), defaults)
+
+
+def _parse_settings_rows(rows, defaults):
+    """Convert Settings sheet rows into a settings dict layered over the defaults."""
     settings = dict(defaults)
 
     for row in rows:
@@ -283,13 +1320,114 @@ def get_settings(sheets_service, spreadsheet_id, defaults):
     return settings
 
 
-def deduplicate_pomodoros(sheets_service, spreadsheet_id):
+def _duplicate_row_numbers(rows):
+    """Return the 1-indexed sheet rows repeating an earlier ID, given rows read from row 1."""
+    seen_ids = set()
+    duplicates = []
+    for row_number, row in enumerate(rows[1:], start=FIRST_DATA_ROW):
+        if not row:
+            continue
+        if row[0] in seen_ids:
+            duplicates.append(row_number)
+        else:
+            seen_ids.add(row[0])
+    return duplicates
+
+
+def _read_data_rows(sheets_service, spreadsheet_id):
+    """Read every Pomodoros data row as stored (unformatted), for a rewrite of the data area."""
+    result = (
+        sheets_service.spreadsheets()
+        .values()
+        .get(
+            spreadsheetId=spreadsheet_id,
+            range=f"Pomodoros!A{FIRST_DATA_ROW}:G",
+            valueRenderOption="UNFORMATTED_VALUE",
+        )
+        .execute()
+    )
+    return result.get("values", [])
+
+
+def _compact_pomodoros(sheets_service, spreadsheet_id):
+    """Rewrite the data area with one row per ID (first occurrence wins) and no blank rows.
+
+    The Sheets API has no conditional write, so the data rows are read again right before the
+    rewrite and compaction is abandoned if anything was created, edited or deleted since the
+    first read. The kept rows are then written over the top of the data area, and only after
+    that is the leftover tail (up to the last row read) cleared, so a failure part way leaves
+    duplicates behind but never loses a row. If the last row read no longer holds the same ID
+    by then, rows moved underneath us and the tail is left alone.
+
+    Returns:
+        dict: {'removed': count_removed, 'total': total_rows}, plus 'error' if the sheet changed
+    """
+    rows = _read_data_rows(sheets_service, spreadsheet_id)
+
+    seen_ids = set()
+    kept = []
+    for row in rows:
+        if not row or row[0] in seen_ids:
+            continue
+        seen_ids.add(row[0])
+        kept.append(row)
+
+    removed = sum(1 for row in rows if row) - len(kept)
+    if len(kept) == len(rows):
+        return {"removed": 0, "total": len(kept)}
+
+    changed = {"removed": 0, "total": len(kept), "error": "Sheet changed during compaction, run it again"}
+    if _read_data_rows(sheets_service, spreadsheet_id) != rows:
+        return changed
+
+    if kept:
+        sheets_service.spreadsheets().values().update(
+            spreadsheetId=spreadsheet_id,
+            range=f"Pomodoros!A{FIRST_DATA_ROW}",
+            valueInputOption="RAW",
+            body={"values": kept},
+        ).execute()
+    invalidate_row_index(spreadsheet_id)
+
+    last_row = FIRST_DATA_ROW + len(rows) - 1
+    last_cell = (
+        sheets_service.spreadsheets()
+        .values()
+        .get(spreadsheetId=spreadsheet_id, range=f"Pomodoros!A{last_row}", valueRenderOption="UNFORMATTED_VALUE")
+        .execute()
+        .get("values", [])
+    )
+    if not (last_cell and last_cell[0] and last_cell[0][0] == rows[-1][0]):
+        return changed
+
+    sheets_service.spreadsheets().values().clear(
+        spreadsheetId=spreadsheet_id,
+        range=f"Pomodoros!A{FIRST_DATA_ROW + len(kept)}:G{last_row}",
+        body={},
+    ).execute()
+    return {"removed": removed, "total": len(kept)}
+
+
+def deduplicate_pomodoros(sheets_service, spreadsheet_id, mode="auto"):
     """Remove duplicate pomodoros from Google Sheets (keeps first occurrence of each ID).
 
+    Args:
+        sheets_service: Google Sheets API service
+        spreadsheet_id: ID of the spreadsheet
+        mode: "ranges" deletes duplicate rows, merging adjacent ones into a single range;
+            "compact" rewrites the data area with one update plus one clear of the tail; "auto"
+            picks compact once duplicates reach DEDUPE_COMPACT_RATIO of the rows.
+
     Returns:
-        dict: {'removed': count_removed, 'total': total_rows}
+        dict: {'removed': count_removed, 'total': total_rows, 'mode': mode_used}
     """
-    # Get all pomodoros with their row indices
+    if mode not in DEDUPE_MODES:
+        raise ValueError(f"mode must be one of: {', '.join(DEDUPE_MODES)}")
+
+    if mode == "compact":
+        return {**_compact_pomodoros(sheets_service, spreadsheet_id), "mode": "compact"}
+
+    # Get all pomodoro IDs with their row indices
     id_lookup = (
         sheets_service.spreadsheets()
         .values()
@@ -301,62 +1439,26 @@ def deduplicate_pomodoros(sheets_service, spreadsheet_id):
     )
 
     rows = id_lookup.get("values", [])
-
-    # Track seen IDs and rows to delete (0-indexed)
-    seen_ids = set()
-    rows_to_delete = []
-
-    for i, row in enumerate(rows):
-        if i == 0:
-            # Skip header row
-            continue
-        if row:
-            pomodoro_id = row[0]
-            if pomodoro_id in seen_ids:
-                rows_to_delete.append(i)
-            else:
-                seen_ids.add(pomodoro_id)
+    total = max(len(rows) - 1, 0)  # -1 for header
+    rows_to_delete = _duplicate_row_numbers(rows)
 
     if not rows_to_delete:
-        return {"removed": 0, "total": len(rows) - 1}  # -1 for header
+        return {"removed": 0, "total": total, "mode": "ranges"}
 
-    # Get sheet ID
-    spreadsheet = sheets_service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-
-    sheet_id = None
-    for sheet in spreadsheet["sheets"]:
-        if sheet["properties"]["title"] == "Pomodoros":
-            sheet_id = sheet["properties"]["sheetId"]
-            break
+    if mode == "auto" and len(rows_to_delete) >= total * DEDUPE_COMPACT_RATIO:
+        return {**_compact_pomodoros(sheets_service, spreadsheet_id), "mode": "compact"}
 
+    # Get sheet ID
+    sheet_id = get_sheet_id(sheets_service, spreadsheet_id)
     if sheet_id is None:
-        return {"removed": 0, "total": len(rows) - 1, "error": "Pomodoros sheet not found"}
+        return {"removed": 0, "total": total, "error": "Pomodoros sheet not found", "mode": "ranges"}
 
-    # Delete rows in reverse order (so indices don't shift)
-    rows_to_delete.reverse()
-
-    requests = []
-    for row_index in rows_to_delete:
-        requests.append(
-            {
-                "deleteDimension": {
-                    "range": {
-                        "sheetId": sheet_id,
-                        "dimension": "ROWS",
-                        "startIndex": row_index,
-                        "endIndex": row_index + 1,
-                    }
-                }
-            }
-        )
-
-    # Execute batch delete
-    sheets_service.spreadsheets().batchUpdate(
-        spreadsheetId=spreadsheet_id,
-        body={"requests": requests},
-    ).execute()
+    # Execute batch delete, one request per run of adjacent duplicate rows
+    run_structural_update(sheets_service, spreadsheet_id, _delete_rows_requests(sheet_id, rows_to_delete))
+    # Every row after the first duplicate moved, so rebuild the index on next use
+    invalidate_row_index(spreadsheet_id)
 
-    return {"removed": len(rows_to_delete), "total": len(rows) - 1 - len(rows_to_delete)}
+    return {"removed": len(rows_to_delete), "total": total - len(rows_to_delete), "mode": "ranges"}
 
 
 def save_settings(sheets_service, spreadsheet_id, settings_data, replace_all=False):
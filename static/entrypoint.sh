@@ -3,9 +3,18 @@ set -e
 
 # SSL is handled by external reverse proxy
 
+# Threads let one worker overlap Google API round trips.
+# GUNICORN_WORKER_CLASS=gevent runs each request on a greenlet instead, with socket I/O made
+# non-blocking, so one worker can keep hundreds of Google API calls in flight.
+if [ "${GUNICORN_WORKER_CLASS:-gthread}" = "gevent" ]; then
+    WORKER_ARGS=(--worker-class gevent --worker-connections "${GUNICORN_WORKER_CONNECTIONS:-500}")
+else
+    WORKER_ARGS=(--threads "${GUNICORN_THREADS:-4}")
+fi
+
 # Start Flask with Gunicorn (production WSGI server)
 start_flask() {
-    gunicorn --bind 127.0.0.1:5000 --workers 2 --access-logfile - --error-logfile - app:app &
+    gunicorn --bind 127.0.0.1:5000 --workers 2 "${WORKER_ARGS[@]}" --access-logfile - --error-logfile - app:app &
     FLASK_PID=$!
     echo "Gunicorn started with PID $FLASK_PID"
 }
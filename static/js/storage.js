@@ -66,6 +66,12 @@
     // Sync configuration
     const SYNC_RETRY_DELAYS = [1000, 2000, 5000, 10000, 30000]; // Exponential backoff
     const MAX_SYNC_RETRIES = 5;
+    const SYNC_BATCH_SIZE = 200;  // Pomodoro operations per /api/sheets/sync request
+    const MAX_BUSY_RETRIES = 3;  // Retries when the server answers 429 (too many requests in flight)
+    const MAX_BUSY_RETRY_DELAY_MS = 10000;
+    const CHANGE_FEED_RECONNECT_MS = 5000;  // Wait before reopening a change feed, doubled after each failure
+    const CHANGE_FEED_MAX_FAILURES = 4;  // Consecutive failures before falling back to the regular sync
+    const CHANGE_PULL_DEBOUNCE_MS = 1000;  // Merge bursts of change events into one pull
 
     // Storage state
     let db = null;
@@ -77,6 +83,9 @@
     let syncLockPromise = null;  // Promise-based lock to prevent race conditions
     let pendingSyncCount = 0;
     let lastSyncError = null;
+    let changeFeed = null;  // { controller } while the change feed is running
+    let changeFeedAvailable = false;  // Server reports whether it serves /api/sheets/events
+    let changePullTimer = null;
 
     /**
      * Generate a UUID v4
@@ -256,6 +265,7 @@
                 client_id: storedCredentials.client_id,
                 client_secret: storedCredentials.client_secret,
                 scopes: storedCredentials.scopes,
+                expiry: storedCredentials.expiry,
                 spreadsheet_id: cachedSpreadsheetId
             }));
         } else {
@@ -270,12 +280,39 @@
                 client_id: storedCredentials.client_id,
                 client_secret: storedCredentials.client_secret,
                 scopes: storedCredentials.scopes,
+                expiry: storedCredentials.expiry,
                 spreadsheet_id: cachedSpreadsheetId
             };
             options.body = JSON.stringify(body);
         }
 
-        return fetch(url, options);
+        let response = await fetch(url, options);
+        // The server turns away requests over its in-flight limit; wait as told and try again
+        for (let attempt = 0; response.status === 429 && attempt < MAX_BUSY_RETRIES; attempt++) {
+            const retryAfter = parseInt(response.headers.get('Retry-After'), 10);
+            const delay = Number.isNaN(retryAfter) ? 1000 * 2 ** attempt : retryAfter * 1000;
+            await new Promise(resolve => setTimeout(resolve, Math.min(delay, MAX_BUSY_RETRY_DELAY_MS)));
+            response = await fetch(url, options);
+        }
+        await storeRefreshedCredentials(response);
+        return response;
+    }
+
+    /**
+     * Keep an access token the server refreshed for us, so later requests don't refresh it again
+     */
+    async function storeRefreshedCredentials(response) {
+        const header = response.headers.get('X-Refreshed-Credentials');
+        if (!header || !storedCredentials) {
+            return;
+        }
+        try {
+            const refreshed = JSON.parse(atob(header));
+            storedCredentials = { ...storedCredentials, token: refreshed.token, expiry: refreshed.expiry };
+            await putInStore(STORES.AUTH, { ...storedCredentials, key: 'credentials' });
+        } catch (e) {
+            console.error('Error storing refreshed credentials:', e);
+        }
     }
 
     /**
@@ -364,14 +401,46 @@
             };
         });
 
+        // Minutes per type per day, aligned with dailyTotals
+        const dailyByType = {};
+        pomodoros.forEach(p => {
+            const day = dailyTotals.findIndex(d => d.date === new Date(p.start_time).toLocaleDateString('en-CA'));
+            if (day === -1) return;
+            dailyByType[p.type] = dailyByType[p.type] || dailyTotals.map(() => 0);
+            dailyByType[p.type][day] += p.duration_minutes;
+        });
+
         return {
             total_minutes: totalMinutes,
             total_pomodoros: totalCount,
             by_type: byType,
-            daily_totals: dailyTotals
+            daily_totals: dailyTotals,
+            daily_by_type: dailyByType
         };
     }
 
+    /**
+     * Fetch report totals aggregated by the server, or null to compute them locally.
+     * Only used when nothing is waiting to sync, so the Sheet holds the same data as IndexedDB.
+     */
+    async function fetchServerReport(startIso, endIso) {
+        if (!authStatus || !authStatus.logged_in || !isOnline || pendingSyncCount > 0) {
+            return null;
+        }
+        try {
+            const params = new URLSearchParams({
+                start_date: startIso,
+                end_date: endIso,
+                tz: Intl.DateTimeFormat().resolvedOptions().timeZone
+            });
+            const res = await authenticatedFetch(`/api/sheets/report?${params}`);
+            return res.ok ? await res.json() : null;
+        } catch (e) {
+            console.warn('Server report failed, computing locally:', e);
+            return null;
+        }
+    }
+
     /**
      * Parse ISO date range and build dates list
      */
@@ -443,43 +512,16 @@
     }
 
     /**
-     * Sync a single operation to Google Sheets
+     * Sync a settings queue item to Google Sheets
+     * (pomodoro items go through syncPomodoroBatch)
      */
-    async function syncOperationToSheets(queueItem) {
-        const { operation, store, record_id, data } = queueItem;
-
-        if (store !== 'pomodoros' && store !== 'settings') {
-            return true; // Unknown store, skip
-        }
-
+    async function syncSettingsToSheets(queueItem) {
         try {
-            if (store === 'pomodoros') {
-                if (operation === 'create') {
-                    const res = await authenticatedFetch('/api/sheets/pomodoros', {
-                        method: 'POST',
-                        body: JSON.stringify(data)
-                    });
-                    if (!res.ok) throw new Error(`HTTP ${res.status}`);
-                } else if (operation === 'update') {
-                    const res = await authenticatedFetch(`/api/sheets/pomodoros/${record_id}`, {
-                        method: 'PUT',
-                        body: JSON.stringify(data)
-                    });
-                    if (!res.ok) throw new Error(`HTTP ${res.status}`);
-                } else if (operation === 'delete') {
-                    const res = await authenticatedFetch(`/api/sheets/pomodoros/${record_id}`, {
-                        method: 'DELETE'
-                    });
-                    // 404 on delete is OK - record already doesn't exist
-                    if (!res.ok && res.status !== 404) throw new Error(`HTTP ${res.status}`);
-                }
-            } else if (store === 'settings') {
-                const res = await authenticatedFetch('/api/sheets/settings', {
-                    method: 'POST',
-                    body: JSON.stringify(data)
-                });
-                if (!res.ok) throw new Error(`HTTP ${res.status}`);
-            }
+            const res = await authenticatedFetch('/api/sheets/settings', {
+                method: 'POST',
+                body: JSON.stringify(queueItem.data)
+            });
+            if (!res.ok) throw new Error(`HTTP ${res.status}`);
             return true;
         } catch (e) {
             console.error('Sync operation failed:', e);
@@ -487,8 +529,68 @@
         }
     }
 
+    /**
+     * Sync a batch of pomodoro queue items through /api/sheets/sync
+     * Returns one boolean per item: true if it reached Sheets (or no longer needs to)
+     */
+    async function syncPomodoroBatch(items) {
+        const res = await authenticatedFetch('/api/sheets/sync', {
+            method: 'POST',
+            body: JSON.stringify({
+                operations: items.map(item => ({
+                    operation: item.operation,
+                    record_id: item.record_id,
+                    data: item.data
+                }))
+            })
+        });
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const { results } = await res.json();
+
+        return items.map((item, i) => {
+            const status = results[i] && results[i].status;
+            // Duplicate create = already in Sheets; missing row on delete = already gone
+            return status === 'ok' || status === 'duplicate' ||
+                (status === 'not_found' && item.operation === 'delete');
+        });
+    }
+
+    /**
+     * Mark a queue item as synced and remove it from the queue
+     */
+    async function completeQueueItem(item) {
+        // Mark the pomodoro as synced
+        if (item.store === 'pomodoros' && item.operation !== 'delete') {
+            const pomo = await getFromStore(STORES.POMODOROS, item.record_id);
+            if (pomo) {
+                pomo.synced = true;
+                await putInStore(STORES.POMODOROS, pomo);
+            }
+        }
+
+        // Remove from queue
+        await deleteFromStore(STORES.SYNC_QUEUE, item.id);
+    }
+
+    /**
+     * Record a failed sync attempt, dropping the item after MAX_SYNC_RETRIES
+     */
+    async function failQueueItem(item) {
+        // Update retry count
+        item.retries = (item.retries || 0) + 1;
+        if (item.retries >= MAX_SYNC_RETRIES) {
+            console.error('Max retries reached for sync item:', item);
+            lastSyncError = `Failed to sync after ${MAX_SYNC_RETRIES} retries`;
+            // Remove failed item after max retries
+            await deleteFromStore(STORES.SYNC_QUEUE, item.id);
+        } else {
+            await putInStore(STORES.SYNC_QUEUE, item);
+        }
+    }
+
     /**
      * Process the sync queue - push local changes to Sheets
+     * Pomodoro operations are sent in batches; settings are sent one at a time
      * Uses promise-based locking to prevent race conditions
      */
     async function processSyncQueue() {
@@ -517,35 +619,40 @@
             // Sort by created_at to process in order
             queue.sort((a, b) => new Date(a.created_at) - new Date(b.created_at));
 
-            for (const item of queue) {
-                try {
-                    await syncOperationToSheets(item);
-
-                    // Mark the pomodoro as synced
-                    if (item.store === 'pomodoros' && item.operation !== 'delete') {
-                        const pomo = await getFromStore(STORES.POMODOROS, item.record_id);
-                        if (pomo) {
-                            pomo.synced = true;
-                            await putInStore(STORES.POMODOROS, pomo);
-                        }
-                    }
+            const pomodoroItems = queue.filter(item => item.store === 'pomodoros');
+            const settingsItems = queue.filter(item => item.store === 'settings');
+            // Items for any other store can't be synced - drop them
+            for (const item of queue.filter(item => item.store !== 'pomodoros' && item.store !== 'settings')) {
+                await deleteFromStore(STORES.SYNC_QUEUE, item.id);
+            }
 
-                    // Remove from queue
-                    await deleteFromStore(STORES.SYNC_QUEUE, item.id);
+            for (let i = 0; i < pomodoroItems.length; i += SYNC_BATCH_SIZE) {
+                const batch = pomodoroItems.slice(i, i + SYNC_BATCH_SIZE);
+                let outcomes;
+                try {
+                    outcomes = await syncPomodoroBatch(batch);
                 } catch (e) {
-                    // Update retry count
-                    item.retries = (item.retries || 0) + 1;
-                    if (item.retries >= MAX_SYNC_RETRIES) {
-                        console.error('Max retries reached for sync item:', item);
-                        lastSyncError = `Failed to sync after ${MAX_SYNC_RETRIES} retries`;
-                        // Remove failed item after max retries
-                        await deleteFromStore(STORES.SYNC_QUEUE, item.id);
+                    console.error('Batch sync failed:', e);
+                    outcomes = batch.map(() => false);
+                }
+                for (let j = 0; j < batch.length; j++) {
+                    if (outcomes[j]) {
+                        await completeQueueItem(batch[j]);
                     } else {
-                        await putInStore(STORES.SYNC_QUEUE, item);
+                        await failQueueItem(batch[j]);
                     }
                 }
             }
 
+            for (const item of settingsItems) {
+                try {
+                    await syncSettingsToSheets(item);
+                    await completeQueueItem(item);
+                } catch (e) {
+                    await failQueueItem(item);
+                }
+            }
+
             // Update last sync time
             await putInStore(STORES.SYNC_STATUS, {
                 key: 'last_push_sync',
@@ -565,8 +672,12 @@
 
     /**
      * Pull data from Google Sheets to IndexedDB
+     * Background pulls only fetch rows appended since the saved pull_cursor; pass full: true
+     * (explicit refreshes) to re-read every row, which recovers rows missing locally above it
+     * @param {object} [options]
+     * @param {boolean} [options.full=false] - Ignore the saved cursor and pull every row
      */
-    async function syncFromSheets() {
+    async function syncFromSheets({ full = false } = {}) {
         if (!authStatus || !authStatus.logged_in || !isOnline) {
             return { success: false, error: 'Not logged in or offline' };
         }
@@ -576,15 +687,19 @@
         dispatchSyncStatusEvent();
 
         try {
-            // Fetch pomodoros from Sheets
-            const pomosRes = await authenticatedFetch('/api/sheets/pomodoros');
-            if (!pomosRes.ok) throw new Error(`HTTP ${pomosRes.status}`);
-            const sheetsPomodoros = await pomosRes.json();
-
-            // Fetch settings from Sheets
-            const settingsRes = await authenticatedFetch('/api/sheets/settings');
-            if (!settingsRes.ok) throw new Error(`HTTP ${settingsRes.status}`);
-            const sheetsSettings = await settingsRes.json();
+            // Fetch settings plus pomodoros appended since the last pull in one request
+            // (server falls back to all rows if needed)
+            const savedCursor = await getFromStore(STORES.SYNC_STATUS, 'pull_cursor');
+            const cursor = !full && savedCursor && savedCursor.spreadsheet_id === cachedSpreadsheetId ? savedCursor.value : null;
+            let snapshotUrl = '/api/sheets/snapshot';
+            if (cursor && cursor.id) {
+                snapshotUrl = `/api/sheets/snapshot?since_row=${cursor.row}&since_id=${encodeURIComponent(cursor.id)}`;
+            }
+            const snapshotRes = await authenticatedFetch(snapshotUrl);
+            if (!snapshotRes.ok) throw new Error(`HTTP ${snapshotRes.status}`);
+            const snapshot = await snapshotRes.json();
+            const sheetsPomodoros = snapshot.pomodoros;
+            const sheetsSettings = snapshot.settings;
 
             // Get local pomodoros to merge
             const localPomodoros = await getAllFromStore(STORES.POMODOROS);
@@ -614,6 +729,13 @@
                 });
             }
 
+            // Remember where this pull ended so the next one only fetches new rows
+            await putInStore(STORES.SYNC_STATUS, {
+                key: 'pull_cursor',
+                spreadsheet_id: cachedSpreadsheetId,
+                value: snapshot.cursor
+            });
+
             // Update last sync time
             await putInStore(STORES.SYNC_STATUS, {
                 key: 'last_pull_sync',
@@ -631,6 +753,77 @@
         }
     }
 
+    /**
+     * Pull from Sheets shortly after a change event, then let the views reload
+     */
+    function scheduleChangePull() {
+        clearTimeout(changePullTimer);
+        changePullTimer = setTimeout(async () => {
+            const result = await syncFromSheets();
+            if (result.success) {
+                window.dispatchEvent(new CustomEvent('acquacotta-storage-change'));
+            }
+        }, CHANGE_PULL_DEBOUNCE_MS);
+    }
+
+    /**
+     * Read server-sent change events for this spreadsheet until the feed is stopped.
+     * Uses fetch rather than EventSource, which can't send the X-Credentials header.
+     * Failed connections back off exponentially; after CHANGE_FEED_MAX_FAILURES in a row
+     * (or a 404 from a server without the feed) the feed stops and the regular sync carries on.
+     */
+    async function runChangeFeed(feed) {
+        let failures = 0;
+        while (changeFeed === feed) {
+            try {
+                const res = await authenticatedFetch('/api/sheets/events', { signal: feed.controller.signal });
+                if (res.status === 404) {
+                    failures = CHANGE_FEED_MAX_FAILURES;
+                }
+                if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+                failures = 0;
+                const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+                let buffer = '';
+                for (;;) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += value;
+                    let end;
+                    while ((end = buffer.indexOf('\n\n')) !== -1) {
+                        const message = buffer.slice(0, end);
+                        buffer = buffer.slice(end + 2);
+                        if (/^event: change$/m.test(message)) {
+                            scheduleChangePull();
+                        }
+                    }
+                }
+            } catch (e) {
+                if (changeFeed !== feed) return;
+                failures++;
+                console.warn('Change feed interrupted:', e);
+                if (failures >= CHANGE_FEED_MAX_FAILURES) {
+                    console.warn('Change feed unavailable, relying on regular sync');
+                    changeFeed = null;
+                    return;
+                }
+            }
+            await new Promise(resolve => setTimeout(resolve, CHANGE_FEED_RECONNECT_MS * 2 ** failures));
+        }
+    }
+
+    function startChangeFeed() {
+        if (changeFeed || !changeFeedAvailable || typeof TextDecoderStream === 'undefined') return;
+        changeFeed = { controller: new AbortController() };
+        runChangeFeed(changeFeed);
+    }
+
+    function stopChangeFeed() {
+        if (!changeFeed) return;
+        changeFeed.controller.abort();
+        changeFeed = null;
+        clearTimeout(changePullTimer);
+    }
+
     /**
      * Storage API
      */
@@ -643,6 +836,8 @@
             // Open IndexedDB first
             await openDatabase();
 
+            changeFeedAvailable = Boolean(status && status.change_feed);
+
             // Load credentials from AUTH store (ephemeral - OAuth tokens only)
             const creds = await loadCredentials();
 
@@ -752,6 +947,9 @@
                 } catch (e) {
                     console.error('Bidirectional sync during init failed:', e);
                 }
+
+                // Pull again whenever another device (or the Sheet itself) changes the data
+                startChangeFeed();
             }
         },
 
@@ -817,6 +1015,7 @@
          * @returns {Promise}
          */
         logout: async function() {
+            stopChangeFeed();
             await clearCredentials();
             cachedSpreadsheetId = null;  // Clear cached value (will reload from SETTINGS on next init)
             // Clear sync status so next login will re-sync from Sheet
@@ -1066,9 +1265,12 @@
                 endIso = range.end.toISOString();
             }
 
-            const allPomodoros = await getAllFromStore(STORES.POMODOROS);
-            const pomodoros = filterByDateRange(allPomodoros, startIso, endIso);
-            const stats = calculateReportStats(pomodoros, dates);
+            let stats = await fetchServerReport(startIso, endIso);
+            if (!stats) {
+                const allPomodoros = await getAllFromStore(STORES.POMODOROS);
+                const pomodoros = filterByDateRange(allPomodoros, startIso, endIso);
+                stats = calculateReportStats(pomodoros, dates);
+            }
 
             return {
                 period: period,
@@ -1086,10 +1288,11 @@
 
         /**
          * Sync from Google Sheets to local IndexedDB
+         * @param {object} [options] - { full: true } re-reads every row instead of the delta
          * @returns {Promise<object>}
          */
-        syncFromSheets: async function() {
-            return syncFromSheets();
+        syncFromSheets: async function(options) {
+            return syncFromSheets(options);
         },
 
         /**
@@ -16,6 +16,35 @@ import pytest
 os.environ["FLASK_SECRET_KEY"] = "test-secret-key"
 
 import app as app_module
+import sheets_quota
+import sheets_storage
+
+
+def reset_streams():
+    """Forget in-flight slots and change feeds, including those of streams a test never closed."""
+    app_module._admission.update(total=0, users={}, rejected=0)
+    app_module._change_feeds.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_sheets_caches():
+    """Clear process-local Sheets caches, quota and stream state so it doesn't leak between tests."""
+    sheets_storage.clear_caches()
+    sheets_quota.reset()
+    reset_streams()
+    yield
+    sheets_storage.clear_caches()
+    sheets_quota.reset()
+    reset_streams()
+
+
+@pytest.fixture(autouse=True)
+def mock_drive_service():
+    """Stand in for the Drive API, which conditional GETs ask for the spreadsheet's version."""
+    service = MagicMock()
+    service.files().get().execute.return_value = {"version": "1"}
+    with patch.object(app_module, "get_drive_service", return_value=service):
+        yield service
 
 
 @pytest.fixture
@@ -9,10 +9,23 @@ The server only handles:
 All data storage and CRUD operations happen in the browser's IndexedDB.
 """
 
+import base64
+import gzip
 import json
-from unittest.mock import patch
+import queue
+import time
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
 
+import pytest
+from flask.json.provider import DefaultJSONProvider
+from google.oauth2.credentials import Credentials
+from googleapiclient import discovery_cache
+from googleapiclient.errors import HttpError
+
+import app as app_module
 import sheets_storage
+from tests.conftest import AuthenticatedTestClient
 
 
 class TestIndexRoute:
@@ -120,6 +133,22 @@ class TestSheetsProxyEndpoints:
                 assert data[0]["name"] == "Test"
                 mock_get.assert_called_once()
 
+    def test_get_pomodoros_since_row(self, authenticated_session, mock_sheets_service):
+        """GET /api/sheets/pomodoros?since_row= should return a delta with a cursor."""
+        delta = {"pomodoros": [], "cursor": {"row": 10, "id": "id-10"}, "full": False}
+        with patch("app.get_sheets_service", return_value=mock_sheets_service):
+            with patch.object(sheets_storage, "get_pomodoros_since", return_value=delta) as mock_since:
+                response = authenticated_session.get("/api/sheets/pomodoros?since_row=10&since_id=id-10")
+                assert response.status_code == 200
+                assert json.loads(response.data) == delta
+                assert mock_since.call_args.args[2:] == (10, "id-10")
+
+    def test_get_pomodoros_since_row_invalid(self, authenticated_session, mock_sheets_service):
+        """A non-numeric since_row should be rejected."""
+        with patch("app.get_sheets_service", return_value=mock_sheets_service):
+            response = authenticated_session.get("/api/sheets/pomodoros?since_row=abc")
+            assert response.status_code == 400
+
     def test_create_pomodoro_with_auth(self, authenticated_session, mock_sheets_service, sample_pomodoro):
         """POST /api/sheets/pomodoros should proxy to Sheets when authenticated."""
         with patch("app.get_sheets_service", return_value=mock_sheets_service):
@@ -152,6 +181,35 @@ class TestSheetsProxyEndpoints:
                 assert response.status_code == 200
                 mock_delete.assert_called_once()
 
+    def test_sync_requires_auth(self, client):
+        """POST /api/sheets/sync should require authentication."""
+        response = client.post("/api/sheets/sync", json={"operations": []})
+        assert response.status_code == 401
+
+    def test_sync_with_auth(self, authenticated_session, mock_sheets_service, sample_pomodoro):
+        """POST /api/sheets/sync should pass the queued operations through in order."""
+        operations = [
+            {"operation": "create", "record_id": sample_pomodoro["id"], "data": sample_pomodoro},
+            {"operation": "delete", "record_id": "old-id"},
+        ]
+        with patch("app.get_sheets_service", return_value=mock_sheets_service):
+            with patch.object(
+                sheets_storage,
+                "apply_sync_operations",
+                return_value=[{"record_id": sample_pomodoro["id"], "status": "ok"}],
+            ) as mock_apply:
+                response = authenticated_session.post("/api/sheets/sync", json={"operations": operations})
+                assert response.status_code == 200
+                assert json.loads(response.data)["results"][0]["status"] == "ok"
+                assert mock_apply.call_args.args[2] == operations
+
+    def test_sync_rejects_oversized_batch(self, authenticated_session, mock_sheets_service):
+        """POST /api/sheets/sync should reject more than MAX_SYNC_OPERATIONS operations."""
+        operations = [{"operation": "delete", "record_id": f"id-{i}"} for i in range(501)]
+        with patch("app.get_sheets_service", return_value=mock_sheets_service):
+            response = authenticated_session.post("/api/sheets/sync", json={"operations": operations})
+            assert response.status_code == 400
+
     def test_get_settings_with_auth(self, authenticated_session, mock_sheets_service):
         """GET /api/sheets/settings should proxy to Sheets when authenticated."""
         with patch("app.get_sheets_service", return_value=mock_sheets_service):
@@ -179,6 +237,759 @@ class TestSheetsProxyEndpoints:
                 mock_save.assert_called_once()
 
 
+class TestPagination:
+    """Tests for ?limit=&cursor= pages of GET /api/sheets/pomodoros."""
+
+    def test_page_passes_cursor_and_formats_next(self, authenticated_session):
+        """The cursor should be split into row and ID, and next_cursor joined back up."""
+        page = {"pomodoros": [{"id": "id-8"}], "next": {"row": 8, "id": "id-8"}}
+        with (
+            patch("app.get_sheets_service"),
+            patch("sheets_storage.get_pomodoro_page", return_value=page) as get_page,
+        ):
+            response = authenticated_session.get("/api/sheets/pomodoros?limit=50&cursor=12:id-12")
+
+        assert response.status_code == 200
+        assert response.get_json() == {"pomodoros": [{"id": "id-8"}], "next_cursor": "8:id-8"}
+        assert get_page.call_args.args[2:] == (50, 12, "id-12")
+
+    def test_last_page_has_no_next_cursor(self, authenticated_session):
+        """The first page without a cursor should start at the tail, and the last page ends paging."""
+        with (
+            patch("app.get_sheets_service"),
+            patch("sheets_storage.get_pomodoro_page", return_value={"pomodoros": [], "next": None}) as get_page,
+        ):
+            response = authenticated_session.get("/api/sheets/pomodoros?limit=10")
+
+        assert response.get_json()["next_cursor"] is None
+        assert get_page.call_args.args[2:] == (10, None, None)
+
+    def test_rejects_bad_limit_and_cursor(self, authenticated_session):
+        """Out-of-range limits and malformed cursors should be a 400."""
+        too_many = app_module.MAX_PAGE_LIMIT + 1
+        assert authenticated_session.get("/api/sheets/pomodoros?limit=0").status_code == 400
+        assert authenticated_session.get(f"/api/sheets/pomodoros?limit={too_many}").status_code == 400
+        assert authenticated_session.get("/api/sheets/pomodoros?limit=10&cursor=abc").status_code == 400
+
+    def test_stale_cursor_is_gone(self, authenticated_session):
+        """A cursor whose pomodoro was deleted should tell the client to start over."""
+        with patch("app.get_sheets_service"), patch("sheets_storage.get_pomodoro_page", return_value=None):
+            response = authenticated_session.get("/api/sheets/pomodoros?limit=10&cursor=5:id-5")
+
+        assert response.status_code == 410
+
+
+class TestReport:
+    """Tests for the server-side report endpoint."""
+
+    def test_report_aggregates_range(self, authenticated_session, mock_sheets_service):
+        """The report should be bucketed in the requested time zone and carry only the rollups."""
+        rows = [
+            ["id-1", "Task", "Content", "2024-01-16T03:30:00Z", "2024-01-16T03:55:00Z", "25"],
+            ["id-2", "Task", "Team", "2024-01-16T14:00:00Z", "2024-01-16T14:25:00Z", "25"],
+        ]
+        table = sheets_storage.PomodoroTable.from_rows(rows)
+        with (
+            patch("app.get_sheets_service", return_value=mock_sheets_service),
+            patch("sheets_storage.get_pomodoro_table", return_value=(table, table.select())) as get_table,
+        ):
+            response = authenticated_session.get(
+                "/api/sheets/report?start_date=2024-01-15T05:00:00Z&end_date=2024-01-17T05:00:00Z&tz=America/New_York"
+            )
+
+        assert response.status_code == 200
+        report = response.get_json()
+        assert "pomodoros" not in report
+        assert report["by_type"] == {"Content": 25, "Team": 25}
+        assert report["daily_by_type"] == {"Content": [25, 0], "Team": [0, 25]}
+        assert get_table.call_args.args[2:] == ("2024-01-15T05:00:00Z", "2024-01-17T05:00:00Z")
+
+    def test_report_validates_query(self, authenticated_session):
+        """Missing dates, unknown zones and bad week starts should be a 400."""
+        base = "/api/sheets/report?start_date=2024-01-01T00:00:00Z&end_date=2024-02-01T00:00:00Z"
+        assert authenticated_session.get("/api/sheets/report").status_code == 400
+        assert authenticated_session.get(f"{base}&tz=Mars/Olympus").status_code == 400
+        assert authenticated_session.get(f"{base}&week_start=7").status_code == 400
+        reversed_range = "/api/sheets/report?start_date=2024-02-01T00:00:00Z&end_date=2024-01-01T00:00:00Z"
+        assert authenticated_session.get(reversed_range).status_code == 400
+
+    def test_report_requires_auth(self, client):
+        """GET /api/sheets/report should require authentication."""
+        assert client.get("/api/sheets/report").status_code == 401
+
+
+class TestSnapshot:
+    """Tests for the combined pomodoros + settings endpoint."""
+
+    def test_snapshot_requires_auth(self, client):
+        """GET /api/sheets/snapshot should require authentication."""
+        response = client.get("/api/sheets/snapshot")
+        assert response.status_code == 401
+
+    def test_snapshot_passes_cursor(self, authenticated_session, mock_sheets_service):
+        """The cursor and default settings should be passed through to the storage layer."""
+        snapshot = {"pomodoros": [], "cursor": {"row": 5, "id": "id-5"}, "full": False, "settings": {}}
+        with (
+            patch("app.get_sheets_service", return_value=mock_sheets_service),
+            patch("sheets_storage.get_snapshot", return_value=snapshot) as get_snapshot,
+        ):
+            response = authenticated_session.get("/api/sheets/snapshot?since_row=5&since_id=id-5")
+
+            assert response.status_code == 200
+            assert response.get_json() == snapshot
+            args = get_snapshot.call_args.args
+            assert args[2] is app_module.DEFAULT_SETTINGS
+            assert args[3:] == (5, "id-5")
+
+    def test_snapshot_rejects_bad_cursor(self, authenticated_session):
+        """A non-numeric since_row should be a 400."""
+        response = authenticated_session.get("/api/sheets/snapshot?since_row=abc")
+        assert response.status_code == 400
+
+
+class TestConditionalGet:
+    """Tests for ETag/304 responses keyed to the spreadsheet's Drive version."""
+
+    def test_matching_etag_skips_sheet_read(self, authenticated_session, mock_sheets_service):
+        """An unchanged sheet should answer If-None-Match with an empty 304 and no Sheets call."""
+        with (
+            patch("app.get_sheets_service", return_value=mock_sheets_service),
+            patch("sheets_storage.get_pomodoros", return_value=[]) as get_pomodoros,
+        ):
+            first = authenticated_session.get("/api/sheets/pomodoros")
+            etag = first.headers["ETag"]
+            second = authenticated_session.get("/api/sheets/pomodoros", headers={"If-None-Match": etag})
+
+        assert first.status_code == 200
+        assert first.headers["Cache-Control"] == app_module.SHEET_DATA_CACHE_CONTROL
+        assert second.status_code == 304
+        assert second.data == b""
+        assert second.headers["ETag"] == etag
+        get_pomodoros.assert_called_once()
+
+    def test_new_version_changes_etag(self, authenticated_session, mock_sheets_service, mock_drive_service):
+        """An edit bumps the Drive version, so the old ETag should get the full response."""
+        with (
+            patch("app.get_sheets_service", return_value=mock_sheets_service),
+            patch("sheets_storage.get_settings", return_value={"daily_minutes_goal": 300}),
+        ):
+            etag = authenticated_session.get("/api/sheets/settings").headers["ETag"]
+            mock_drive_service.files().get().execute.return_value = {"version": "2"}
+            response = authenticated_session.get("/api/sheets/settings", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.get_json() == {"daily_minutes_goal": 300}
+        assert response.headers["ETag"] != etag
+
+    def test_etag_depends_on_query(self, authenticated_session, mock_sheets_service):
+        """Different cursors return different bodies, so they must not share an ETag."""
+        snapshot = {"pomodoros": [], "cursor": {"row": 1, "id": None}, "full": True, "settings": {}}
+        with (
+            patch("app.get_sheets_service", return_value=mock_sheets_service),
+            patch("sheets_storage.get_snapshot", return_value=snapshot),
+        ):
+            full = authenticated_session.get("/api/sheets/snapshot")
+            delta = authenticated_session.get("/api/sheets/snapshot?since_row=5&since_id=id-5")
+
+        assert full.headers["ETag"] != delta.headers["ETag"]
+
+    def test_unreadable_version_serves_untagged(self, authenticated_session, mock_sheets_service, mock_drive_service):
+        """If Drive can't report the version, the data should still be served, just without an ETag."""
+        mock_drive_service.files().get().execute.side_effect = HttpError(MagicMock(status=403), b"forbidden")
+        with (
+            patch("app.get_sheets_service", return_value=mock_sheets_service),
+            patch("sheets_storage.get_pomodoros", return_value=[]),
+        ):
+            response = authenticated_session.get("/api/sheets/pomodoros", headers={"If-None-Match": "*"})
+
+        assert response.status_code == 200
+        assert "ETag" not in response.headers
+
+
+class TestChangeFeed:
+    """Tests for the server-sent change notifications."""
+
+    @pytest.fixture(autouse=True)
+    def enable_change_feed(self):
+        """The feed is off by default outside gevent workers."""
+        with patch("app.CHANGE_FEED_ENABLED", True):
+            yield
+
+    def read_events(self, response, count):
+        """Read the next count events (skipping keep-alives) from a streamed response."""
+        events = []
+        for chunk in response.response:
+            if chunk.startswith(b"event: change"):
+                events.append(json.loads(chunk.split(b"data: ", 1)[1]))
+                if len(events) == count:
+                    break
+        return events
+
+    def test_events_require_auth(self, client):
+        """GET /api/sheets/events should require authentication."""
+        assert client.get("/api/sheets/events").status_code == 401
+
+    def test_disabled_feed_returns_404(self, authenticated_session):
+        """With the feed disabled the endpoint should be gone and auth status should say so."""
+        with patch("app.CHANGE_FEED_ENABLED", False):
+            assert authenticated_session.get("/api/sheets/events").status_code == 404
+            assert authenticated_session.get("/api/auth/status").get_json()["change_feed"] is False
+
+    def test_write_is_pushed_to_open_stream(self, authenticated_session, mock_sheets_service, sample_settings):
+        """A settings save through the server should notify streams for that spreadsheet."""
+        with (
+            patch("app.CHANGE_FEED_KEEPALIVE_SECONDS", 0.01),
+            patch("app.get_sheets_service", return_value=mock_sheets_service),
+            patch("sheets_storage.save_settings"),
+        ):
+            stream = authenticated_session.get("/api/sheets/events", buffered=False)
+            assert stream.mimetype == "text/event-stream"
+            authenticated_session.post("/api/sheets/settings", json=sample_settings)
+
+            assert self.read_events(stream, 1) == [{"kind": "settings", "source": "write"}]
+            stream.close()
+
+        assert app_module._change_feeds == {}
+
+    def test_outside_edit_is_found_by_version_check(self, authenticated_session, mock_drive_service):
+        """A Drive version bump with no write through this server should still produce an event."""
+        with (
+            patch("app.CHANGE_FEED_KEEPALIVE_SECONDS", 0.01),
+            patch("app.CHANGE_FEED_VERSION_CHECK_SECONDS", 0),
+        ):
+            stream = authenticated_session.get("/api/sheets/events", buffered=False)
+            mock_drive_service.files().get().execute.return_value = {"version": "2"}
+
+            assert self.read_events(stream, 1) == [{"kind": "all", "source": "version"}]
+            stream.close()
+
+    def test_failed_write_is_not_announced(self, authenticated_session):
+        """Only successful writes should be published."""
+        subscriber = app_module.subscribe_changes("fake-spreadsheet-id")
+        with patch("app.get_sheets_service", return_value=None):
+            authenticated_session.post("/api/sheets/pomodoros", json={"name": "Task"})
+
+        assert subscriber.empty()
+
+    def test_stream_limit_returns_429(self, authenticated_session):
+        """Streams beyond the per-worker limit should be refused with Retry-After."""
+        with patch("app.CHANGE_FEED_MAX_STREAMS", 1):
+            assert app_module.subscribe_changes("other-spreadsheet-id") is not None
+            response = authenticated_session.get("/api/sheets/events")
+
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+
+    def test_stream_does_not_hold_admission_slot(self, authenticated_session):
+        """An open stream should leave the user's admission slots free for real requests."""
+        with patch("app.CHANGE_FEED_KEEPALIVE_SECONDS", 0.01):
+            stream = authenticated_session.get("/api/sheets/events", buffered=False)
+            assert app_module.get_admission_stats()["in_flight"] == 0
+            stream.close()
+
+
+class TestCompression:
+    """Tests for gzip/brotli response compression."""
+
+    def make_pomodoros(self, count):
+        return [
+            {
+                "id": f"id-{i}",
+                "name": "Write report",
+                "type": "Content",
+                "start_time": "2024-01-15T10:00:00Z",
+                "end_time": "2024-01-15T10:25:00Z",
+                "duration_minutes": 25,
+                "notes": "",
+            }
+            for i in range(count)
+        ]
+
+    def test_large_json_is_gzipped(self, authenticated_session):
+        """A full-history JSON body should be gzipped and shrink several times over."""
+        with (
+            patch("app.get_sheets_service"),
+            patch("sheets_storage.get_pomodoros", return_value=self.make_pomodoros(500)),
+        ):
+            plain = authenticated_session.get("/api/sheets/pomodoros")
+            response = authenticated_session.get("/api/sheets/pomodoros", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert gzip.decompress(response.data) == plain.data
+        assert len(response.data) * 5 < len(plain.data)
+
+    def test_brotli_is_preferred_when_available(self, authenticated_session):
+        """Clients accepting br should get brotli when the server has it installed."""
+        brotli = pytest.importorskip("brotli")
+        with (
+            patch("app.get_sheets_service"),
+            patch("sheets_storage.get_pomodoros", return_value=self.make_pomodoros(100)),
+        ):
+            response = authenticated_session.get("/api/sheets/pomodoros", headers={"Accept-Encoding": "gzip, br"})
+
+        assert response.headers["Content-Encoding"] == "br"
+        assert len(json.loads(brotli.decompress(response.data))) == 100
+
+    def test_small_body_is_not_compressed(self, authenticated_session):
+        """Bodies under the threshold should go out as is."""
+        with patch("app.get_sheets_service"), patch("sheets_storage.get_pomodoros", return_value=[]):
+            response = authenticated_session.get("/api/sheets/pomodoros", headers={"Accept-Encoding": "gzip"})
+
+        assert "Content-Encoding" not in response.headers
+        assert response.get_json() == []
+
+    def test_streamed_export_is_compressed(self, authenticated_session, mock_sheets_service):
+        """The CSV export should be compressed as it streams and decode to the same CSV."""
+        row = ["id-1", "Task", "Content", "2024-01-15T10:00:00Z", "2024-01-15T10:25:00Z", "25"]
+        mock_sheets_service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "gridProperties": {"rowCount": 100}}}]
+        }
+        execute = mock_sheets_service.spreadsheets().values().get().execute
+        with patch("app.get_sheets_service", return_value=mock_sheets_service):
+            execute.side_effect = [{"values": [row]}]
+            plain = authenticated_session.get("/api/sheets/export").get_data()
+            execute.side_effect = [{"values": [row]}]
+            response = authenticated_session.get("/api/sheets/export", headers={"Accept-Encoding": "gzip"})
+
+            assert response.is_streamed
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert gzip.decompress(response.get_data()) == plain
+
+    def test_compressed_etag_is_weak_and_still_matches(self, authenticated_session):
+        """The ETag of an encoded body should be weak, and revalidating with it should give a 304."""
+        headers = {"Accept-Encoding": "gzip"}
+        with (
+            patch("app.get_sheets_service"),
+            patch("sheets_storage.get_pomodoros", return_value=self.make_pomodoros(100)),
+        ):
+            etag = authenticated_session.get("/api/sheets/pomodoros", headers=headers).headers["ETag"]
+            headers["If-None-Match"] = etag
+            response = authenticated_session.get("/api/sheets/pomodoros", headers=headers)
+
+        assert etag.startswith('W/"')
+        assert response.status_code == 304
+
+
+class TestExport:
+    """Tests for the streamed CSV export."""
+
+    @pytest.fixture(autouse=True)
+    def pomodoros_grid(self, mock_sheets_service):
+        """Give the Pomodoros sheet a grid small enough to be read in one chunk."""
+        mock_sheets_service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "gridProperties": {"rowCount": 100}}}]
+        }
+
+    def test_export_streams_csv(self, authenticated_session, mock_sheets_service):
+        """GET /api/sheets/export should stream properly quoted CSV read chunk by chunk."""
+        mock_sheets_service.spreadsheets().values().get().execute.side_effect = [
+            {
+                "values": [
+                    ["id-1", 'Say "hi"', "Content", "2024-01-15T10:00:00Z", "2024-01-15T10:25:00Z", "25", "a,b"],
+                    ["id-2", "Task", "Team", "2024-01-15T11:00:00Z", "2024-01-15T11:25:00Z", "25"],
+                    ["incomplete"],
+                ]
+            },
+        ]
+        with patch("app.get_sheets_service", return_value=mock_sheets_service):
+            response = authenticated_session.get("/api/sheets/export")
+
+            assert response.status_code == 200
+            assert response.is_streamed
+            assert response.mimetype == "text/csv"
+            assert response.get_data(as_text=True).splitlines() == [
+                "id,name,type,start_time,end_time,duration_minutes,notes",
+                '"id-1","Say ""hi""","Content","2024-01-15T10:00:00Z","2024-01-15T10:25:00Z",25,"a,b"',
+                '"id-2","Task","Team","2024-01-15T11:00:00Z","2024-01-15T11:25:00Z",25,""',
+            ]
+
+    def test_export_ndjson_has_typed_duration(self, authenticated_session, mock_sheets_service):
+        """?format=ndjson should stream one JSON object per pomodoro with an integer duration."""
+        mock_sheets_service.spreadsheets().values().get().execute.side_effect = [
+            {"values": [["id-1", "Task", "Content", "2024-01-15T10:00:00Z", "2024-01-15T10:25:00Z", "25"]]},
+        ]
+        with patch("app.get_sheets_service", return_value=mock_sheets_service):
+            response = authenticated_session.get("/api/sheets/export?format=ndjson")
+
+            assert response.status_code == 200
+            assert response.mimetype == "application/x-ndjson"
+            records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+            assert records == [
+                {
+                    "id": "id-1",
+                    "name": "Task",
+                    "type": "Content",
+                    "start_time": "2024-01-15T10:00:00Z",
+                    "end_time": "2024-01-15T10:25:00Z",
+                    "duration_minutes": 25,
+                    "notes": "",
+                }
+            ]
+
+    def test_export_format_from_accept_header(self, authenticated_session, mock_sheets_service):
+        """Without ?format=, the Accept header should choose the export format."""
+        mock_sheets_service.spreadsheets().values().get().execute.side_effect = [{}]
+        with patch("app.get_sheets_service", return_value=mock_sheets_service):
+            response = authenticated_session.get("/api/sheets/export", headers={"Accept": "application/x-ndjson"})
+
+            assert response.mimetype == "application/x-ndjson"
+
+    def test_export_rejects_unknown_format(self, authenticated_session):
+        """An unknown ?format= should be a 400."""
+        response = authenticated_session.get("/api/sheets/export?format=xlsx")
+        assert response.status_code == 400
+
+    def test_export_parquet_without_pyarrow(self, authenticated_session):
+        """Parquet export should report 501 when pyarrow isn't installed."""
+        with patch("app.pa", None):
+            response = authenticated_session.get("/api/sheets/export?format=parquet")
+            assert response.status_code == 501
+
+    def test_export_parquet_typed_columns(self, authenticated_session, mock_sheets_service):
+        """Parquet export should carry timestamp, integer and dictionary-encoded columns."""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        mock_sheets_service.spreadsheets().values().get().execute.side_effect = [
+            {"values": [["id-1", "Task", "Content", "2024-01-15T10:00:00Z", "2024-01-15T10:25:00Z", "25", "n"]]},
+        ]
+        with patch("app.get_sheets_service", return_value=mock_sheets_service):
+            response = authenticated_session.get("/api/sheets/export?format=parquet")
+
+            table = pq.read_table(pa.BufferReader(response.get_data()))
+            assert table.schema.field("duration_minutes").type == pa.int32()
+            assert pa.types.is_timestamp(table.schema.field("start_time").type)
+            assert pa.types.is_dictionary(table.schema.field("type").type)
+            assert table.column("duration_minutes").to_pylist() == [25]
+
+
+class TestDeduplicate:
+    """Tests for the deduplicate endpoint."""
+
+    def test_deduplicate_rejects_unknown_mode(self, authenticated_session):
+        """An unknown dedupe mode should be a 400."""
+        response = authenticated_session.post("/api/sheets/deduplicate", json={"mode": "fast"})
+        assert response.status_code == 400
+
+    def test_deduplicate_passes_mode(self, authenticated_session, mock_sheets_service):
+        """The requested mode should be passed through to the storage layer."""
+        with (
+            patch("app.get_sheets_service", return_value=mock_sheets_service),
+            patch("sheets_storage.deduplicate_pomodoros", return_value={"removed": 0, "total": 0}) as dedupe,
+        ):
+            response = authenticated_session.post("/api/sheets/deduplicate", json={"mode": "compact"})
+
+            assert response.status_code == 200
+            assert dedupe.call_args.kwargs["mode"] == "compact"
+
+
+class TestClearSheets:
+    """Tests for clearing the Pomodoros sheet."""
+
+    def test_clear_deletes_data_rows_and_counts_pomodoros(self, authenticated_session, mock_sheets_service):
+        """Only rows up to the last ID should be deleted, and "cleared" should count pomodoros."""
+        mock_sheets_service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "sheetId": 7, "gridProperties": {"rowCount": 1000}}}]
+        }
+        mock_sheets_service.spreadsheets().values().get().execute.return_value = {
+            "values": [["id"], ["id-1"], [], ["id-2"], ["id-3"]]
+        }
+        with patch("app.get_sheets_service", return_value=mock_sheets_service):
+            response = authenticated_session.post("/api/sheets/clear")
+
+        assert response.get_json() == {"status": "ok", "cleared": 3}
+        requests = mock_sheets_service.spreadsheets().batchUpdate.call_args.kwargs["body"]["requests"]
+        assert requests[0]["deleteDimension"]["range"] == {
+            "sheetId": 7,
+            "dimension": "ROWS",
+            "startIndex": 1,
+            "endIndex": 5,
+        }
+
+    def test_clear_header_only_sheet_deletes_nothing(self, authenticated_session, mock_sheets_service):
+        """A sheet with only its header should not be touched."""
+        mock_sheets_service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "sheetId": 7}}]
+        }
+        mock_sheets_service.spreadsheets().values().get().execute.return_value = {"values": [["id"]]}
+        with patch("app.get_sheets_service", return_value=mock_sheets_service):
+            response = authenticated_session.post("/api/sheets/clear")
+
+        assert response.get_json() == {"status": "ok", "cleared": 0}
+        mock_sheets_service.spreadsheets().batchUpdate.assert_not_called()
+
+
+class TestBuildService:
+    """Tests for building Google API clients from cached discovery documents."""
+
+    def test_discovery_document_is_loaded_once(self, app):
+        """Repeated builds should parse the discovery document once and still bind each credential."""
+        app_module.get_discovery_document.cache_clear()
+        first_credentials = Credentials(token="first-token")
+        second_credentials = Credentials(token="second-token")
+        with (
+            app.test_request_context(),
+            patch("app.discovery_cache.get_static_doc", wraps=discovery_cache.get_static_doc) as get_static_doc,
+        ):
+            first = app_module.build_service("sheets", "v4", first_credentials)
+            second = app_module.build_service("sheets", "v4", second_credentials)
+
+            get_static_doc.assert_called_once_with("sheets", "v4")
+            assert first is not second
+            assert first._http.credentials is first_credentials
+            assert second._http.credentials is second_credentials
+            request = first.spreadsheets().values().get(spreadsheetId="sheet-id", range="A1")
+            assert request.uri.startswith("https://sheets.googleapis.com/v4/spreadsheets/sheet-id/values/A1")
+
+    def test_falls_back_to_build_without_static_document(self, app):
+        """APIs without a bundled discovery document should still go through build()."""
+        with (
+            app.test_request_context(),
+            patch("app.get_discovery_document", return_value=None),
+            patch("app.build", return_value="service") as build,
+        ):
+            assert app_module.build_service("unknown", "v1", Credentials(token="t")) == "service"
+            assert build.call_args.args == ("unknown", "v1")
+
+
+class TestRequestAuth:
+    """Tests for the per-request auth context."""
+
+    def test_credentials_header_is_decoded_once(self, authenticated_session):
+        """All helpers used by an endpoint should share one parse of X-Credentials."""
+        with (
+            patch("app.parse_request_auth", wraps=app_module.parse_request_auth) as parse_request_auth,
+            patch("sheets_storage.get_pomodoros", return_value=[]),
+        ):
+            response = authenticated_session.get("/api/sheets/pomodoros")
+
+            assert response.status_code == 200
+            parse_request_auth.assert_called_once()
+
+    def test_non_object_credentials_are_rejected(self, client):
+        """A header that decodes to something other than a JSON object should count as logged out."""
+        header = base64.b64encode(json.dumps(["token"]).encode()).decode()
+        response = client.get("/api/sheets/pomodoros", headers={"X-Credentials": header})
+        assert response.status_code == 401
+
+    def test_payload_has_credentials_stripped(self, app):
+        """Body credentials should be split from the payload the endpoints see."""
+        body = {"_credentials": {"token": "t", "spreadsheet_id": "s"}, "name": "Task"}
+        with app.test_request_context("/api/sheets/pomodoros", method="POST", json=body):
+            auth = app_module.get_request_auth()
+
+            assert auth.payload == {"name": "Task"}
+            assert auth.spreadsheet_id == "s"
+            assert auth.is_logged_in
+            assert app_module.get_request_data() is auth.payload
+
+
+class TestTokenRefresh:
+    """Tests for refreshing expired access tokens and handing them back to the client."""
+
+    @staticmethod
+    def expired_credentials(client):
+        """Wrap client with credentials whose access token expired a minute ago."""
+        expiry = datetime.now(timezone.utc) - timedelta(minutes=1)
+        return AuthenticatedTestClient(
+            client,
+            {
+                "token": "expired-token",
+                "refresh_token": "refresh-token",
+                "client_id": "client-id",
+                "client_secret": "client-secret",
+                "expiry": expiry.isoformat(),
+                "spreadsheet_id": "fake-spreadsheet-id",
+            },
+        )
+
+    @pytest.fixture(autouse=True)
+    def clear_token_cache(self):
+        """Start each test with an empty refreshed-token cache."""
+        app_module._refreshed_tokens.clear()
+        app_module._token_refresh_locks.clear()
+
+    def test_expired_token_refreshes_once_and_is_handed_back(self, client):
+        """An expired token should be refreshed once per worker and returned in a response header."""
+
+        def refresh(credentials, _request):
+            credentials.token = "new-token"
+            credentials.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+
+        session = self.expired_credentials(client)
+        with (
+            patch("google.oauth2.credentials.Credentials.refresh", autospec=True, side_effect=refresh) as mock_refresh,
+            patch("sheets_storage.get_pomodoros", return_value=[]) as get_pomodoros,
+        ):
+            first = session.get("/api/sheets/pomodoros")
+            second = session.get("/api/sheets/pomodoros")
+
+            mock_refresh.assert_called_once()
+            service = get_pomodoros.call_args.args[0]
+            assert service._http.credentials.token == "new-token"
+
+        for response in (first, second):
+            refreshed = json.loads(base64.b64decode(response.headers["X-Refreshed-Credentials"]))
+            assert refreshed["token"] == "new-token"
+            assert refreshed["expiry"].endswith("Z")
+            assert response.headers["Cache-Control"] == "no-store"
+
+    def test_valid_token_is_not_refreshed(self, authenticated_session):
+        """A token without a known expiry should be used as-is, with no handback header."""
+        with (
+            patch("google.oauth2.credentials.Credentials.refresh") as mock_refresh,
+            patch("sheets_storage.get_pomodoros", return_value=[]),
+        ):
+            response = authenticated_session.get("/api/sheets/pomodoros")
+
+            mock_refresh.assert_not_called()
+            assert "X-Refreshed-Credentials" not in response.headers
+
+
+class TestHttpPool:
+    """Tests for the pooled keep-alive transport to Google APIs."""
+
+    def test_services_share_one_transport_per_request(self, app):
+        """All clients built during a request should reuse one transport, each with its own credentials."""
+        with patch("app._http_pool", queue.LifoQueue(maxsize=2)), app.test_request_context():
+            sheets = app_module.build_service("sheets", "v4", Credentials(token="a"))
+            drive = app_module.build_service("drive", "v3", Credentials(token="b"))
+
+            assert sheets._http.http.http is drive._http.http.http
+            assert sheets._http.credentials is not drive._http.credentials
+
+    def test_transport_is_reused_by_the_next_request(self, app):
+        """A transport should go back to the pool when the request ends and be handed out again."""
+        with patch("app._http_pool", queue.LifoQueue(maxsize=2)):
+            with app.test_request_context():
+                first = app_module.build_service("sheets", "v4", Credentials(token="a"))._http.http.http
+            with app.test_request_context():
+                second = app_module.build_service("sheets", "v4", Credentials(token="b"))._http.http.http
+
+        assert first is second
+
+    def test_idle_transport_drops_its_connections(self):
+        """A transport idle past the timeout should be closed before it is reused."""
+        pool = queue.LifoQueue(maxsize=2)
+        http = MagicMock()
+        pool.put_nowait((http, time.monotonic() - app_module.GOOGLE_HTTP_IDLE_TIMEOUT_SECONDS - 1))
+        with patch("app._http_pool", pool):
+            assert app_module.acquire_http() is http
+        http.close.assert_called_once()
+
+    def test_full_pool_closes_extra_transports(self):
+        """Transports beyond the pool size should be closed instead of kept."""
+        pool = queue.LifoQueue(maxsize=1)
+        kept = MagicMock()
+        extra = MagicMock()
+        with patch("app._http_pool", pool):
+            app_module.release_http(kept)
+            app_module.release_http(extra)
+
+        kept.close.assert_not_called()
+        extra.close.assert_called_once()
+
+
+class TestAdmissionControl:
+    """Tests for the per-user and per-worker in-flight request limits."""
+
+    def test_user_over_limit_gets_fast_429(self, authenticated_session):
+        """A spreadsheet already at its in-flight limit should be turned away with Retry-After."""
+        with patch("app.ADMISSION_MAX_PER_USER", 1), patch("app.get_sheets_service") as get_service:
+            assert app_module.try_admit("fake-spreadsheet-id")
+            try:
+                response = authenticated_session.get("/api/sheets/pomodoros")
+            finally:
+                app_module.release_admission("fake-spreadsheet-id")
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == str(app_module.ADMISSION_RETRY_AFTER_SECONDS)
+        get_service.assert_not_called()
+
+    def test_other_users_are_still_admitted(self, authenticated_session, mock_sheets_service):
+        """One user at the limit should not block a different spreadsheet."""
+        mock_sheets_service.spreadsheets().values().get().execute.return_value = {}
+        with (
+            patch("app.ADMISSION_MAX_PER_USER", 1),
+            patch("app.get_sheets_service", return_value=mock_sheets_service),
+        ):
+            assert app_module.try_admit("other-spreadsheet-id")
+            try:
+                response = authenticated_session.get("/api/sheets/pomodoros")
+            finally:
+                app_module.release_admission("other-spreadsheet-id")
+
+        assert response.status_code == 200
+
+    def test_worker_limit_applies_across_users(self, authenticated_session):
+        """Once the worker has its total in flight, every user should get a 429."""
+        with patch("app.ADMISSION_MAX_IN_FLIGHT", 1), patch("app.get_sheets_service"):
+            assert app_module.try_admit("other-spreadsheet-id")
+            try:
+                response = authenticated_session.get("/api/sheets/pomodoros")
+            finally:
+                app_module.release_admission("other-spreadsheet-id")
+
+        assert response.status_code == 429
+
+    def test_slot_is_released_when_request_ends(self, authenticated_session, mock_sheets_service):
+        """Finished requests, including failed ones, should give their slot back."""
+        mock_sheets_service.spreadsheets().values().get().execute.side_effect = [{}, RuntimeError("boom")]
+        with patch("app.get_sheets_service", return_value=mock_sheets_service):
+            authenticated_session.get("/api/sheets/pomodoros")
+            authenticated_session.get("/api/sheets/pomodoros")
+
+        assert app_module.get_admission_stats()["in_flight"] == 0
+
+    def test_streamed_export_holds_slot_until_closed(self, authenticated_session, mock_sheets_service):
+        """An export should keep its slot while the body is still streaming."""
+        mock_sheets_service.spreadsheets().values().get().execute.side_effect = [{}, {}]
+        with patch("app.get_sheets_service", return_value=mock_sheets_service):
+            response = authenticated_session.get("/api/sheets/export", buffered=False)
+            assert app_module.get_admission_stats()["in_flight"] == 1
+            response.close()
+
+        assert app_module.get_admission_stats()["in_flight"] == 0
+
+    def test_non_sheets_endpoints_are_not_limited(self, authenticated_session):
+        """Static pages and auth endpoints should never be turned away."""
+        with patch("app.ADMISSION_MAX_IN_FLIGHT", 0):
+            assert authenticated_session.get("/api/auth/status").status_code == 200
+
+
+class TestOrjsonProvider:
+    """Tests for the orjson-backed JSON provider."""
+
+    def test_matches_stdlib_output(self, app):
+        """orjson output should decode to the same value, with keys sorted, as Flask's default provider."""
+        pytest.importorskip("orjson")
+        payload = {"b": [{"name": "Café", "duration_minutes": 25}], "a": date(2024, 1, 15)}
+        provider = app_module.OrjsonProvider(app)
+
+        assert provider.dumps(payload).startswith('{"a":')
+        assert json.loads(provider.dumps(payload)) == json.loads(DefaultJSONProvider(app).dumps(payload))
+
+    def test_falls_back_for_unsupported_values(self, app):
+        """Values orjson can't encode should go through the stdlib encoder instead of failing."""
+        pytest.importorskip("orjson")
+        provider = app_module.OrjsonProvider(app)
+
+        assert provider.dumps({"big": 2**70}) == '{"big": 1180591620717411303424}'
+        with app.app_context():
+            assert provider.response([2**70]).get_json() == [2**70]
+
+    def test_response_is_json(self, app):
+        """response() should build a JSON response with a trailing newline."""
+        pytest.importorskip("orjson")
+        provider = app_module.OrjsonProvider(app)
+
+        with app.app_context():
+            response = provider.response([{"id": "a"}])
+
+        assert response.mimetype == "application/json"
+        assert response.get_data() == b'[{"id":"a"}]\n'
+
+
 class TestClearInitialSync:
     """Tests for the clear-initial-sync endpoint."""
 
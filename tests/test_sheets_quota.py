@@ -0,0 +1,120 @@
+"""Tests for the quota-aware Google API transport."""
+
+from unittest.mock import MagicMock, patch
+
+import httplib2
+
+import sheets_quota
+
+VALUES_URI = "https://sheets.googleapis.com/v4/spreadsheets/sheet-1/values/Pomodoros!A2:G?alt=json"
+APPEND_URI = "https://sheets.googleapis.com/v4/spreadsheets/sheet-1/values/Pomodoros!A:G:append?alt=json"
+
+
+def make_http(*statuses, retry_after=None):
+    """Build a fake transport answering with the given statuses in turn."""
+    http = MagicMock()
+    responses = []
+    for status in statuses:
+        headers = {"status": str(status)}
+        if retry_after is not None:
+            headers["retry-after"] = retry_after
+        responses.append((httplib2.Response(headers), b"{}"))
+    http.request.side_effect = responses
+    return http
+
+
+class TestRetries:
+    """Tests for retrying throttled and failed calls."""
+
+    def test_rate_limited_call_is_retried_after_retry_after(self):
+        """A 429 should be retried after the Retry-After delay and counted."""
+        http = make_http(429, 200, retry_after="2")
+        with patch("sheets_quota.time.sleep") as sleep:
+            response, _ = sheets_quota.QuotaAwareHttp(http, "user").request(VALUES_URI)
+
+        assert response.status == 200
+        sleep.assert_called_once_with(2.0)
+        stats = sheets_quota.get_stats()
+        assert stats["rate_limited"] == 1
+        assert stats["retried"] == 1
+        assert stats["calls"] == 2
+
+    def test_backoff_is_jittered_and_exponential(self):
+        """Without Retry-After, each retry should wait a random time under a doubling cap."""
+        http = make_http(503, 503, 200)
+        with (
+            patch("sheets_quota.time.sleep"),
+            patch("sheets_quota.random.uniform", return_value=0.1) as uniform,
+        ):
+            response, _ = sheets_quota.QuotaAwareHttp(http, "user").request(VALUES_URI)
+
+        assert response.status == 200
+        assert [c.args for c in uniform.call_args_list] == [(0, 0.5), (0, 1.0)]
+
+    def test_non_idempotent_call_is_not_retried_on_server_error(self):
+        """An append that got a 5xx may have landed, so it must not be repeated."""
+        http = make_http(503)
+        with patch("sheets_quota.time.sleep") as sleep:
+            response, _ = sheets_quota.QuotaAwareHttp(http, "user").request(APPEND_URI, "POST", body="{}")
+
+        assert response.status == 503
+        sleep.assert_not_called()
+        assert http.request.call_count == 1
+
+    def test_gives_up_after_max_retries(self):
+        """Persistent 429s should be returned after MAX_RETRIES retries."""
+        http = make_http(*[429] * (sheets_quota.MAX_RETRIES + 1))
+        with patch("sheets_quota.time.sleep"):
+            response, _ = sheets_quota.QuotaAwareHttp(http, "user").request(VALUES_URI)
+
+        assert response.status == 429
+        assert http.request.call_count == sheets_quota.MAX_RETRIES + 1
+        assert sheets_quota.get_stats()["gave_up"] == 1
+
+    def test_long_retry_after_is_not_waited_for(self):
+        """A Retry-After beyond the cap should be returned to the caller immediately."""
+        http = make_http(429, retry_after="3600")
+        with patch("sheets_quota.time.sleep") as sleep:
+            response, _ = sheets_quota.QuotaAwareHttp(http, "user").request(VALUES_URI)
+
+        assert response.status == 429
+        sleep.assert_not_called()
+
+    def test_idempotent_post_paths(self):
+        """Reads, overwrites and clears are safe to repeat; appends and structural updates are not."""
+        base = "https://sheets.googleapis.com/v4/spreadsheets/sheet-1"
+        assert sheets_quota.is_idempotent("POST", f"{base}/values:batchGet?alt=json")
+        assert sheets_quota.is_idempotent("POST", f"{base}/values:batchUpdate?alt=json")
+        assert sheets_quota.is_idempotent("POST", f"{base}/values/Pomodoros!A2:G:clear?alt=json")
+        assert not sheets_quota.is_idempotent("POST", APPEND_URI)
+        assert not sheets_quota.is_idempotent("POST", f"{base}:batchUpdate?alt=json")
+
+
+class TestTokenBucket:
+    """Tests for per-user and per-spreadsheet rate limiting."""
+
+    def test_burst_passes_then_calls_are_spaced(self):
+        """Calls within the burst go straight through; the next one waits for a token."""
+        with patch("sheets_quota.time.monotonic", return_value=100.0), patch("sheets_quota.time.sleep") as sleep:
+            for _ in range(sheets_quota.BURST_REQUESTS):
+                sheets_quota.throttle("user", "sheet-1")
+            sleep.assert_not_called()
+
+            sheets_quota.throttle("user", "sheet-1")
+
+        sleep.assert_called_once_with(60 / sheets_quota.USER_REQUESTS_PER_MINUTE)
+        assert sheets_quota.get_stats()["throttled"] == 1
+
+    def test_users_have_separate_buckets(self):
+        """One user's burst should not delay another user on a different spreadsheet."""
+        with patch("sheets_quota.time.monotonic", return_value=100.0), patch("sheets_quota.time.sleep") as sleep:
+            for _ in range(sheets_quota.BURST_REQUESTS):
+                sheets_quota.throttle("user-a", "sheet-a")
+            sheets_quota.throttle("user-b", "sheet-b")
+
+        sleep.assert_not_called()
+
+    def test_parse_retry_after_http_date(self):
+        """Retry-After may be an HTTP date in the past, which means retry now."""
+        assert sheets_quota.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert sheets_quota.parse_retry_after("garbage") is None
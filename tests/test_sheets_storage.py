@@ -1,10 +1,31 @@
 """Tests for Google Sheets storage backend (mocked)."""
 
 from unittest.mock import MagicMock
+from zoneinfo import ZoneInfo
+
+import pytest
+from googleapiclient.errors import HttpError
 
 import sheets_storage
 
 
+def make_pomodoro(pomodoro_id):
+    """Build a minimal pomodoro dict for write-path tests."""
+    return {
+        "id": pomodoro_id,
+        "name": "Task",
+        "type": "Content",
+        "start_time": "2024-01-15T10:00:00Z",
+        "end_time": "2024-01-15T10:25:00Z",
+        "duration_minutes": 25,
+    }
+
+
+def make_sheet_row(pomodoro_id, start_time="2024-01-15T10:00:00Z"):
+    """Build a full Pomodoros sheet row."""
+    return [pomodoro_id, "Task", "Content", start_time, "2024-01-15T10:25:00Z", "25", ""]
+
+
 class TestGetPomodoros:
     """Tests for getting pomodoros from Google Sheets."""
 
@@ -55,11 +76,21 @@ class TestGetPomodoros:
     def test_get_pomodoros_with_date_filter(self):
         """Should filter pomodoros by date range."""
         service = MagicMock()
+        # start_time column read for the block index
         service.spreadsheets().values().get().execute.return_value = {
-            "values": [
-                ["id-1", "Task 1", "Content", "2024-01-14T10:00:00Z", "2024-01-14T10:25:00Z", "25", ""],
-                ["id-2", "Task 2", "Product", "2024-01-15T11:00:00Z", "2024-01-15T11:25:00Z", "25", ""],
-                ["id-3", "Task 3", "Team", "2024-01-16T12:00:00Z", "2024-01-16T12:25:00Z", "25", ""],
+            "values": [["2024-01-14T10:00:00Z"], ["2024-01-15T11:00:00Z"], ["2024-01-16T12:00:00Z"]]
+        }
+        service.spreadsheets().values().batchGet().execute.return_value = {
+            "valueRanges": [
+                {"values": [["id-3"]]},  # ID on the last indexed row
+                {
+                    "values": [
+                        ["id-1", "Task 1", "Content", "2024-01-14T10:00:00Z", "2024-01-14T10:25:00Z", "25", ""],
+                        ["id-2", "Task 2", "Product", "2024-01-15T11:00:00Z", "2024-01-15T11:25:00Z", "25", ""],
+                        ["id-3", "Task 3", "Team", "2024-01-16T12:00:00Z", "2024-01-16T12:25:00Z", "25", ""],
+                    ]
+                },
+                {},  # Nothing appended after the index was built
             ]
         }
 
@@ -71,6 +102,425 @@ class TestGetPomodoros:
         assert result[0]["id"] == "id-2"
 
 
+class TestPomodoroTable:
+    """Tests for the columnar pomodoro table."""
+
+    def test_parses_columns_once(self):
+        """Timestamps should be epoch milliseconds and durations ints; incomplete rows are skipped."""
+        table = sheets_storage.PomodoroTable.from_rows(
+            [make_sheet_row("a", "2024-01-15T10:00:00Z"), ["short"], ["b", "T", "C", "not a time", "x", "5"]]
+        )
+
+        assert len(table) == 2
+        assert table.start_ms[0] == 1705312800000
+        assert table.start_ms[1] == sheets_storage.MISSING_TIMESTAMP
+        assert list(table.durations) == [25, 5]
+        assert table.notes == ["", None]
+
+    def test_select_orders_newest_first_and_keeps_ties_in_sheet_order(self):
+        """select() should sort newest first, leaving equal start times in sheet order."""
+        table = sheets_storage.PomodoroTable.from_rows(
+            [
+                make_sheet_row("a", "2024-01-15T10:00:00Z"),
+                make_sheet_row("b", "2024-01-16T10:00:00Z"),
+                make_sheet_row("c", "2024-01-15T10:00:00Z"),
+                make_sheet_row("d", "bogus"),
+            ]
+        )
+
+        assert [table.ids[i] for i in table.select()] == ["b", "a", "c", "d"]
+
+    def test_select_bounds_are_inclusive_and_timezone_aware(self):
+        """Bounds should compare instants, so offsets other than Z filter correctly."""
+        table = sheets_storage.PomodoroTable.from_rows(
+            [
+                make_sheet_row("a", "2024-01-14T23:00:00Z"),
+                make_sheet_row("b", "2024-01-15T09:00:00+02:00"),  # 07:00Z
+                make_sheet_row("c", "2024-01-15T12:00:00Z"),
+                make_sheet_row("d", "bogus"),
+            ]
+        )
+
+        selected = table.select(start_date="2024-01-15T07:00:00Z", end_date="2024-01-15T12:00:00Z")
+        assert [table.ids[i] for i in selected] == ["c", "b"]
+        assert [table.ids[i] for i in table.select(end_date="2024-01-15T00:00:00Z")] == ["a"]
+
+
+class TestStartTimeIndex:
+    """Tests for narrowing date-range reads with the sparse start_time index."""
+
+    def _rows(self, count, day_of=lambda i: i // 10):
+        """Build count rows, ten per day starting 2024-01-01 unless day_of says otherwise."""
+        return [
+            make_sheet_row(f"id-{i}", f"2024-{1 + day_of(i) // 28:02d}-{1 + day_of(i) % 28:02d}T09:00:00Z")
+            for i in range(count)
+        ]
+
+    def test_range_read_fetches_only_matching_blocks(self, monkeypatch):
+        """After a full read, a range query should batchGet just the overlapping blocks."""
+        monkeypatch.setattr(sheets_storage, "START_TIME_BLOCK_ROWS", 50)
+        rows = self._rows(500)  # 50 days, 5 days per block
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.return_value = {"values": rows}
+        service.spreadsheets().values().batchGet().execute.return_value = {
+            "valueRanges": [{"values": [["id-499"]]}, {"values": rows[100:150]}, {}]
+        }
+        sheets_storage.get_pomodoros(service, "test-spreadsheet-id")
+        service.spreadsheets().values().get.reset_mock()
+
+        result = sheets_storage.get_pomodoros(
+            service, "test-spreadsheet-id", start_date="2024-01-11T00:00:00Z", end_date="2024-01-12T23:59:59Z"
+        )
+
+        service.spreadsheets().values().get.assert_not_called()
+        ranges = service.spreadsheets().values().batchGet.call_args.kwargs["ranges"]
+        assert ranges == ["Pomodoros!A501", "Pomodoros!A102:G151", "Pomodoros!A502:G"]
+        assert len(result) == 20
+
+    def test_out_of_order_row_widens_its_block(self, monkeypatch):
+        """A late-appended entry for an old date should keep its block in range."""
+        monkeypatch.setattr(sheets_storage, "START_TIME_BLOCK_ROWS", 50)
+        # Row for id-499 was logged manually for day 0
+        rows = self._rows(500, day_of=lambda i: 0 if i == 499 else i // 10)
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.return_value = {"values": rows}
+        service.spreadsheets().values().batchGet().execute.return_value = {"valueRanges": []}
+        sheets_storage.get_pomodoros(service, "test-spreadsheet-id")
+
+        sheets_storage.get_pomodoros(service, "test-spreadsheet-id", end_date="2024-01-01T23:59:59Z")
+
+        ranges = service.spreadsheets().values().batchGet.call_args.kwargs["ranges"]
+        assert ranges[1:-1] == ["Pomodoros!A2:G51", "Pomodoros!A452:G501"]
+
+    def test_mixed_utc_offsets_are_compared_as_instants(self, monkeypatch):
+        """A block of +09:00 timestamps should match by instant, not by string order."""
+        monkeypatch.setattr(sheets_storage, "START_TIME_BLOCK_ROWS", 2)
+        rows = [
+            make_sheet_row("id-0", "2024-01-01T09:00:00Z"),
+            make_sheet_row("id-1", "2024-01-01T10:00:00Z"),
+            # 2024-01-02T01:00:00Z, which sorts after "2024-01-02T05..." as a string
+            make_sheet_row("id-2", "2024-01-02T10:00:00+09:00"),
+            make_sheet_row("id-3", "2024-01-02T11:00:00+09:00"),
+        ]
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.return_value = {"values": rows}
+        service.spreadsheets().values().batchGet().execute.return_value = {"valueRanges": []}
+        sheets_storage.get_pomodoros(service, "test-spreadsheet-id")
+
+        sheets_storage.get_pomodoros(
+            service, "test-spreadsheet-id", start_date="2024-01-01T12:00:00Z", end_date="2024-01-02T05:00:00Z"
+        )
+
+        ranges = service.spreadsheets().values().batchGet.call_args.kwargs["ranges"]
+        assert ranges[1:-1] == ["Pomodoros!A4:G5"]
+
+    def test_deleted_rows_fall_back_to_full_read(self):
+        """If the last indexed row holds a different ID, every row should be read instead."""
+        rows = self._rows(30)
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.return_value = {"values": rows}
+        service.spreadsheets().values().batchGet().execute.return_value = {
+            "valueRanges": [{"values": [["someone-else"]]}, {"values": rows}, {}]
+        }
+        sheets_storage.get_pomodoros(service, "test-spreadsheet-id")
+        service.spreadsheets().values().get.reset_mock()
+
+        result = sheets_storage.get_pomodoros(service, "test-spreadsheet-id", start_date="2024-01-02T00:00:00Z")
+
+        assert service.spreadsheets().values().get.call_args.kwargs["range"] == "Pomodoros!A2:G"
+        assert len(result) == 20
+
+
+class TestGetPomodorosSince:
+    """Tests for delta pulls by row cursor."""
+
+    def test_returns_only_rows_after_cursor(self):
+        """Should read from the cursor row and return the rows after it."""
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.return_value = {
+            "values": [make_sheet_row("id-5"), make_sheet_row("id-6"), make_sheet_row("id-7")]
+        }
+
+        result = sheets_storage.get_pomodoros_since(service, "test-spreadsheet-id", 5, "id-5")
+
+        assert service.spreadsheets().values().get.call_args.kwargs["range"] == "Pomodoros!A5:G"
+        assert result["full"] is False
+        assert {p["id"] for p in result["pomodoros"]} == {"id-6", "id-7"}
+        assert result["cursor"] == {"row": 7, "id": "id-7"}
+
+    def test_unchanged_sheet_returns_nothing(self):
+        """A cursor at the last row should return an empty delta with the same cursor."""
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.return_value = {"values": [make_sheet_row("id-5")]}
+
+        result = sheets_storage.get_pomodoros_since(service, "test-spreadsheet-id", 5, "id-5")
+
+        assert result == {"pomodoros": [], "cursor": {"row": 5, "id": "id-5"}, "full": False}
+
+    def test_falls_back_to_full_read_when_rows_moved(self):
+        """If the cursor row holds a different ID, every row should be returned."""
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.side_effect = [
+            {"values": [make_sheet_row("id-6")]},  # Row 5 now holds id-6 (a row above was deleted)
+            {"values": [make_sheet_row("id-1"), make_sheet_row("id-6")]},
+        ]
+
+        result = sheets_storage.get_pomodoros_since(service, "test-spreadsheet-id", 5, "id-5")
+
+        assert service.spreadsheets().values().get.call_args.kwargs["range"] == "Pomodoros!A2:G"
+        assert result["full"] is True
+        assert len(result["pomodoros"]) == 2
+        assert result["cursor"] == {"row": 3, "id": "id-6"}
+
+
+class TestGetSnapshot:
+    """Tests for reading pomodoros and settings in one batchGet."""
+
+    def test_full_snapshot_uses_one_batch_get(self):
+        """Without a cursor, all pomodoros and the settings should come from a single batchGet."""
+        service = MagicMock()
+        service.spreadsheets().values().batchGet().execute.return_value = {
+            "valueRanges": [
+                {"values": [make_sheet_row("id-1"), make_sheet_row("id-2")]},
+                {"values": [["short_break_minutes", "10"], ["theme", "dark"]]},
+            ]
+        }
+
+        result = sheets_storage.get_snapshot(service, "test-spreadsheet-id", {"long_break_minutes": 15})
+
+        assert service.spreadsheets().values().batchGet.call_args.kwargs["ranges"] == [
+            "Pomodoros!A2:G",
+            "Settings!A2:B",
+        ]
+        service.spreadsheets().values().get.assert_not_called()
+        assert result["full"] is True
+        assert {p["id"] for p in result["pomodoros"]} == {"id-1", "id-2"}
+        assert result["cursor"] == {"row": 3, "id": "id-2"}
+        assert result["settings"] == {"long_break_minutes": 15, "short_break_minutes": 10, "theme": "dark"}
+
+    def test_cursor_snapshot_reads_only_new_rows(self):
+        """With a valid cursor, the batchGet should start at the cursor row."""
+        service = MagicMock()
+        service.spreadsheets().values().batchGet().execute.return_value = {
+            "valueRanges": [{"values": [make_sheet_row("id-5"), make_sheet_row("id-6")]}, {}]
+        }
+
+        result = sheets_storage.get_snapshot(service, "test-spreadsheet-id", {}, since_row=5, since_id="id-5")
+
+        assert service.spreadsheets().values().batchGet.call_args.kwargs["ranges"][0] == "Pomodoros!A5:G"
+        assert result["full"] is False
+        assert [p["id"] for p in result["pomodoros"]] == ["id-6"]
+        assert result["settings"] == {}
+
+    def test_stale_cursor_falls_back_to_full_read(self):
+        """A cursor whose row moved should trigger one extra full read of the pomodoros."""
+        service = MagicMock()
+        service.spreadsheets().values().batchGet().execute.return_value = {
+            "valueRanges": [{"values": [make_sheet_row("id-6")]}, {}]
+        }
+        service.spreadsheets().values().get().execute.return_value = {
+            "values": [make_sheet_row("id-1"), make_sheet_row("id-6")]
+        }
+
+        result = sheets_storage.get_snapshot(service, "test-spreadsheet-id", {}, since_row=5, since_id="id-5")
+
+        assert result["full"] is True
+        assert len(result["pomodoros"]) == 2
+
+
+class TestGetPomodoroPage:
+    """Tests for paging from the tail of the sheet."""
+
+    def make_sheet(self, count):
+        """Build sheet rows (header first) whose start times increase down the sheet."""
+        header = ["id", "name", "type", "start_time", "end_time", "duration_minutes", "notes"]
+        return [header] + [make_sheet_row(f"id-{i}", f"2024-01-{i:02d}T10:00:00Z") for i in range(1, count + 1)]
+
+    def make_service(self, sheet, grid_rows=1000):
+        """Mock service whose values.get returns the requested rows of sheet (mutable)."""
+        service = MagicMock()
+        service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "gridProperties": {"rowCount": grid_rows}}}]
+        }
+
+        def get(spreadsheetId, range):
+            _, _, bounds = range.partition("!")
+            first, _, last = bounds.partition(":")
+            first_row = int(first.lstrip("A") or 1)
+            last_row = int(last.lstrip("AG") or len(sheet))
+            rows = [row[:1] if bounds == "A:A" else row for row in sheet[first_row - 1 : last_row]]
+            request = MagicMock()
+            request.execute.return_value = {"values": rows}
+            return request
+
+        service.spreadsheets().values().get.side_effect = get
+        return service
+
+    def ranges(self, service):
+        return [call.kwargs["range"] for call in service.spreadsheets().values().get.call_args_list]
+
+    def test_first_page_reads_only_the_tail(self):
+        """The first page should be the last rows, newest first, read as one bounded range."""
+        service = self.make_service(self.make_sheet(10))
+
+        page = sheets_storage.get_pomodoro_page(service, "test-spreadsheet-id", 3)
+
+        assert [p["id"] for p in page["pomodoros"]] == ["id-10", "id-9", "id-8"]
+        assert page["next"] == {"row": 9, "id": "id-8"}
+        # Cold cache: the blank grid rows below the data are scanned with one bounded read
+        assert self.ranges(service) == ["Pomodoros!A2:G1000"]
+
+        sheets_storage._store_row_index("test-spreadsheet-id", [["id"]] * 11)
+        service.spreadsheets().values().get.reset_mock()
+        sheets_storage.get_pomodoro_page(service, "test-spreadsheet-id", 3)
+        assert self.ranges(service) == ["Pomodoros!A9:G"]
+
+    def test_cold_cache_never_reads_the_id_column(self, monkeypatch):
+        """Without a cached index the tail should be found from the grid size in bounded windows."""
+        monkeypatch.setattr(sheets_storage, "PAGE_TAIL_SCAN_ROWS", 10)
+        service = self.make_service(self.make_sheet(25), grid_rows=45)
+
+        page = sheets_storage.get_pomodoro_page(service, "test-spreadsheet-id", 3)
+
+        assert [p["id"] for p in page["pomodoros"]] == ["id-25", "id-24", "id-23"]
+        assert page["next"] == {"row": 24, "id": "id-23"}
+        ranges = self.ranges(service)
+        assert "Pomodoros!A:A" not in ranges
+        assert ranges == ["Pomodoros!A36:G45", "Pomodoros!A26:G35", "Pomodoros!A24:G"]
+
+    def test_cold_cache_page_spanning_two_windows(self, monkeypatch):
+        """If the data ends near the top of a window, the page should still be full."""
+        monkeypatch.setattr(sheets_storage, "PAGE_TAIL_SCAN_ROWS", 10)
+        service = self.make_service(self.make_sheet(11), grid_rows=21)
+
+        page = sheets_storage.get_pomodoro_page(service, "test-spreadsheet-id", 3)
+
+        assert [p["id"] for p in page["pomodoros"]] == ["id-11", "id-10", "id-9"]
+        assert "Pomodoros!A:A" not in self.ranges(service)
+
+    def test_pages_cover_every_row_once(self):
+        """Following next cursors should return every pomodoro exactly once and then stop."""
+        service = self.make_service(self.make_sheet(10))
+        seen = []
+        cursor = {"row": None, "id": None}
+        while cursor is not None:
+            page = sheets_storage.get_pomodoro_page(service, "test-spreadsheet-id", 4, cursor["row"], cursor["id"])
+            seen.extend(p["id"] for p in page["pomodoros"])
+            cursor = page["next"]
+
+        assert seen == [f"id-{i}" for i in range(10, 0, -1)]
+
+    def test_cursor_follows_its_row_after_a_delete(self):
+        """Deleting a newer row shifts the cursor row up; the next page should neither skip nor repeat."""
+        sheet = self.make_sheet(10)
+        service = self.make_service(sheet)
+        first = sheets_storage.get_pomodoro_page(service, "test-spreadsheet-id", 3)
+        del sheet[10]  # id-10, on the first page
+        sheets_storage.invalidate_row_index("test-spreadsheet-id")
+
+        page = sheets_storage.get_pomodoro_page(
+            service, "test-spreadsheet-id", 3, first["next"]["row"], first["next"]["id"]
+        )
+
+        assert [p["id"] for p in page["pomodoros"]] == ["id-7", "id-6", "id-5"]
+
+    def test_cursor_to_deleted_pomodoro_is_rejected(self):
+        """A cursor whose pomodoro is gone can't be placed, so None is returned."""
+        sheet = self.make_sheet(5)
+        service = self.make_service(sheet)
+        del sheet[3]  # id-3
+
+        assert sheets_storage.get_pomodoro_page(service, "test-spreadsheet-id", 2, 4, "id-3") is None
+
+    def test_empty_sheet(self):
+        """A sheet with only the header should give an empty last page."""
+        service = self.make_service(self.make_sheet(0))
+
+        assert sheets_storage.get_pomodoro_page(service, "test-spreadsheet-id", 3) == {"pomodoros": [], "next": None}
+
+
+class TestSummarizePomodoros:
+    """Tests for server-side report rollups."""
+
+    def summarize(self, rows, start_date, end_date, tz_name, week_start=0):
+        tz = ZoneInfo(tz_name)
+        table = sheets_storage.PomodoroTable.from_rows(rows)
+        days = sheets_storage.local_days(
+            sheets_storage.parse_timestamp_ms(start_date), sheets_storage.parse_timestamp_ms(end_date), tz
+        )
+        return sheets_storage.summarize_pomodoros(table, table.select(start_date, end_date), days, tz, week_start)
+
+    def test_days_are_local_to_the_time_zone(self):
+        """A pomodoro late in the evening local time belongs to that local day, not the UTC one."""
+        rows = [make_sheet_row("late", "2024-01-16T03:30:00Z"), make_sheet_row("morning", "2024-01-16T14:00:00Z")]
+
+        report = self.summarize(rows, "2024-01-15T05:00:00Z", "2024-01-17T05:00:00Z", "America/New_York")
+
+        assert report["daily_totals"] == [
+            {"date": "2024-01-15", "minutes": 25, "count": 1},
+            {"date": "2024-01-16", "minutes": 25, "count": 1},
+        ]
+
+    def test_dst_week_buckets_every_day(self):
+        """Across a DST change (23-hour day) each pomodoro should still land on its local day."""
+        rows = [
+            make_sheet_row("sat", "2024-03-09T15:00:00Z"),
+            make_sheet_row("sun", "2024-03-10T23:30:00Z"),  # 19:30 EDT on the short day
+            make_sheet_row("mon", "2024-03-11T04:30:00Z"),  # 00:30 EDT Monday
+        ]
+
+        report = self.summarize(rows, "2024-03-09T05:00:00Z", "2024-03-12T04:00:00Z", "America/New_York")
+
+        assert [day["count"] for day in report["daily_totals"]] == [1, 1, 1]
+        assert [day["date"] for day in report["daily_totals"]] == ["2024-03-09", "2024-03-10", "2024-03-11"]
+
+    def test_type_and_week_rollups(self):
+        """by_type, daily_by_type and weekly_totals should agree with the daily series."""
+        rows = [
+            make_sheet_row("a", "2024-01-06T10:00:00Z"),  # Saturday
+            make_sheet_row("b", "2024-01-07T10:00:00Z"),  # Sunday
+            ["c", "Task", "Team", "2024-01-08T10:00:00Z", "2024-01-08T10:50:00Z", "50"],
+        ]
+
+        report = self.summarize(rows, "2024-01-06T00:00:00Z", "2024-01-09T00:00:00Z", "UTC")
+
+        assert report["total_minutes"] == 100
+        assert report["total_pomodoros"] == 3
+        assert report["by_type"] == {"Content": 50, "Team": 50}
+        assert report["daily_by_type"] == {"Content": [25, 25, 0], "Team": [0, 0, 50]}
+        assert report["weekly_totals"] == [
+            {"week_start": "2023-12-31", "minutes": 25, "count": 1},
+            {"week_start": "2024-01-07", "minutes": 75, "count": 2},
+        ]
+
+        monday_weeks = self.summarize(rows, "2024-01-06T00:00:00Z", "2024-01-09T00:00:00Z", "UTC", week_start=1)
+        assert [week["week_start"] for week in monday_weeks["weekly_totals"]] == ["2024-01-01", "2024-01-08"]
+
+
+class TestIterPomodoroRowChunks:
+    """Tests for chunked sheet reads."""
+
+    def test_reads_consecutive_ranges_up_to_grid_row_count(self):
+        """Should read fixed-size row ranges up to the last grid row, skipping blank chunks."""
+        service = MagicMock()
+        service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "gridProperties": {"rowCount": 8}}}]
+        }
+        service.spreadsheets().values().get().execute.side_effect = [
+            {"values": [make_sheet_row("id-1"), make_sheet_row("id-2")]},
+            {},  # Rows 4-5 are blank
+            {"values": [make_sheet_row("id-3")]},
+            {"values": [make_sheet_row("id-4")]},
+        ]
+        service.spreadsheets().values().get.reset_mock()
+
+        chunks = list(sheets_storage.iter_pomodoro_row_chunks(service, "test-spreadsheet-id", chunk_rows=2))
+
+        assert [[row[0] for row in chunk] for chunk in chunks] == [["id-1", "id-2"], ["id-3"], ["id-4"]]
+        ranges = [call.kwargs["range"] for call in service.spreadsheets().values().get.call_args_list]
+        assert ranges == ["Pomodoros!A2:G3", "Pomodoros!A4:G5", "Pomodoros!A6:G7", "Pomodoros!A8:G8"]
+
+
 class TestSavePomodoro:
     """Tests for saving pomodoros to Google Sheets."""
 
@@ -153,6 +603,20 @@ class TestSavePomodorosBatch:
         assert call_args.kwargs["body"]["values"][0][0] == "id-1"
         assert call_args.kwargs["body"]["values"][1][0] == "id-2"
 
+    def test_batch_skips_ids_missing_from_a_stale_cache(self):
+        """IDs saved by another worker since the index was cached should not be appended again."""
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.return_value = {"values": [["id"], ["id-1"]]}
+        sheets_storage._store_row_index("test-spreadsheet-id", [["id"]])
+
+        saved = sheets_storage.save_pomodoros_batch(
+            service, "test-spreadsheet-id", [make_pomodoro("id-1"), make_pomodoro("id-2")]
+        )
+
+        assert saved == 1
+        appended = service.spreadsheets().values().append.call_args.kwargs["body"]["values"]
+        assert [row[0] for row in appended] == ["id-2"]
+
     def test_save_pomodoros_batch_empty(self):
         """Should do nothing for empty list."""
         service = MagicMock()
@@ -166,33 +630,49 @@ class TestUpdatePomodoro:
     """Tests for updating pomodoros in Google Sheets."""
 
     def test_update_pomodoro_found(self):
-        """Should update existing pomodoro."""
+        """Should update existing pomodoro without reading the current row."""
         service = MagicMock()
 
         # Mock finding the row
-        service.spreadsheets().values().get().execute.side_effect = [
-            {"values": [["header"], ["id-1"], ["id-2"], ["target-id"]]},  # Find row
-            {
-                "values": [
-                    [
-                        "target-id",
-                        "Old Name",
-                        "Content",
-                        "2024-01-15T10:00:00Z",
-                        "2024-01-15T10:25:00Z",
-                        "25",
-                        "Old notes",
-                    ]
-                ]
-            },  # Get current row
-        ]
+        service.spreadsheets().values().get().execute.return_value = {
+            "values": [["header"], ["id-1"], ["id-2"], ["target-id"]]
+        }
 
         result = sheets_storage.update_pomodoro(
             service, "test-spreadsheet-id", "target-id", {"name": "New Name", "type": "Product", "notes": "New notes"}
         )
 
         assert result is True
-        service.spreadsheets().values().update.assert_called_once()
+        service.spreadsheets().values().update.assert_not_called()
+        service.spreadsheets().values().batchUpdate.assert_called_once()
+        data = service.spreadsheets().values().batchUpdate.call_args.kwargs["body"]["data"]
+        assert data == [
+            {"range": "Pomodoros!B4:C4", "values": [["New Name", "Product"]]},
+            {"range": "Pomodoros!G4:G4", "values": [["New notes"]]},
+        ]
+
+    def test_update_pomodoro_full_record_is_one_range(self, sample_pomodoro):
+        """A full record should be written as one contiguous B:G range."""
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.return_value = {"values": [["header"], ["test-uuid-1234"]]}
+
+        sheets_storage.update_pomodoro(service, "test-spreadsheet-id", "test-uuid-1234", sample_pomodoro)
+
+        data = service.spreadsheets().values().batchUpdate.call_args.kwargs["body"]["data"]
+        assert len(data) == 1
+        assert data[0]["range"] == "Pomodoros!B2:G2"
+        assert data[0]["values"][0][0] == "Test Task"
+        assert data[0]["values"][0][5] == "Test notes"
+
+    def test_update_pomodoro_keeps_missing_notes(self):
+        """Notes should not be blanked when the caller doesn't send them."""
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.return_value = {"values": [["header"], ["target-id"]]}
+
+        sheets_storage.update_pomodoro(service, "test-spreadsheet-id", "target-id", {"duration_minutes": 50})
+
+        data = service.spreadsheets().values().batchUpdate.call_args.kwargs["body"]["data"]
+        assert data == [{"range": "Pomodoros!F2:F2", "values": [[50]]}]
 
     def test_update_pomodoro_not_found(self):
         """Should return False when pomodoro not found."""
@@ -235,6 +715,394 @@ class TestDeletePomodoro:
         assert result is False
 
 
+class TestRowIndexCache:
+    """Tests for the process-local ID -> row index cache."""
+
+    def test_save_pomodoro_reuses_cached_index(self):
+        """Second save should append without re-reading the ID column."""
+        service = MagicMock()
+        values = service.spreadsheets().values()
+        values.get().execute.return_value = {"values": [["id"], ["id-1"], ["id-2"]]}
+        values.append().execute.side_effect = [
+            {"updates": {"updatedRange": "Pomodoros!A4:G4"}},
+            {"updates": {"updatedRange": "Pomodoros!A5:G5"}},
+        ]
+        values.get.reset_mock()
+
+        assert sheets_storage.save_pomodoro(service, "test-spreadsheet-id", make_pomodoro("new-1")) is True
+        assert sheets_storage.save_pomodoro(service, "test-spreadsheet-id", make_pomodoro("new-2")) is True
+        # Appended IDs are tracked too, so a repeat save is caught without any read
+        assert sheets_storage.save_pomodoro(service, "test-spreadsheet-id", make_pomodoro("new-1")) is False
+
+        assert values.get.call_count == 1
+
+    def test_save_pomodoro_removes_racing_duplicate(self):
+        """An append landing past the cached row count should be checked for a duplicate."""
+        service = MagicMock()
+        values = service.spreadsheets().values()
+        values.get().execute.side_effect = [
+            {"values": [["id"], ["id-1"]]},  # Warm the index (row_count=2)
+            {"values": [["id"], ["id-1"], ["new-1"], ["new-1"]]},  # Re-read after the mismatch
+        ]
+        # Another worker appended new-1 at row 3, so ours lands on row 4
+        values.append().execute.return_value = {"updates": {"updatedRange": "Pomodoros!A4:G4"}}
+        service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "sheetId": 7}}]
+        }
+
+        # Warm the index; id-1 already exists so nothing is appended
+        sheets_storage.save_pomodoros_batch(service, "test-spreadsheet-id", [make_pomodoro("id-1")])
+
+        result = sheets_storage.save_pomodoro(service, "test-spreadsheet-id", make_pomodoro("new-1"))
+
+        assert result is False
+        delete_range = service.spreadsheets().batchUpdate.call_args.kwargs["body"]["requests"][0]["deleteDimension"]
+        assert delete_range["range"] == {"sheetId": 7, "dimension": "ROWS", "startIndex": 3, "endIndex": 4}
+
+    def test_racing_duplicate_is_found_after_rows_shift(self):
+        """If a delete moved our appended row up, that row (not the one now at the append row) goes."""
+        service = MagicMock()
+        values = service.spreadsheets().values()
+        values.get().execute.side_effect = [
+            {"values": [["id"], ["id-1"], ["id-2"]]},  # Warm the index (row_count=3)
+            # Another worker appended new-1 (row 4), ours landed on row 5, "other" was appended
+            # and id-1 deleted: our copy is now row 4 and row 5 holds someone else's pomodoro
+            {"values": [["id"], ["id-2"], ["new-1"], ["new-1"], ["other"]]},
+        ]
+        values.append().execute.return_value = {"updates": {"updatedRange": "Pomodoros!A5:G5"}}
+        service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "sheetId": 7}}]
+        }
+        sheets_storage.save_pomodoros_batch(service, "test-spreadsheet-id", [make_pomodoro("id-1")])
+
+        result = sheets_storage.save_pomodoro(service, "test-spreadsheet-id", make_pomodoro("new-1"))
+
+        assert result is False
+        delete_range = service.spreadsheets().batchUpdate.call_args.kwargs["body"]["requests"][0]["deleteDimension"]
+        assert delete_range["range"] == {"sheetId": 7, "dimension": "ROWS", "startIndex": 3, "endIndex": 4}
+
+    def test_delete_pomodoro_verifies_cached_row(self):
+        """A cache hit should only read the single ID cell before deleting."""
+        service = MagicMock()
+        values = service.spreadsheets().values()
+        values.get().execute.side_effect = [
+            {"values": [make_sheet_row("id-1"), make_sheet_row("target-id")]},  # get_pomodoros
+            {"values": [["target-id"]]},  # Single-cell verification
+        ]
+        service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "sheetId": 0}}]
+        }
+        values.get.reset_mock()
+
+        sheets_storage.get_pomodoros(service, "test-spreadsheet-id")
+        result = sheets_storage.delete_pomodoro(service, "test-spreadsheet-id", "target-id")
+
+        assert result is True
+        assert values.get.call_args_list[-1].kwargs["range"] == "Pomodoros!A3"
+        delete_range = service.spreadsheets().batchUpdate.call_args.kwargs["body"]["requests"][0]["deleteDimension"]
+        assert delete_range["range"]["startIndex"] == 2
+
+    def test_stale_cached_row_falls_back_to_column_scan(self):
+        """If the cached row holds a different ID, the full column should be re-read."""
+        service = MagicMock()
+        values = service.spreadsheets().values()
+        values.get().execute.side_effect = [
+            {"values": [make_sheet_row("id-1"), make_sheet_row("target-id")]},  # get_pomodoros
+            {"values": [["something-else"]]},  # Row 3 moved
+            {"values": [["id"], ["target-id"]]},  # Full column re-read
+        ]
+        service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "sheetId": 0}}]
+        }
+
+        sheets_storage.get_pomodoros(service, "test-spreadsheet-id")
+        result = sheets_storage.delete_pomodoro(service, "test-spreadsheet-id", "target-id")
+
+        assert result is True
+        delete_range = service.spreadsheets().batchUpdate.call_args.kwargs["body"]["requests"][0]["deleteDimension"]
+        assert delete_range["range"]["startIndex"] == 1
+
+
+class TestApplySyncOperations:
+    """Tests for applying a batch of sync queue operations."""
+
+    def _service(self, id_rows):
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.return_value = {"values": id_rows}
+        service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "sheetId": 0}}]
+        }
+        return service
+
+    def test_mixed_operations_use_one_call_per_kind(self):
+        """Creates, updates and deletes should each be a single Sheets call."""
+        service = self._service([["id"], ["id-1"], ["id-2"], ["id-3"]])
+        operations = [
+            {"operation": "create", "record_id": "new-1", "data": make_pomodoro("new-1")},
+            {"operation": "create", "record_id": "new-2", "data": make_pomodoro("new-2")},
+            {"operation": "update", "record_id": "id-1", "data": {"name": "Renamed"}},
+            {"operation": "delete", "record_id": "id-2"},
+            {"operation": "delete", "record_id": "id-3"},
+        ]
+
+        results = sheets_storage.apply_sync_operations(service, "test-spreadsheet-id", operations)
+
+        assert [r["status"] for r in results] == ["ok"] * 5
+        service.spreadsheets().values().append.assert_called_once()
+        appended = service.spreadsheets().values().append.call_args.kwargs["body"]["values"]
+        assert [row[0] for row in appended] == ["new-1", "new-2"]
+        update_data = service.spreadsheets().values().batchUpdate.call_args.kwargs["body"]["data"]
+        assert update_data == [{"range": "Pomodoros!B2:B2", "values": [["Renamed"]]}]
+        # Adjacent rows 3 and 4 are deleted as one range
+        delete_requests = service.spreadsheets().batchUpdate.call_args.kwargs["body"]["requests"]
+        assert len(delete_requests) == 1
+        assert delete_requests[0]["deleteDimension"]["range"]["startIndex"] == 2
+        assert delete_requests[0]["deleteDimension"]["range"]["endIndex"] == 4
+
+    def test_operations_on_same_id_are_collapsed(self):
+        """Create+update should append the updated row; create+delete should append nothing."""
+        service = self._service([["id"]])
+        operations = [
+            {"operation": "create", "record_id": "new-1", "data": make_pomodoro("new-1")},
+            {"operation": "update", "record_id": "new-1", "data": {"name": "Edited", "notes": "n"}},
+            {"operation": "create", "record_id": "new-2", "data": make_pomodoro("new-2")},
+            {"operation": "delete", "record_id": "new-2"},
+        ]
+
+        results = sheets_storage.apply_sync_operations(service, "test-spreadsheet-id", operations)
+
+        assert [r["status"] for r in results] == ["ok"] * 4
+        appended = service.spreadsheets().values().append.call_args.kwargs["body"]["values"]
+        assert len(appended) == 1
+        assert appended[0][:2] == ["new-1", "Edited"]
+        assert appended[0][6] == "n"
+        service.spreadsheets().batchUpdate.assert_not_called()
+
+    def test_reports_per_operation_status(self):
+        """Duplicates, missing rows and malformed operations should be reported individually."""
+        service = self._service([["id"], ["id-1"]])
+        operations = [
+            {"operation": "create", "record_id": "id-1", "data": make_pomodoro("id-1")},
+            {"operation": "update", "record_id": "missing", "data": {"name": "x"}},
+            {"operation": "delete", "record_id": "missing"},
+            {"operation": "create", "record_id": "bad", "data": {"name": "no times"}},
+            {"operation": "rename", "record_id": "id-1"},
+        ]
+
+        results = sheets_storage.apply_sync_operations(service, "test-spreadsheet-id", operations)
+
+        assert [r["status"] for r in results] == ["duplicate", "not_found", "not_found", "error", "error"]
+        service.spreadsheets().values().append.assert_not_called()
+
+    def test_creates_check_a_fresh_id_column(self):
+        """A create already saved by another worker should be a duplicate even with a warm cache."""
+        service = self._service([["id"], ["saved-elsewhere"]])
+        sheets_storage._store_row_index("test-spreadsheet-id", [["id"]])
+        operations = [
+            {"operation": "create", "record_id": "saved-elsewhere", "data": make_pomodoro("saved-elsewhere")},
+        ]
+
+        results = sheets_storage.apply_sync_operations(service, "test-spreadsheet-id", operations)
+
+        assert results[0]["status"] == "duplicate"
+        service.spreadsheets().values().append.assert_not_called()
+
+    def test_malformed_entries_only_fail_themselves(self):
+        """Non-object entries and bad record_id/data should be errors without stopping the batch."""
+        service = self._service([["id"], ["id-1"]])
+        operations = [
+            "delete id-1",
+            None,
+            {"operation": "delete", "record_id": ["id-1"]},
+            {"operation": "update", "record_id": "id-1", "data": "Renamed"},
+            {"operation": "update", "record_id": "id-1", "data": {"name": "Renamed"}},
+        ]
+
+        results = sheets_storage.apply_sync_operations(service, "test-spreadsheet-id", operations)
+
+        assert [r["status"] for r in results] == ["error", "error", "error", "error", "ok"]
+        assert results[0] == {"record_id": None, "status": "error", "error": "Operation must be an object"}
+        service.spreadsheets().values().batchUpdate.assert_called_once()
+
+    def test_failed_phase_marks_its_operations(self):
+        """If the append fails, only the create operations should report an error."""
+        service = self._service([["id"], ["id-1"]])
+        service.spreadsheets().values().append().execute.side_effect = HttpError(
+            MagicMock(status=500), b"backend error"
+        )
+        operations = [
+            {"operation": "create", "record_id": "new-1", "data": make_pomodoro("new-1")},
+            {"operation": "update", "record_id": "id-1", "data": {"name": "Renamed"}},
+        ]
+
+        results = sheets_storage.apply_sync_operations(service, "test-spreadsheet-id", operations)
+
+        assert results[0]["status"] == "error"
+        assert results[1]["status"] == "ok"
+
+
+class TestSheetMetadata:
+    """Tests for the cached, field-masked sheet metadata."""
+
+    def test_sheet_id_is_fetched_once_with_field_mask(self):
+        """Repeated lookups should reuse one spreadsheets.get that only asks for sheet properties."""
+        service = MagicMock()
+        service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "sheetId": 42}}]
+        }
+        service.spreadsheets().get.reset_mock()
+
+        assert sheets_storage.get_sheet_id(service, "test-spreadsheet-id") == 42
+        assert sheets_storage.get_sheet_id(service, "test-spreadsheet-id") == 42
+
+        service.spreadsheets().get.assert_called_once_with(
+            spreadsheetId="test-spreadsheet-id", fields="sheets.properties(sheetId,title)"
+        )
+
+    def test_missing_sheet_refetches_metadata(self):
+        """A title missing from cached metadata should trigger one refetch."""
+        service = MagicMock()
+        service.spreadsheets().get().execute.side_effect = [
+            {"sheets": [{"properties": {"title": "Pomodoros", "sheetId": 0}}]},
+            {"sheets": [{"properties": {"title": "Settings", "sheetId": 9}}]},
+        ]
+
+        sheets_storage.get_sheet_id(service, "test-spreadsheet-id")
+
+        assert sheets_storage.get_sheet_id(service, "test-spreadsheet-id", title="Settings") == 9
+
+    def test_structural_error_invalidates_metadata(self):
+        """A 400 from a sheetId-based batchUpdate should drop the cached metadata."""
+        service = MagicMock()
+        service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "sheetId": 0}}]
+        }
+        service.spreadsheets().batchUpdate().execute.side_effect = HttpError(MagicMock(status=400), b"No grid")
+        sheets_storage.get_sheet_id(service, "test-spreadsheet-id")
+        service.spreadsheets().get.reset_mock()
+
+        with pytest.raises(HttpError):
+            sheets_storage.run_structural_update(service, "test-spreadsheet-id", [])
+        sheets_storage.get_sheet_id(service, "test-spreadsheet-id")
+
+        service.spreadsheets().get.assert_called_once()
+
+
+class TestDeduplicatePomodoros:
+    """Tests for range-merged and compacting deduplication."""
+
+    def test_adjacent_duplicates_merge_into_one_range(self):
+        """Adjacent duplicate rows should be deleted with a single deleteDimension range."""
+        service = MagicMock()
+        ids = [["id"], ["a"], ["b"], ["c"], ["d"], ["e"], ["f"], ["g"], ["h"], ["a"], ["b"], ["i"], ["c"]]
+        service.spreadsheets().values().get().execute.return_value = {"values": ids}
+        service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "sheetId": 7}}]
+        }
+
+        result = sheets_storage.deduplicate_pomodoros(service, "test-spreadsheet-id", mode="ranges")
+
+        assert result == {"removed": 3, "total": 9, "mode": "ranges"}
+        requests = service.spreadsheets().batchUpdate.call_args.kwargs["body"]["requests"]
+        assert [r["deleteDimension"]["range"]["startIndex"] for r in requests] == [12, 9]
+        assert [r["deleteDimension"]["range"]["endIndex"] for r in requests] == [13, 11]
+
+    def test_auto_mode_compacts_heavily_duplicated_sheet(self):
+        """Once duplicates reach DEDUPE_COMPACT_RATIO, auto should rewrite the data area instead."""
+        data = [["a", "A"], ["a", "A"], ["b", "B"], ["a", "A"], ["b", "B"]]
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.side_effect = [
+            {"values": [["id"], ["a"], ["a"], ["b"], ["a"], ["b"]]},  # ID column
+            {"values": data},  # Data rows
+            {"values": data},  # Re-read right before the rewrite
+            {"values": [["b"]]},  # Last row read (row 6)
+        ]
+
+        result = sheets_storage.deduplicate_pomodoros(service, "test-spreadsheet-id")
+
+        assert result == {"removed": 3, "total": 2, "mode": "compact"}
+        service.spreadsheets().batchUpdate.assert_not_called()
+        service.spreadsheets().values().clear.assert_called_once_with(
+            spreadsheetId="test-spreadsheet-id", range="Pomodoros!A4:G6", body={}
+        )
+
+    def test_auto_mode_deletes_ranges_when_lightly_duplicated(self):
+        """Below DEDUPE_COMPACT_RATIO, auto should delete the duplicate rows."""
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.return_value = {
+            "values": [["id"], ["a"], ["b"], ["c"], ["d"], ["e"], ["a"]]
+        }
+        service.spreadsheets().get().execute.return_value = {
+            "sheets": [{"properties": {"title": "Pomodoros", "sheetId": 7}}]
+        }
+
+        result = sheets_storage.deduplicate_pomodoros(service, "test-spreadsheet-id")
+
+        assert result == {"removed": 1, "total": 5, "mode": "ranges"}
+        service.spreadsheets().values().update.assert_not_called()
+
+    def test_compact_writes_before_clearing_only_the_tail(self):
+        """Compact should overwrite from A2 first, then clear just the rows past the kept ones."""
+        data = [["a", "A", "T", "s", "e", 25], [], ["a", "A"], ["b", "B", "T", "s", "e", 5], ["b"]]
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.side_effect = [
+            {"values": data},
+            {"values": data},
+            {"values": [["b"]]},  # Last row read (row 6) still holds the same ID
+        ]
+        manager = MagicMock()
+        manager.attach_mock(service.spreadsheets().values().update, "update")
+        manager.attach_mock(service.spreadsheets().values().clear, "clear")
+
+        result = sheets_storage.deduplicate_pomodoros(service, "test-spreadsheet-id", mode="compact")
+
+        assert result == {"removed": 2, "total": 2, "mode": "compact"}
+        assert [call[0] for call in manager.mock_calls if call[0] in ("update", "clear")] == ["update", "clear"]
+        update_kwargs = service.spreadsheets().values().update.call_args.kwargs
+        assert update_kwargs["range"] == "Pomodoros!A2"
+        assert update_kwargs["body"]["values"] == [["a", "A", "T", "s", "e", 25], ["b", "B", "T", "s", "e", 5]]
+        service.spreadsheets().values().clear.assert_called_once_with(
+            spreadsheetId="test-spreadsheet-id", range="Pomodoros!A4:G6", body={}
+        )
+
+    def test_compact_aborts_if_sheet_changed_before_rewrite(self):
+        """An edit between the read and the rewrite should abandon compaction without writing."""
+        data = [["a", "A", "T", "s", "e", 25], ["a", "A", "T", "s", "e", 25], ["b", "B"]]
+        edited = [["a", "A", "T", "s", "e", 25], ["a", "A", "T", "s", "e", 25], ["b", "Renamed"]]
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.side_effect = [{"values": data}, {"values": edited}]
+
+        result = sheets_storage.deduplicate_pomodoros(service, "test-spreadsheet-id", mode="compact")
+
+        assert result["removed"] == 0
+        assert "error" in result
+        service.spreadsheets().values().update.assert_not_called()
+        service.spreadsheets().values().clear.assert_not_called()
+
+    def test_compact_keeps_tail_if_rows_moved(self):
+        """If the last row read changed before the clear, the tail should be left in place."""
+        data = [["a", "A", "T", "s", "e", 25], ["a", "A", "T", "s", "e", 25]]
+        service = MagicMock()
+        service.spreadsheets().values().get().execute.side_effect = [
+            {"values": data},
+            {"values": data},
+            {"values": [["other"]]},
+        ]
+
+        result = sheets_storage.deduplicate_pomodoros(service, "test-spreadsheet-id", mode="compact")
+
+        assert result["removed"] == 0
+        assert "error" in result
+        service.spreadsheets().values().clear.assert_not_called()
+
+    def test_rejects_unknown_mode(self):
+        """An unknown mode should raise before touching the sheet."""
+        service = MagicMock()
+        with pytest.raises(ValueError):
+            sheets_storage.deduplicate_pomodoros(service, "test-spreadsheet-id", mode="fast")
+        service.spreadsheets().values().get.assert_not_called()
+
+
 class TestGetSettings:
     """Tests for getting settings from Google Sheets."""
 